@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Missing FK index advisor
+
+Lists every foreign key (and logical member FK column such as
+comments.id_member) whose columns are not the leading columns of a valid
+index. Without such an index, every DELETE on the parent table - including
+ON DELETE CASCADE from members or tugas_ai - has to sequentially scan the
+child table. Child tables are ranked by pg_class.reltuples.
+
+Logical FK columns come from prisma/schema.prisma (prisma_schema.py)
+rather than a column-name match on every table, and each suggestion is
+checked against the schema: an index already declared there only needs
+its migration applied. --offline skips the database and reports the
+@relation fields whose columns lead no @@index/@@unique/@id.
+
+Usage:
+  python scripts/advise-fk-indexes.py                   # report only
+  python scripts/advise-fk-indexes.py --min-rows 1000   # skip small tables
+  python scripts/advise-fk-indexes.py --create          # CREATE INDEX CONCURRENTLY
+  python scripts/advise-fk-indexes.py --offline         # schema.prisma only, no DB
+  python scripts/advise-fk-indexes.py --json
+"""
+
+import argparse
+import json
+import sys
+
+from psycopg2 import sql
+
+from db_utils import LOGICAL_MEMBER_FK_COLUMNS, get_db_connection
+from prisma_schema import load_schema
+
+DELETE_ACTIONS = {'a': 'NO ACTION', 'r': 'RESTRICT', 'c': 'CASCADE', 'n': 'SET NULL', 'd': 'SET DEFAULT'}
+# Same labels for Prisma referential actions (onDelete: NoAction, ...)
+PRISMA_ACTIONS = {'NoAction': 'NO ACTION', 'Restrict': 'RESTRICT', 'Cascade': 'CASCADE', 'SetNull': 'SET NULL',
+                  'SetDefault': 'SET DEFAULT'}
+
+ADVISOR_QUERY = """
+    WITH fk AS (
+        SELECT con.conrelid AS relid,
+               con.conname::text AS constraint_name,
+               con.conkey AS attnums,
+               con.confrelid::regclass::text AS referenced_table,
+               con.confdeltype::text AS delete_action
+        FROM pg_constraint con
+        JOIN pg_namespace nsp ON nsp.oid = con.connamespace
+        WHERE con.contype = 'f'
+          AND nsp.nspname = 'public'
+    ),
+    logical AS (
+        SELECT att.attrelid AS relid,
+               NULL::text AS constraint_name,
+               ARRAY[att.attnum] AS attnums,
+               'members' AS referenced_table,
+               NULL::text AS delete_action
+        FROM unnest(%(logical_tables)s::text[], %(logical_columns)s::text[]) AS l(table_name, column_name)
+        JOIN pg_class rel ON rel.relname = l.table_name
+        JOIN pg_namespace nsp ON nsp.oid = rel.relnamespace
+        JOIN pg_attribute att ON att.attrelid = rel.oid AND att.attname = l.column_name
+        WHERE nsp.nspname = 'public'
+          AND NOT att.attisdropped
+          AND NOT EXISTS (
+              SELECT 1 FROM fk WHERE fk.relid = att.attrelid AND fk.attnums = ARRAY[att.attnum]
+          )
+    ),
+    candidates AS (
+        SELECT * FROM fk
+        UNION ALL
+        SELECT * FROM logical
+    )
+    SELECT rel.relname AS table_name,
+           c.constraint_name,
+           ARRAY(
+               SELECT att.attname::text
+               FROM unnest(c.attnums) WITH ORDINALITY AS k(attnum, ord)
+               JOIN pg_attribute att ON att.attrelid = c.relid AND att.attnum = k.attnum
+               ORDER BY k.ord
+           ) AS columns,
+           c.referenced_table,
+           c.delete_action,
+           GREATEST(rel.reltuples, 0)::bigint AS estimated_rows,
+           pg_relation_size(c.relid) AS table_bytes
+    FROM candidates c
+    JOIN pg_class rel ON rel.oid = c.relid
+    WHERE NOT EXISTS (
+        SELECT 1
+        FROM pg_index idx
+        WHERE idx.indrelid = c.relid
+          AND idx.indisvalid
+          AND idx.indpred IS NULL
+          -- FK columns must be the leading columns of the index, in any order
+          AND (string_to_array(idx.indkey::text, ' ')::int2[])[1:array_length(c.attnums, 1)] @> c.attnums
+          AND (string_to_array(idx.indkey::text, ' ')::int2[])[1:array_length(c.attnums, 1)] <@ c.attnums
+    )
+    ORDER BY estimated_rows DESC, table_name
+"""
+
+INDEX_VALID_QUERY = """
+    SELECT x.indisvalid
+    FROM pg_index x
+    JOIN pg_class i ON i.oid = x.indexrelid
+    JOIN pg_namespace nsp ON nsp.oid = i.relnamespace
+    WHERE nsp.nspname = 'public'
+      AND i.relname = %s
+"""
+
+
+def find_unindexed_foreign_keys(cursor, schema, min_rows=0):
+    """FK / logical FK columns that have no leading index, largest tables first"""
+    logical = schema.logical_references('members', LOGICAL_MEMBER_FK_COLUMNS)
+    cursor.execute(ADVISOR_QUERY, {
+        'logical_tables': [model.table_name for model, _ in logical],
+        'logical_columns': [field.column_name for _, field in logical],
+    })
+    results = []
+    for table, constraint, columns, ref_table, delete_action, rows, size in cursor.fetchall():
+        if rows < min_rows:
+            continue
+        results.append({
+            'table': table,
+            'constraint': constraint,
+            'columns': list(columns),
+            'referenced_table': ref_table,
+            'delete_action': DELETE_ACTIONS.get(delete_action, 'logical'),
+            'estimated_rows': rows,
+            'table_bytes': size,
+            'index_name': index_name_for(table, columns),
+            'declared_in_schema': declared_index(schema, table, columns),
+        })
+    return results
+
+
+def declared_index(schema, table, columns):
+    """Name (or True) of the schema.prisma index covering columns, or None"""
+    model = schema.model_for_table(table)
+    entry = model.leading_index(columns) if model else None
+    return (entry['name'] or True) if entry else None
+
+
+def find_unindexed_in_schema(schema):
+    """Same report from schema.prisma alone: relations and logical FKs without a declared index"""
+    candidates = [(r.table, r.columns, r.constraint_name, r.referenced_table, PRISMA_ACTIONS.get(r.on_delete, r.on_delete))
+                  for r in schema.unindexed_relations()]
+    candidates += [(model.table_name, [field.column_name], None, 'members', 'logical')
+                   for model, field in schema.logical_references('members', LOGICAL_MEMBER_FK_COLUMNS)
+                   if model.leading_index([field.column_name]) is None]
+    return [
+        {
+            'table': table, 'constraint': constraint, 'columns': columns, 'referenced_table': ref_table,
+            'delete_action': action, 'estimated_rows': None, 'table_bytes': None,
+            'index_name': index_name_for(table, columns), 'declared_in_schema': None,
+        }
+        for table, columns, constraint, ref_table, action in sorted(candidates)
+    ]
+
+
+def index_name_for(table, columns):
+    """Same naming scheme as the existing idx_<table>_<column> indexes"""
+    return f'idx_{table}_{"_".join(columns)}'[:63]
+
+
+def index_is_valid(cursor, name):
+    """pg_index.indisvalid of a public index, or None if there is no such index"""
+    cursor.execute(INDEX_VALID_QUERY, (name,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def create_index_concurrently(conn, advice):
+    """
+    CREATE INDEX CONCURRENTLY (connection must be in autocommit mode).
+
+    IF NOT EXISTS also skips an INVALID index left by an earlier failed
+    build, so such an index is dropped first, and the new index is checked
+    before it is reported. Returns True if an INVALID index was replaced.
+    """
+    name = sql.Identifier(advice['index_name'])
+    query = sql.SQL('CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})').format(
+        name=name,
+        table=sql.Identifier(advice['table']),
+        columns=sql.SQL(', ').join(sql.Identifier(c) for c in advice['columns'])
+    )
+    with conn.cursor() as cur:
+        cur.execute("SET statement_timeout = 0")
+        rebuilt = index_is_valid(cur, advice['index_name']) is False
+        if rebuilt:
+            cur.execute(sql.SQL('DROP INDEX CONCURRENTLY IF EXISTS {name}').format(name=name))
+        cur.execute(query)
+        if not index_is_valid(cur, advice['index_name']):
+            raise RuntimeError('index was built but is INVALID')
+    return rebuilt
+
+
+def format_bytes(size):
+    if size is None:
+        return '-'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f'{size:.0f} {unit}'
+        size /= 1024
+    return f'{size:.1f} TB'
+
+
+def print_report(advice):
+    print(f'{"TABLE(COLUMNS)":<45} {"REFERENCES":<20} {"ON DELETE":<10} {"EST. ROWS":>10} {"SIZE":>9}')
+    print('-' * 100)
+    for a in advice:
+        target = f'{a["table"]}({", ".join(a["columns"])})'
+        rows = '-' if a['estimated_rows'] is None else a['estimated_rows']
+        print(f'{target:<45} {a["referenced_table"]:<20} {a["delete_action"]:<10} '
+              f'{rows:>10} {format_bytes(a["table_bytes"]):>9}')
+
+    print('\n💡 Each parent DELETE scans ~EST. ROWS child rows per table above.')
+    declared = [a for a in advice if a['declared_in_schema']]
+    if declared:
+        print('   Declared in prisma/schema.prisma but missing in the database (apply the migration):')
+        for a in declared:
+            name = a['declared_in_schema'] if a['declared_in_schema'] is not True else 'unnamed'
+            print(f'   {a["table"]}({", ".join(a["columns"])}): {name}')
+    missing = [a for a in advice if not a['declared_in_schema']]
+    if missing:
+        print('   Matching prisma/schema.prisma declarations:')
+        for a in missing:
+            print(f'   model {a["table"]}: @@index([{", ".join(a["columns"])}], map: "{a["index_name"]}")')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find foreign keys without a supporting index')
+    parser.add_argument('--min-rows', type=int, default=0, help='Ignore tables with fewer estimated rows')
+    parser.add_argument('--create', action='store_true', help='Create missing indexes with CREATE INDEX CONCURRENTLY')
+    parser.add_argument('--offline', action='store_true', help='Report from prisma/schema.prisma only (no database)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    schema = load_schema()
+    if args.offline:
+        advice = find_unindexed_in_schema(schema)
+        if args.json:
+            print(json.dumps(advice, indent=2))
+        elif not advice:
+            print('✅ Every relation in schema.prisma has a leading index')
+        else:
+            print(f'🔍 {len(advice)} relation column set(s) without a declared index in schema.prisma\n')
+            print_report(advice)
+        return 0
+
+    conn = get_db_connection(autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            advice = find_unindexed_foreign_keys(cur, schema, args.min_rows)
+
+        if args.json:
+            print(json.dumps(advice, indent=2))
+        elif not advice:
+            print('✅ Every foreign key has a leading index')
+        else:
+            print(f'🔍 {len(advice)} foreign key column set(s) without a leading index\n')
+            print_report(advice)
+
+        if args.create and advice:
+            print('\n🔧 Creating missing indexes concurrently...')
+            failed = 0
+            for a in advice:
+                try:
+                    rebuilt = create_index_concurrently(conn, a)
+                    print(f'   ✅ {a["index_name"]}' + (' (replaced an INVALID index)' if rebuilt else ''))
+                except Exception as e:
+                    # A failed CONCURRENTLY build leaves an INVALID index behind
+                    failed += 1
+                    print(f'   ❌ {a["index_name"]}: {e}')
+                    print(f'      💡 DROP INDEX CONCURRENTLY IF EXISTS "{a["index_name"]}"; then retry')
+            return 1 if failed else 0
+    finally:
+        conn.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
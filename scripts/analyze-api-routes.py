@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Whole-API report of the route handlers in src/app/api
+
+Every route.js is analyzed once (see route_analyzer.py; results are cached
+per file) and the report lists, per handler:
+  - N+1: Prisma calls inside for/while loops or .map/.forEach callbacks
+  - findMany without take (unbounded result sets)
+  - GET handlers returning an unbounded list with no page/limit/cursor param
+  - handlers without an auth call (mutating methods first)
+
+Usage:
+  python scripts/analyze-api-routes.py                     # full report
+  python scripts/analyze-api-routes.py --route admin/tugas --verbose
+  python scripts/analyze-api-routes.py --json > routes.json
+  python scripts/analyze-api-routes.py --jobs 0 --no-cache
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from file_cache import CACHE_PATH
+from route_analyzer import analyze_routes, handler_findings
+from source_tree import add_jobs_argument
+
+SECTIONS = [
+    ('n+1', '🔁 N+1: Prisma calls inside loops'),
+    ('unbounded', '📦 findMany without take'),
+    ('dynamic-options', '❔ findMany with runtime-built options (check by hand)'),
+    ('no-pagination', '📄 GET handlers without pagination'),
+    ('no-auth-mutation', '🔓 Mutating handlers without auth'),
+    ('no-auth', '🔓 Read handlers without auth'),
+]
+
+
+def print_handler_table(route):
+    print(f'\n📄 {route["path"]}  ({route["route"]})')
+    if not route['handlers']:
+        print('   (no exported GET/POST/... handlers)')
+    for handler in route['handlers']:
+        print(f'   {handler["method"]:<7} line {handler["line"]}')
+        print(f'      auth:       {", ".join(handler["auth"]) or "-"}')
+        print(f'      privileges: {", ".join(handler["privileges"]) or "-"}')
+        print(f'      pagination: {", ".join(handler["pagination"]) or "-"}')
+        for call in handler['prisma']:
+            target = f'{call["model"]}.{call["method"]}' if call['model'] else call['method']
+            options = ', '.join(call['options']) if call['options'] else ('-' if call['options'] == {} else '<variable>')
+            loop = f'  [in {call["loop"]}]' if call['loop'] else ''
+            print(f'      prisma:     {target} (line {call["line"]}) {{{options}}}{loop}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report unbounded queries, N+1 and missing pagination in API routes')
+    parser.add_argument('--route', metavar='FILTER', help='Only routes whose URL or path contains FILTER')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Print every handler with its Prisma calls')
+    parser.add_argument('--json', action='store_true', help='Print the raw analysis (with findings) as JSON')
+    parser.add_argument('--no-cache', action='store_true', help=f'Re-analyze every file (rebuilds {CACHE_PATH.name})')
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    routes = analyze_routes(jobs=args.jobs, use_cache=not args.no_cache, only=args.route)
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        for route in routes:
+            for handler in route['handlers']:
+                handler['findings'] = [dict(zip(('kind', 'line', 'message'), f)) for f in handler_findings(handler)]
+        print(json.dumps(routes, indent=2))
+        return 0
+
+    print('=' * 60)
+    print('🛣️  API ROUTE ANALYSIS')
+    print('=' * 60)
+    handlers = [(route, handler) for route in routes for handler in route['handlers']]
+    calls = sum(len(handler['prisma']) for _, handler in handlers)
+    print(f'{len(routes)} route files, {len(handlers)} handlers, {calls} Prisma calls (analyzed in {elapsed:.2f}s)')
+    empty = [route['path'] for route in routes if not route['handlers']]
+    if empty:
+        print(f'⚠️  {len(empty)} file(s) without exported handlers: {", ".join(empty)}')
+
+    if args.verbose:
+        for route in routes:
+            print_handler_table(route)
+
+    by_kind = {kind: [] for kind, _ in SECTIONS}
+    for route, handler in handlers:
+        for kind, line, message in handler_findings(handler):
+            by_kind[kind].append((route['path'], line, handler['method'], message))
+
+    for kind, title in SECTIONS:
+        findings = by_kind[kind]
+        if not findings:
+            continue
+        print(f'\n{title}: {len(findings)}')
+        for path, line, method, message in findings:
+            print(f'   {path}:{line}  {method}  {message}')
+
+    print('\n' + '=' * 60)
+    print('📊 SUMMARY')
+    print('=' * 60)
+    for kind, title in SECTIONS:
+        print(f'   {title.split(" ", 1)[1]}: {len(by_kind[kind])}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,6 +11,8 @@ import requests
 import psycopg2
 from urllib.parse import urlparse
 
+from db_utils import stream_pages
+
 # Configuration
 DB_CONFIG = {
     'host': '213.190.4.159',
@@ -38,10 +40,9 @@ def main():
     print()
     
     conn = psycopg2.connect(**DB_CONFIG)
-    cursor = conn.cursor()
     
-    # Get members with "OTHER" category
-    cursor.execute("""
+    # Members with "OTHER" category, in keyset pages (no transaction held during URL checks)
+    others = stream_pages(conn, """
         SELECT 
             id,
             nama_lengkap,
@@ -50,28 +51,28 @@ def main():
         FROM members
         WHERE foto_profil_url IS NOT NULL
           AND foto_profil_url != ''
-          AND foto_profil_url NOT LIKE '%cloudinary.com%'
-          AND foto_profil_url NOT LIKE '%storage.berkomunitas.com%'
-          AND foto_profil_url NOT LIKE '%dicebear.com%'
-          AND foto_profil_url NOT LIKE '/uploads/%'
+          AND foto_profil_url NOT LIKE '%%cloudinary.com%%'
+          AND foto_profil_url NOT LIKE '%%storage.berkomunitas.com%%'
+          AND foto_profil_url NOT LIKE '%%dicebear.com%%'
+          AND foto_profil_url NOT LIKE '/uploads/%%'
+          AND id > %(after)s
         ORDER BY id
+        LIMIT %(limit)s
     """)
     
-    others = cursor.fetchall()
-    
-    print(f'Found {len(others)} members with "OTHER" photo URLs\n')
-    
-    if len(others) == 0:
-        print('✅ No members in OTHER category!')
-        return
-    
     # Analyze URLs
     url_patterns = {}
     broken_urls = []
+    samples = []
+    total_others = 0
     
     print('Checking URLs...\n')
     
     for member_id, nama, email, url in others:
+        total_others += 1
+        if len(samples) < 5:
+            samples.append((member_id, nama, email, url))
+        
         # Categorize by URL pattern
         if url.startswith('http'):
             parsed = urlparse(url)
@@ -99,6 +100,12 @@ def main():
                 print(f'   Status: {status_code if is_ok else is_ok}')
                 print()
     
+    conn.close()
+    
+    if total_others == 0:
+        print('✅ No members in OTHER category!')
+        return
+    
     # Summary
     print('=' * 70)
     print('📊 URL Pattern Analysis')
@@ -112,9 +119,9 @@ def main():
     print('=' * 70)
     print('📊 Summary')
     print('=' * 70)
-    print(f'Total "OTHER" URLs: {len(others)}')
+    print(f'Total "OTHER" URLs: {total_others}')
     print(f'Broken/Inaccessible: {len(broken_urls)}')
-    print(f'Working: {len(others) - len(broken_urls)}')
+    print(f'Working: {total_others - len(broken_urls)}')
     print()
     
     if broken_urls:
@@ -123,11 +130,8 @@ def main():
     # Sample URLs
     print()
     print('Sample URLs from "OTHER" category:')
-    for i, (member_id, nama, email, url) in enumerate(others[:5]):
+    for i, (member_id, nama, email, url) in enumerate(samples):
         print(f'  {i+1}. Member {member_id}: {url[:60]}...')
-    
-    cursor.close()
-    conn.close()
 
 if __name__ == '__main__':
     try:
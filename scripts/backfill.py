@@ -0,0 +1,206 @@
+"""
+Chunked, lock-friendly backfill runner for data migrations.
+
+Instead of one whole-table UPDATE in a single transaction, the table is
+walked in keyset-paginated id ranges. Each chunk runs in its own short
+transaction with `lock_timeout`/`statement_timeout`, is committed
+immediately and is recorded in a state file so an interrupted run resumes
+from the last completed chunk. The state file is removed once the whole
+table has been processed, so the next run starts from the beginning.
+
+Usage from a script:
+
+    from backfill import BackfillRunner
+
+    runner = BackfillRunner(conn, 'member_emails_member_id', 'member_emails', '''
+        UPDATE member_emails me
+        SET member_id = m.id
+        FROM members m
+        WHERE me.id > %(lo)s AND me.id <= %(hi)s
+          AND me.clerk_id = m.clerk_id
+          AND me.member_id IS NULL
+    ''')
+    runner.run()
+
+The update statement receives the chunk bounds as `%(lo)s` (exclusive)
+and `%(hi)s` (inclusive).
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from psycopg2 import errors, sql
+
+STATE_DIR = Path(__file__).parent.parent / '.cache' / 'backfills'
+
+
+class BackfillRunner:
+    """Run an UPDATE/DELETE over a table one id-range chunk at a time"""
+
+    def __init__(self, conn, name, table, statement, key='id', chunk_size=1000, sleep=0.05,
+                 lock_timeout='2s', statement_timeout='30s', max_retries=5, state_dir=STATE_DIR,
+                 restart=False):
+        self.conn = conn
+        self.name = name
+        self.table = table
+        self.statement = statement
+        self.key = key
+        self.chunk_size = chunk_size
+        self.sleep = sleep
+        self.lock_timeout = lock_timeout
+        self.statement_timeout = statement_timeout
+        self.max_retries = max_retries
+        self.state_path = Path(state_dir) / f'{name}.json'
+        self.state = self._fresh_state() if restart else self._load_state()
+
+    # ------------------------------------------------------------------ state
+
+    def _fresh_state(self):
+        return {
+            'name': self.name,
+            'table': self.table,
+            'last_id': None,
+            'chunks': 0,
+            'rows_affected': 0,
+            'updated_at': None,
+        }
+
+    def _load_state(self):
+        if self.state_path.exists():
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('table') == self.table:
+                return state
+        return self._fresh_state()
+
+    def _save_state(self):
+        self.state['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+        tmp_path.replace(self.state_path)
+
+    def _clear_state(self):
+        if self.state_path.exists():
+            self.state_path.unlink()
+
+    # ---------------------------------------------------------------- queries
+
+    def _id_bounds(self):
+        query = sql.SQL('SELECT MIN({key}), MAX({key}) FROM {table}').format(
+            key=sql.Identifier(self.key), table=sql.Identifier(self.table)
+        )
+        with self.conn.cursor() as cur:
+            cur.execute(query)
+            bounds = cur.fetchone()
+        self.conn.commit()
+        return bounds
+
+    def _next_upper_bound(self, cur, last_id):
+        """Keyset pagination: the id that closes the next chunk after last_id"""
+        query = sql.SQL("""
+            SELECT MAX({key}) FROM (
+                SELECT {key} FROM {table}
+                WHERE {key} > %s
+                ORDER BY {key}
+                LIMIT %s
+            ) chunk
+        """).format(key=sql.Identifier(self.key), table=sql.Identifier(self.table))
+        cur.execute(query, (last_id, self.chunk_size))
+        return cur.fetchone()[0]
+
+    def _run_chunk(self, last_id):
+        """One short transaction: find the next range, apply the statement, commit"""
+        with self.conn.cursor() as cur:
+            cur.execute('SET LOCAL lock_timeout = %s', (self.lock_timeout,))
+            cur.execute('SET LOCAL statement_timeout = %s', (self.statement_timeout,))
+
+            hi = self._next_upper_bound(cur, last_id)
+            if hi is None:
+                self.conn.rollback()
+                return None, 0
+
+            cur.execute(self.statement, {'lo': last_id, 'hi': hi})
+            affected = max(cur.rowcount, 0)
+        self.conn.commit()
+        return hi, affected
+
+    def _run_chunk_with_retry(self, last_id):
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                return self._run_chunk(last_id)
+            except (errors.LockNotAvailable, errors.QueryCanceled, errors.DeadlockDetected) as e:
+                self.conn.rollback()
+                if attempt == self.max_retries:
+                    raise
+                backoff = min(30, self.sleep + 0.5 * 2 ** (attempt - 1))
+                print(f'   ⚠️  Chunk after id {last_id} hit {type(e).__name__}, '
+                      f'retry {attempt}/{self.max_retries - 1} in {backoff:.1f}s')
+                time.sleep(backoff)
+
+    # -------------------------------------------------------------------- run
+
+    def run(self):
+        """Process the remaining chunks; returns the number of rows affected"""
+        min_id, max_id = self._id_bounds()
+        if max_id is None:
+            print(f'✅ {self.table} is empty, nothing to backfill')
+            self._clear_state()
+            return 0
+
+        start_id = self.state['last_id'] if self.state['last_id'] is not None else min_id - 1
+        if self.state['last_id'] is not None:
+            print(f'⏯️  Resuming {self.name} after {self.key}={start_id} '
+                  f'({self.state["chunks"]} chunks, {self.state["rows_affected"]} rows done)')
+
+        last_id = start_id
+        started = time.monotonic()
+        span = max(max_id - start_id, 1)
+
+        while True:
+            hi, affected = self._run_chunk_with_retry(last_id)
+            if hi is None:
+                break
+
+            last_id = hi
+            self.state['last_id'] = hi
+            self.state['chunks'] += 1
+            self.state['rows_affected'] += affected
+            self._save_state()
+
+            done = min(max(hi - start_id, 0) / span, 1.0)
+            elapsed = time.monotonic() - started
+            eta = timedelta(seconds=int(elapsed / done - elapsed)) if done > 0 else '?'
+            print(f'   ⏳ {self.table}: {self.key} ≤ {hi} ({done:6.1%}) | '
+                  f'{self.state["rows_affected"]} rows | ETA {eta}')
+
+            if self.sleep:
+                time.sleep(self.sleep)
+
+        self._clear_state()
+        print(f'✅ Backfill {self.name}: {self.state["rows_affected"]} rows in {self.state["chunks"]} chunks')
+        return self.state['rows_affected']
+
+
+def add_backfill_arguments(parser):
+    """Shared argparse flags for scripts that use BackfillRunner"""
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Rows per chunk (default: 1000)')
+    parser.add_argument('--sleep', type=float, default=0.05, help='Seconds to pause between chunks')
+    parser.add_argument('--lock-timeout', default='2s', help='lock_timeout per chunk (default: 2s)')
+    parser.add_argument('--statement-timeout', default='30s', help='statement_timeout per chunk (default: 30s)')
+    parser.add_argument('--restart', action='store_true', help='Ignore saved progress and start over')
+    return parser
+
+
+def runner_options(args):
+    """BackfillRunner keyword arguments from add_backfill_arguments() flags"""
+    return {
+        'chunk_size': args.chunk_size,
+        'sleep': args.sleep,
+        'lock_timeout': args.lock_timeout,
+        'statement_timeout': args.statement_timeout,
+        'restart': args.restart,
+    }
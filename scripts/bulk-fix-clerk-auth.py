@@ -2,6 +2,9 @@
 """
 Bulk Fix Clerk auth() to SSO getCurrentUser()
 Fixes all API routes that still use Clerk authentication
+
+The same rewrites are in the clerk-sso rule set of run-codemods.py, which
+can show them as a diff first and applies them atomically.
 """
 
 import os
@@ -26,7 +29,7 @@ FILES_TO_FIX = [
     "src/app/api/debug-db/route.js",
 ]
 
-BASE_DIR = Path("c:/Users/Admin/Documents/berkomunitas")
+BASE_DIR = Path(__file__).parent.parent
 
 def fix_file(filepath):
     """Fix a single file"""
@@ -7,6 +7,8 @@ import psycopg2
 import requests
 from urllib.parse import urlparse
 
+from db_utils import stream_pages
+
 DB_CONFIG = {
     'host': '213.190.4.159',
     'port': 5432,
@@ -23,65 +25,83 @@ def check_url_accessibility(url):
     except:
         return False
 
-def check_all_photos():
-    """Check all profile pictures accessibility"""
-    conn = psycopg2.connect(**DB_CONFIG)
-    cur = conn.cursor()
-    
-    cur.execute("""
-        SELECT id, nama_lengkap, email, foto_profil_url
-        FROM members
-        ORDER BY id
-    """)
-    
-    members = cur.fetchall()
-    cur.close()
-    conn.close()
-    
-    print("\n🔍 Checking Profile Picture Accessibility")
-    print("="*80)
-    
-    broken = []
-    dicebear = []
-    minio = []
-    google = []
-    cloudinary = []
-    null_or_empty = []
-    
-    for member_id, nama, email, url in members:
+def classify_members(rows):
+    """Generator stage: tag each member row with its photo category"""
+    for member_id, nama, email, url in rows:
         if not url or url.strip() == '':
-            null_or_empty.append((member_id, nama, email))
+            yield 'null_or_empty', (member_id, nama, email)
             continue
             
         url_lower = url.lower()
         
         if 'dicebear.com' in url_lower:
-            dicebear.append((member_id, nama, email, url))
+            yield 'dicebear', (member_id, nama, email, url)
         elif 'storage.berkomunitas.com' in url_lower or '213.190.4.159:9100' in url_lower:
             # Check MinIO accessibility
             if not check_url_accessibility(url):
-                broken.append((member_id, nama, email, url, 'MinIO'))
+                yield 'broken', (member_id, nama, email, url, 'MinIO')
             else:
-                minio.append((member_id, nama, email, url))
+                yield 'minio', (member_id, nama, email, url)
         elif 'googleusercontent.com' in url_lower:
-            google.append((member_id, nama, email, url))
+            yield 'google', (member_id, nama, email, url)
         elif 'cloudinary.com' in url_lower:
-            cloudinary.append((member_id, nama, email, url))
+            yield 'cloudinary', (member_id, nama, email, url)
         else:
             # Check other URLs
             if not check_url_accessibility(url):
-                broken.append((member_id, nama, email, url, 'Other'))
+                yield 'broken', (member_id, nama, email, url, 'Other')
+            else:
+                yield 'other', (member_id, nama, email, url)
+
+def check_all_photos():
+    """Check all profile pictures accessibility"""
+    conn = psycopg2.connect(**DB_CONFIG)
+    
+    print("\n🔍 Checking Profile Picture Accessibility")
+    print("="*80)
+    
+    # Only problem rows are kept in memory; healthy ones are just counted
+    broken = []
+    cloudinary = []
+    null_or_empty = []
+    counts = {'dicebear': 0, 'minio': 0, 'google': 0, 'other': 0}
+    total = 0
+    
+    # Keyset pages: the URL checks run outside any open transaction
+    rows = stream_pages(conn, """
+        SELECT id, nama_lengkap, email, foto_profil_url
+        FROM members
+        WHERE id > %(after)s
+        ORDER BY id
+        LIMIT %(limit)s
+    """)
+    
+    try:
+        for category, member in classify_members(rows):
+            total += 1
+            if category == 'broken':
+                broken.append(member)
+                print(f"❌ [{member[0]}] {member[4]}: {member[3][:70]}")
+            elif category == 'null_or_empty':
+                null_or_empty.append(member)
+            elif category == 'cloudinary':
+                cloudinary.append(member)
+            else:
+                counts[category] += 1
+    finally:
+        conn.close()
     
     # Print summary
     print(f"\n📊 SUMMARY")
     print("="*80)
-    print(f"✅ DiceBear: {len(dicebear)}")
-    print(f"✅ MinIO (accessible): {len(minio)}")
-    print(f"✅ Google Photos: {len(google)}")
+    print(f"✅ DiceBear: {counts['dicebear']}")
+    print(f"✅ MinIO (accessible): {counts['minio']}")
+    print(f"✅ Google Photos: {counts['google']}")
+    print(f"✅ Other (accessible): {counts['other']}")
     print(f"❌ Cloudinary: {len(cloudinary)}")
     print(f"❌ Null/Empty: {len(null_or_empty)}")
     print(f"❌ Broken URLs: {len(broken)}")
-    print(f"📊 Total: {len(members)}")
+    print(f"📊 Total: {total}")
     
     # Print broken URLs
     if broken:
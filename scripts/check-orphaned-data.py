@@ -1,77 +1,252 @@
 """
 Check for orphaned data from members deleted before CASCADE DELETE migration
+
+Every column that references members.id is read from prisma/schema.prisma
+(prisma_schema.py): @relation foreign keys plus "logical" FK columns
+(id_member, member_id, author_id) that have no relation. --catalog
+discovers them from pg_catalog instead, for a database that has drifted
+from the schema (see schema-snapshot.py). The anti-joins run concurrently
+on a small connection pool and are reported together.
+
+Usage:
+  python scripts/check-orphaned-data.py                     # exact counts
+  python scripts/check-orphaned-data.py --sample 5          # TABLESAMPLE SYSTEM (5%) estimate
+  python scripts/check-orphaned-data.py --json              # machine-readable report
+  python scripts/check-orphaned-data.py --fix --chunk-size 5000
+  python scripts/check-orphaned-data.py --fix --table comments
+  python scripts/check-orphaned-data.py --catalog           # discover columns from pg_catalog
 """
-import psycopg2
-from urllib.parse import urlparse
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-def check_orphaned_data():
-    url = os.getenv('DATABASE_URL')
-    u = urlparse(url)
-
-    conn = psycopg2.connect(
-        host=u.hostname,
-        port=u.port,
-        user=u.username,
-        password=u.password,
-        database=u.path[1:]
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from psycopg2 import sql
+from psycopg2.pool import ThreadedConnectionPool
+
+from db_utils import (
+    DEFAULT_APPLICATION_NAME, LOGICAL_MEMBER_FK_COLUMNS, get_database_url, parse_database_url
+)
+from prisma_schema import load_schema
+
+DISCOVER_QUERY = """
+    WITH fk AS (
+        SELECT rel.relname AS table_name,
+               att.attname AS column_name,
+               con.conname AS constraint_name
+        FROM pg_constraint con
+        JOIN pg_class rel ON rel.oid = con.conrelid
+        JOIN pg_namespace nsp ON nsp.oid = rel.relnamespace
+        JOIN pg_attribute att ON att.attrelid = con.conrelid AND att.attnum = con.conkey[1]
+        WHERE con.contype = 'f'
+          AND con.confrelid = 'public.members'::regclass
+          AND array_length(con.conkey, 1) = 1
+          AND nsp.nspname = 'public'
+    ),
+    logical AS (
+        SELECT rel.relname AS table_name,
+               att.attname AS column_name,
+               NULL::name AS constraint_name
+        FROM pg_attribute att
+        JOIN pg_class rel ON rel.oid = att.attrelid
+        JOIN pg_namespace nsp ON nsp.oid = rel.relnamespace
+        WHERE nsp.nspname = 'public'
+          AND rel.relkind IN ('r', 'p')
+          AND rel.relname <> 'members'
+          AND att.attnum > 0
+          AND NOT att.attisdropped
+          AND att.attname = ANY(%s)
+          AND format_type(att.atttypid, att.atttypmod) IN ('integer', 'bigint', 'smallint')
     )
-    cur = conn.cursor()
-
-    print('🔍 Mencari data orphan (data tanpa member yang ada)...\n')
-
-    # Check task_submissions
-    cur.execute('''
-        SELECT COUNT(*) FROM task_submissions ts
-        LEFT JOIN members m ON ts.id_member = m.id
-        WHERE m.id IS NULL
-    ''')
-    orphan_tasks = cur.fetchone()[0]
-    print(f'task_submissions orphan: {orphan_tasks}')
-
-    # Check reward_redemptions
-    cur.execute('''
-        SELECT COUNT(*) FROM reward_redemptions rr
-        LEFT JOIN members m ON rr.id_member = m.id
-        WHERE m.id IS NULL
-    ''')
-    orphan_rewards = cur.fetchone()[0]
-    print(f'reward_redemptions orphan: {orphan_rewards}')
-
-    # Check member_transactions
-    cur.execute('''
-        SELECT COUNT(*) FROM member_transactions mt
-        LEFT JOIN members m ON mt.member_id = m.id
-        WHERE m.id IS NULL
-    ''')
-    orphan_trans = cur.fetchone()[0]
-    print(f'member_transactions orphan: {orphan_trans}')
-
-    # Check profil_sosial_media
-    cur.execute('''
-        SELECT COUNT(*) FROM profil_sosial_media psm
-        LEFT JOIN members m ON psm.id_member = m.id
-        WHERE m.id IS NULL
-    ''')
-    orphan_social = cur.fetchone()[0]
-    print(f'profil_sosial_media orphan: {orphan_social}')
-
-    total = orphan_tasks + orphan_rewards + orphan_trans + orphan_social
-    print(f'\n📊 Total data orphan: {total}')
-
-    if total > 0:
-        print(f'\n⚠️  Ada {total} data orphan dari member yang dihapus sebelum migrasi')
-        print('💡 Perlu cleanup script untuk membersihkan data lama ini')
-    else:
-        print('\n✅ Tidak ada data orphan! Database sudah bersih')
-
-    cur.close()
-    conn.close()
-    
+    SELECT table_name, column_name, constraint_name FROM fk
+    UNION ALL
+    SELECT l.table_name, l.column_name, l.constraint_name
+    FROM logical l
+    WHERE NOT EXISTS (
+        SELECT 1 FROM fk WHERE fk.table_name = l.table_name AND fk.column_name = l.column_name
+    )
+    ORDER BY table_name, column_name
+"""
+
+
+def member_references(schema, logical_columns=LOGICAL_MEMBER_FK_COLUMNS):
+    """List every (table, column, constraint) that references members.id, from schema.prisma"""
+    refs = [
+        {'table': r.table, 'column': r.columns[0], 'constraint': r.constraint_name}
+        for r in schema.references_to('members') if len(r.columns) == 1
+    ]
+    refs += [
+        {'table': model.table_name, 'column': field.column_name, 'constraint': None}
+        for model, field in schema.logical_references('members', logical_columns)
+    ]
+    return sorted(refs, key=lambda r: (r['table'], r['column']))
+
+
+def discover_member_references(conn):
+    """List every (table, column, constraint) that references members.id, from pg_catalog"""
+    with conn.cursor() as cur:
+        cur.execute(DISCOVER_QUERY, (list(LOGICAL_MEMBER_FK_COLUMNS),))
+        return [
+            {'table': table, 'column': column, 'constraint': constraint}
+            for table, column, constraint in cur.fetchall()
+        ]
+
+
+def build_orphan_query(table, column, sample_percent=None):
+    """Anti-join against members; optional TABLESAMPLE for quick estimates"""
+    sample = sql.SQL('')
+    if sample_percent:
+        sample = sql.SQL(' TABLESAMPLE SYSTEM ({})').format(sql.Literal(float(sample_percent)))
+
+    return sql.SQL("""
+        SELECT COUNT(*),
+               COUNT(DISTINCT c.{col}),
+               (ARRAY_AGG(DISTINCT c.{col} ORDER BY c.{col}))[1:%s]
+        FROM {table} c{sample}
+        WHERE c.{col} IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM members m WHERE m.id = c.{col})
+    """).format(table=sql.Identifier(table), col=sql.Identifier(column), sample=sample)
+
+
+def audit_reference(pool, ref, sample_percent=None, sample_ids=5):
+    """Run one anti-join on a pooled connection"""
+    conn = pool.getconn()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(build_orphan_query(ref['table'], ref['column'], sample_percent), (sample_ids,))
+            orphan_rows, orphan_members, ids = cur.fetchone()
+    finally:
+        pool.putconn(conn)
+
+    if sample_percent:
+        # Scale the sampled count back up to a full-table estimate
+        orphan_rows = round(orphan_rows * 100 / float(sample_percent))
+
+    return {
+        **ref,
+        'orphan_rows': orphan_rows,
+        'orphan_member_ids': orphan_members,
+        'sample_ids': ids or [],
+        'estimated': bool(sample_percent),
+    }
+
+
+def run_audit(pool, refs, workers=4, sample_percent=None, sample_ids=5):
+    """Audit all references concurrently; results keep the discovery order"""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(
+            lambda ref: audit_reference(pool, ref, sample_percent, sample_ids), refs
+        ))
+
+
+def delete_orphans(conn, table, column, chunk_size=1000):
+    """Delete orphaned rows in chunks, committing after each one"""
+    query = sql.SQL("""
+        DELETE FROM {table}
+        WHERE ctid IN (
+            SELECT c.ctid FROM {table} c
+            WHERE c.{col} IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM members m WHERE m.id = c.{col})
+            LIMIT %s
+        )
+    """).format(table=sql.Identifier(table), col=sql.Identifier(column))
+
+    deleted = 0
+    with conn.cursor() as cur:
+        while True:
+            cur.execute(query, (chunk_size,))
+            conn.commit()
+            deleted += cur.rowcount
+            if cur.rowcount < chunk_size:
+                break
+            print(f'   🧹 {table}.{column}: {deleted} deleted so far...')
+    return deleted
+
+
+def print_report(results):
+    print(f'{"TABLE.COLUMN":<45} {"KIND":<8} {"ROWS":>10} {"MEMBERS":>8}  SAMPLE IDS')
+    print('-' * 100)
+    for r in results:
+        kind = 'fk' if r['constraint'] else 'logical'
+        rows = f'~{r["orphan_rows"]}' if r['estimated'] else str(r['orphan_rows'])
+        ids = ', '.join(map(str, r['sample_ids']))
+        icon = '⚠️ ' if r['orphan_rows'] else '✅'
+        print(f'{icon} {r["table"] + "." + r["column"]:<42} {kind:<8} {rows:>10} {r["orphan_member_ids"]:>8}  {ids}')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Audit orphaned rows referencing members.id')
+    parser.add_argument('--sample', type=float, default=None, metavar='PCT',
+                        help='Estimate with TABLESAMPLE SYSTEM (PCT) instead of exact counts')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent anti-joins (default: 4)')
+    parser.add_argument('--sample-ids', type=int, default=5, help='Orphaned member ids to show per column')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    parser.add_argument('--fix', action='store_true', help='Delete orphaned rows in batches')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Rows per DELETE batch (default: 1000)')
+    parser.add_argument('--table', action='append', default=[], help='Restrict to these tables (repeatable)')
+    parser.add_argument('--catalog', action='store_true',
+                        help='Discover referencing columns from pg_catalog instead of schema.prisma')
+    args = parser.parse_args()
+    # A sampled estimate can round to 0 while orphans exist; --fix needs exact counts
+    if args.fix and args.sample:
+        parser.error('--fix needs exact counts, run it without --sample')
+    return args
+
+
+def check_orphaned_data(args=None):
+    args = args or parse_args()
+    params = parse_database_url(get_database_url())
+    pool = ThreadedConnectionPool(1, max(1, args.workers), application_name=DEFAULT_APPLICATION_NAME, **params)
+
+    try:
+        if args.catalog:
+            conn = pool.getconn()
+            try:
+                refs = discover_member_references(conn)
+            finally:
+                pool.putconn(conn)
+        else:
+            refs = member_references(load_schema())
+
+        if args.table:
+            refs = [r for r in refs if r['table'] in args.table]
+
+        if not args.json:
+            print('🔍 Mencari data orphan (data tanpa member yang ada)...\n')
+            print(f'📋 {len(refs)} kolom mereferensikan members.id\n')
+
+        results = run_audit(pool, refs, args.workers, args.sample, args.sample_ids)
+        total = sum(r['orphan_rows'] for r in results)
+
+        if args.json:
+            print(json.dumps({'total_orphan_rows': total, 'sampled_percent': args.sample, 'columns': results},
+                             indent=2, default=str))
+        else:
+            print_report(results)
+            print(f'\n📊 Total data orphan: {"~" if args.sample else ""}{total}')
+
+        if args.fix and total > 0:
+            conn = pool.getconn()
+            try:
+                conn.autocommit = False
+                for r in results:
+                    if r['orphan_rows'] == 0:
+                        continue
+                    deleted = delete_orphans(conn, r['table'], r['column'], args.chunk_size)
+                    print(f'   ✅ {r["table"]}.{r["column"]}: {deleted} row(s) deleted')
+            finally:
+                pool.putconn(conn)
+        elif not args.json:
+            if total > 0:
+                print(f'\n⚠️  Ada {total} data orphan dari member yang dihapus sebelum migrasi')
+                print('💡 Jalankan dengan --fix untuk membersihkan secara bertahap')
+            else:
+                print('\n✅ Tidak ada data orphan! Database sudah bersih')
+    finally:
+        pool.closeall()
+
     return total
 
+
 if __name__ == '__main__':
     check_orphaned_data()
@@ -0,0 +1,163 @@
+"""
+One-pass, multi-rule rewriting engine for the Next.js sources.
+
+A Rule is a regex plus a replacement, gated by literal substrings that must
+all appear in the file before any regex work is done. For each file, the
+rules whose literals are present are compiled into one alternation
+(cached per rule combination) and applied in a single left-to-right scan.
+The file is tokenized once (js_tokens.py): a match that starts inside a
+string, template literal, comment or regex literal, or ends part-way into
+one, is discarded, so commented-out code and message strings are never
+rewritten. Accepted matches become Edit spans that are applied in one
+batch at the end:
+
+    from codemod import Codemod
+    from codemod_rules import RULE_SETS
+
+    codemod = Codemod(RULE_SETS['userid'] + RULE_SETS['clerk-id'])
+    new_text, hits = codemod.rewrite('src/app/api/x/route.js', text)
+    edits = codemod.edits('src/app/api/x/route.js', text)     # [Edit(start, end, text, rule)]
+
+Rules do not see each other's output (there is no second pass), so at any
+position the first rule in list order wins. Put specific rules before
+general ones. Rule patterns must not use backreferences.
+
+plan_file() is the per-file unit of work (read, compute edits); it is what
+run-codemods.py hands to source_tree.process_files for --jobs. Files are
+only written later, in one batch, by edit_plan.apply_plan().
+"""
+
+import fnmatch
+import hashlib
+import re
+from collections import Counter, namedtuple
+from functools import lru_cache
+
+import js_tokens
+from edit_plan import Edit, apply_edits, file_plan
+from file_cache import source_version
+from js_tokens import NonCode
+from source_tree import read_source, relative_path
+
+# Engine changes invalidate cached results just like rule changes do
+ENGINE_VERSION = source_version(__file__, js_tokens.__file__)
+
+RewriteContext = namedtuple('RewriteContext', 'path resolver')
+
+
+class Rule:
+    def __init__(self, name, pattern, replacement, literals=(), requires=None, include=None, exclude=None,
+                 description=''):
+        """
+        replacement: a template for Match.expand() ('\\1', '\\g<name>') or a
+                     callable(match, context) -> str, where context is a
+                     RewriteContext (importer path and module resolver)
+        literals:    substrings that must all be present for the rule to run
+        requires:    regex that must also be found in the file (checked after literals)
+        include:     fnmatch patterns on the repo-relative path (None = any file)
+        exclude:     fnmatch patterns on the repo-relative path to leave alone
+        """
+        self.name = name
+        self.pattern = pattern
+        self.regex = re.compile(pattern)
+        self.replacement = replacement
+        self.literals = tuple(literals)
+        self.requires = re.compile(requires) if requires else None
+        self.include = tuple(include) if include else None
+        self.exclude = tuple(exclude or ())
+        self.description = description or name
+
+    def applies_to(self, rel_path, text):
+        if self.include and not any(fnmatch.fnmatch(rel_path, p) for p in self.include):
+            return False
+        if any(fnmatch.fnmatch(rel_path, p) for p in self.exclude):
+            return False
+        if not all(literal in text for literal in self.literals):
+            return False
+        return self.requires is None or self.requires.search(text) is not None
+
+    def replace(self, match, context):
+        if callable(self.replacement):
+            return self.replacement(match, context)
+        return match.expand(self.replacement)
+
+    def __repr__(self):
+        return f'<Rule {self.name}>'
+
+
+@lru_cache(maxsize=256)
+def _combined_regex(rules):
+    """(?P<r0>...)|(?P<r1>...) for a tuple of rules"""
+    return re.compile('|'.join(f'(?P<r{i}>{rule.pattern})' for i, rule in enumerate(rules)))
+
+
+class Codemod:
+    def __init__(self, rules, resolver=None):
+        """resolver: module_resolver.ModuleResolver for rules that rewrite import specifiers"""
+        names = [r.name for r in rules]
+        duplicates = {n for n in names if names.count(n) > 1}
+        if duplicates:
+            raise ValueError(f'Duplicate rule names: {", ".join(sorted(duplicates))}')
+        self.rules = list(rules)
+        self.resolver = resolver
+
+    @property
+    def version(self):
+        """Fingerprint of the rule definitions; cached results from other versions are ignored"""
+        digest = hashlib.sha1(ENGINE_VERSION.encode())
+        for rule in self.rules:
+            replacement = rule.replacement if isinstance(rule.replacement, str) else rule.replacement.__qualname__
+            requires = rule.requires.pattern if rule.requires else None
+            digest.update(repr((rule.name, rule.pattern, replacement, rule.literals, requires,
+                                rule.include, rule.exclude)).encode())
+        if self.resolver is not None:
+            # Import rewrites depend on which modules exist, not just on the file
+            digest.update(repr((sorted(self.resolver.modules), self.resolver.aliases)).encode())
+        return digest.hexdigest()[:16]
+
+    def active_rules(self, rel_path, text):
+        return tuple(rule for rule in self.rules if rule.applies_to(rel_path, text))
+
+    def edits(self, rel_path, text):
+        """Non-overlapping Edits (in file order) for every rule match in code"""
+        rules = self.active_rules(rel_path, text)
+        if not rules:
+            return []
+
+        combined = _combined_regex(rules)
+        non_code = NonCode(text)
+        context = RewriteContext(rel_path, self.resolver)
+        edits = []
+        pos = 0
+        while True:
+            match = combined.search(text, pos)
+            if match is None:
+                break
+            start, end = match.span()
+            span = non_code.containing(start)
+            if span:
+                pos = span[1]
+                continue
+            if non_code.splits(end) or end == start:
+                pos = start + 1
+                continue
+            rule = next(r for i, r in enumerate(rules) if match.group(f'r{i}') is not None)
+            # Re-match with the rule's own regex so its group numbers are its own
+            own = rule.regex.match(text, start)
+            replacement = rule.replace(own, context)
+            if replacement != own.group(0):
+                edits.append(Edit(start, end, replacement, rule.name))
+            pos = end
+        return edits
+
+    def rewrite(self, rel_path, text):
+        """Apply every applicable rule in one scan; returns (new_text, Counter of rule hits)"""
+        edits = self.edits(rel_path, text)
+        return apply_edits(text, edits), Counter(edit.rule for edit in edits)
+
+
+def plan_file(codemod, path):
+    """Per-file unit of work: the file's edits as a JSON-able plan entry (nothing is written)"""
+    rel = relative_path(path)
+    text = read_source(path)
+    return file_plan(rel, text, codemod.edits(rel, text))
@@ -0,0 +1,199 @@
+"""
+Rule sets for codemod.py, ported from the one-off fixer scripts:
+
+  clerk-sso         fix-all-clerk-references.py, fix-remaining-clerk-imports.py,
+                    bulk-fix-clerk-auth.py
+  userid            fix-user-userId-to-id.py
+  clerk-id          migrate-clerk-id-to-google-id.py
+  prisma-singleton  fix-prisma-connections.py, fix-prisma-singleton.py
+  import-paths      fix-prisma-imports.py, plus the relative-lib warning from
+                    validate-lib-imports.py
+
+The old scripts ran their substitutions one after another, so a later
+pattern could match the output of an earlier one. Here all rules run in a
+single scan, which is why the patterns below match the original source
+forms directly (e.g. 'clerk_id: user.userId' is handled by the userid set
+instead of relying on clerk-id to rename it first). RULE_SETS lists the
+sets in priority order.
+
+Import specifiers are never spelled out by depth: the rules ask the
+codemod's ModuleResolver for the canonical specifier of the target from
+the file being rewritten.
+"""
+
+from codemod import Rule
+
+API_ROUTES = ('src/app/api/*',)
+FRONTEND = ('src/app/*', 'src/components/*', 'src/hooks/*')
+SSO_AUTH_IMPORT = "import { getCurrentUser } from '@/lib/ssoAuth';"
+SSO_HOOK_IMPORT = "import { useSSOUser } from '@/hooks/useSSOUser';"
+# The shared client, and the older copy whose importers should move to it
+PRISMA_MODULE = 'lib/prisma.js'
+LEGACY_PRISMA_MODULES = ('src/utils/prisma.js',)
+# The modules that own a PrismaClient on purpose
+PRISMA_SINGLETONS = ('lib/prisma*.js', 'src/utils/prisma.js')
+PRISMA_INSTANCE = r'const\s+prisma\s*=\s*new\s+PrismaClient\s*\(\s*\)'
+# Files whose clerkUser / clerkId identifiers are the ones the old scripts renamed
+CLERK_USER_ASSIGNMENT = r'const\s+clerkUser\s*=\s*await\s+currentUser\s*\(\s*\)'
+CLERK_ID_DECLARATION = r'\bconst\s+clerkId\s*='
+
+
+def prisma_import(match, context):
+    return f"import prisma from '{context.resolver.specifier_for(context.path, PRISMA_MODULE)}';"
+
+
+def canonical_prisma_specifier(match, context):
+    """Any import of a Prisma singleton -> the canonical specifier of lib/prisma.js"""
+    prefix, quote, specifier = match.groups()
+    target = context.resolver.resolve(context.path, specifier)
+    if target != PRISMA_MODULE and target not in LEGACY_PRISMA_MODULES:
+        return match.group(0)
+    return f'{prefix}{quote}{context.resolver.specifier_for(context.path, PRISMA_MODULE)}{quote}'
+
+
+def canonical_cross_root_specifier(match, context):
+    """'../' imports that leave the importer's root (src/ <-> lib/) -> alias"""
+    prefix, quote, specifier = match.groups()
+    target = context.resolver.resolve(context.path, specifier)
+    if target is None or target.split('/')[0] == context.path.split('/')[0]:
+        return match.group(0)
+    return f'{prefix}{quote}{context.resolver.specifier_for(context.path, target)}{quote}'
+
+
+CLERK_SSO = [
+    Rule('clerk-server-import',
+         r"import\s*\{\s*(?:auth|currentUser)(?:\s*,\s*(?:auth|currentUser))?\s*\}\s*"
+         r"from\s*['\"]@clerk/nextjs(?:/server)?['\"];?",
+         SSO_AUTH_IMPORT,
+         literals=('@clerk/nextjs',),
+         include=API_ROUTES,
+         description="Clerk auth/currentUser import -> getCurrentUser from '@/lib/ssoAuth'"),
+    Rule('clerk-hook-import',
+         r"import\s*\{\s*(?:useUser|useAuth|useSession)(?:\s*,\s*(?:useUser|useAuth|useSession))*\s*\}\s*"
+         r"from\s*['\"]@clerk/nextjs['\"];?",
+         SSO_HOOK_IMPORT,
+         literals=('@clerk/nextjs',),
+         description="Clerk hook import -> useSSOUser from '@/hooks/useSSOUser'"),
+    Rule('clerk-hook-call',
+         r'\b(?:useUser|useAuth)\s*\(',
+         'useSSOUser(',
+         literals=('@clerk/nextjs',),
+         include=FRONTEND,
+         description='useUser()/useAuth() -> useSSOUser() in files still importing Clerk'),
+    Rule('auth-destructure',
+         r'const\s*\{\s*userId\s*\}\s*=\s*(?:await\s+)?auth\s*\(\s*\)\s*;',
+         'const user = await getCurrentUser(request);',
+         literals=('userId', 'auth('),
+         include=API_ROUTES,
+         description='const { userId } = await auth() -> const user = await getCurrentUser(request)'),
+    Rule('clerk-user-assignment',
+         r'const\s+clerkUser\s*=\s*await\s+currentUser\s*\(\s*\)\s*;',
+         'const user = await getCurrentUser(request);',
+         literals=('clerkUser', 'currentUser('),
+         include=API_ROUTES,
+         description='const clerkUser = await currentUser() -> const user = await getCurrentUser(request)'),
+    Rule('current-user-call',
+         r'await\s+currentUser\s*\(\s*\)',
+         'await getCurrentUser(request)',
+         literals=('currentUser(',),
+         include=API_ROUTES,
+         description='await currentUser() -> await getCurrentUser(request)'),
+    Rule('clerk-user-rename',
+         r'\bclerkUser\b',
+         'user',
+         literals=('clerkUser',),
+         requires=CLERK_USER_ASSIGNMENT,
+         include=API_ROUTES,
+         description='clerkUser -> user in routes that assign it from currentUser()'),
+    Rule('user-id-guard',
+         r'if\s*\(\s*!userId\s*\)',
+         'if (!user)',
+         literals=('auth(', '!userId'),
+         include=API_ROUTES,
+         description='if (!userId) -> if (!user) where auth() is still called'),
+    Rule('handler-request-param',
+         r'export\s+async\s+function\s+(GET|POST|PUT|PATCH|DELETE)\s*\(\s*\)',
+         r'export async function \1(request)',
+         literals=('export async function',),
+         include=API_ROUTES,
+         description='Route handlers without a parameter get (request)'),
+]
+
+USERID = [
+    Rule('where-user-id',
+         r'where:\s*\{\s*(?:google_id|clerk_id):\s*user\.userId\s*\}',
+         'where: { id: user.id }',
+         literals=('user.userId',),
+         description='where: { google_id|clerk_id: user.userId } -> where: { id: user.id }'),
+    Rule('google-id-user-id',
+         r'\b(?:google_id|clerk_id):\s*user\.userId(?![.\w])',
+         'google_id: user.google_id',
+         literals=('user.userId',),
+         description='google_id|clerk_id: user.userId -> google_id: user.google_id'),
+    Rule('member-id-user-id',
+         r'\b(member_id|memberId):\s*user\.userId(?![.\w])',
+         r'\1: user.id',
+         literals=('user.userId',),
+         description='member_id|memberId: user.userId -> user.id'),
+]
+
+CLERK_ID = [
+    Rule('clerk-id-key',
+         r'\bclerk_id\s*:',
+         'google_id:',
+         literals=('clerk_id',),
+         description='clerk_id: -> google_id:'),
+    Rule('clerk-id-variable',
+         r'\bclerkId\b',
+         'googleId',
+         literals=('clerkId',),
+         requires=CLERK_ID_DECLARATION,
+         description='clerkId -> googleId in files that declare const clerkId'),
+]
+
+PRISMA_SINGLETON = [
+    Rule('prisma-client-import',
+         r"import\s*\{\s*PrismaClient\s*\}\s*from\s*['\"]@prisma/client['\"];?",
+         prisma_import,
+         literals=('@prisma/client', 'new PrismaClient('),
+         requires=PRISMA_INSTANCE,
+         exclude=PRISMA_SINGLETONS,
+         description="PrismaClient import -> shared client from '@/lib/prisma'"),
+    Rule('prisma-client-instance',
+         PRISMA_INSTANCE + r'\s*;?[ \t]*\r?\n?',
+         '',
+         literals=('@prisma/client', 'new PrismaClient('),
+         requires=PRISMA_INSTANCE,
+         exclude=PRISMA_SINGLETONS,
+         description='Drop the per-file new PrismaClient()'),
+]
+
+IMPORT_PATHS = [
+    Rule('prisma-import-path',
+         r"""(\bimport\s+prisma\s+from\s*)(['"])([^'"\n]+)['"]""",
+         canonical_prisma_specifier,
+         literals=('import prisma',),
+         exclude=PRISMA_SINGLETONS,
+         description="import prisma from <any path to a singleton> -> canonical lib/prisma.js specifier"),
+    Rule('cross-root-relative-import',
+         r"""(\bfrom\s*|\bimport\s*\(?\s*|\brequire\s*\(\s*)(['"])(\.\./[^'"\n]*)['"]""",
+         canonical_cross_root_specifier,
+         literals=('../',),
+         description="'../../lib/x' style imports across src/ and lib/ -> '@/lib/x'"),
+]
+
+RULE_SETS = {
+    'clerk-sso': CLERK_SSO,
+    'userid': USERID,
+    'clerk-id': CLERK_ID,
+    'prisma-singleton': PRISMA_SINGLETON,
+    'import-paths': IMPORT_PATHS,
+}
+
+
+def select_rules(names=None):
+    """Rules for the given set names (all sets when None), in RULE_SETS order"""
+    unknown = set(names or ()) - set(RULE_SETS)
+    if unknown:
+        raise ValueError(f'Unknown rule set(s): {", ".join(sorted(unknown))}')
+    return [rule for name, rules in RULE_SETS.items() if names is None or name in names for rule in rules]
@@ -0,0 +1,212 @@
+"""
+Connection monitoring and threshold-based reaping for pg_stat_activity.
+
+Unlike the old kill-all scripts this only terminates backends that have been
+idle (or idle in transaction) for longer than the configured thresholds, so
+healthy Prisma pool connections and running queries are left alone.
+"""
+
+import csv
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+# Defaults chosen to sit well above Prisma's own pool idle timeout
+DEFAULT_THRESHOLDS = {
+    'idle_seconds': 600,                 # plain idle connections
+    'idle_in_transaction_seconds': 60,   # open transaction doing nothing
+    'max_age_seconds': None,             # backend age, only applied to idle backends
+}
+
+IDLE_STATES = ('idle', 'idle in transaction', 'idle in transaction (aborted)')
+
+SAMPLE_QUERY = """
+    SELECT
+        pid,
+        usename,
+        COALESCE(NULLIF(application_name, ''), '(none)') AS application_name,
+        COALESCE(host(client_addr), 'local') AS client_addr,
+        COALESCE(state, 'unknown') AS state,
+        EXTRACT(EPOCH FROM (now() - state_change))::float AS state_seconds,
+        EXTRACT(EPOCH FROM (now() - xact_start))::float AS xact_seconds,
+        EXTRACT(EPOCH FROM (now() - backend_start))::float AS backend_seconds
+    FROM pg_stat_activity
+    WHERE datname = %s
+      AND backend_type = 'client backend'
+      AND pid <> pg_backend_pid()
+"""
+
+SAMPLE_FIELDS = (
+    'pid', 'usename', 'application_name', 'client_addr', 'state',
+    'state_seconds', 'xact_seconds', 'backend_seconds'
+)
+
+
+def sample_connections(cursor, db_name):
+    """Take one snapshot of client backends connected to db_name"""
+    cursor.execute(SAMPLE_QUERY, (db_name,))
+    return [dict(zip(SAMPLE_FIELDS, row)) for row in cursor.fetchall()]
+
+
+def aggregate_samples(samples):
+    """
+    Group a snapshot by (application_name, client_addr, state).
+    Returns a list of dicts sorted by connection count, largest first.
+    """
+    groups = defaultdict(lambda: {'count': 0, 'max_idle_seconds': 0.0, 'max_idle_in_transaction_seconds': 0.0})
+
+    for sample in samples:
+        key = (sample['application_name'], sample['client_addr'], sample['state'])
+        group = groups[key]
+        group['count'] += 1
+
+        seconds = sample['state_seconds'] or 0.0
+        if sample['state'] == 'idle':
+            group['max_idle_seconds'] = max(group['max_idle_seconds'], seconds)
+        elif sample['state'].startswith('idle in transaction'):
+            group['max_idle_in_transaction_seconds'] = max(group['max_idle_in_transaction_seconds'], seconds)
+
+    rows = [
+        {'application_name': app, 'client_addr': addr, 'state': state, **stats}
+        for (app, addr, state), stats in groups.items()
+    ]
+    rows.sort(key=lambda r: (-r['count'], r['application_name'], r['client_addr'], r['state']))
+    return rows
+
+
+def reap_reason(sample, thresholds):
+    """Return why a backend should be terminated, or None to keep it"""
+    state = sample['state']
+    state_seconds = sample['state_seconds'] or 0.0
+
+    if state not in IDLE_STATES:
+        # Never kill a backend that is actively running a query
+        return None
+
+    idle_in_txn_limit = thresholds.get('idle_in_transaction_seconds')
+    if state != 'idle' and idle_in_txn_limit is not None and state_seconds >= idle_in_txn_limit:
+        return f'{state} for {state_seconds:.0f}s'
+
+    idle_limit = thresholds.get('idle_seconds')
+    if state == 'idle' and idle_limit is not None and state_seconds >= idle_limit:
+        return f'idle for {state_seconds:.0f}s'
+
+    max_age = thresholds.get('max_age_seconds')
+    if max_age is not None and (sample['backend_seconds'] or 0.0) >= max_age:
+        return f'backend age {sample["backend_seconds"]:.0f}s'
+
+    return None
+
+
+def select_victims(samples, thresholds, protected_apps=()):
+    """List (sample, reason) pairs for backends over the thresholds"""
+    victims = []
+    for sample in samples:
+        if sample['application_name'] in protected_apps:
+            continue
+        reason = reap_reason(sample, thresholds)
+        if reason:
+            victims.append((sample, reason))
+    return victims
+
+
+def terminate_backends(cursor, pids):
+    """Terminate the given pids in one round trip; returns the pids actually killed"""
+    if not pids:
+        return []
+    cursor.execute(
+        "SELECT pid FROM unnest(%s::int[]) AS pid WHERE pg_terminate_backend(pid)",
+        (list(pids),)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def append_time_series(csv_path, sampled_at, aggregates, killed_count=0):
+    """Append one snapshot to a CSV file (one row per group) for plotting"""
+    path = Path(csv_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_header = not path.exists() or path.stat().st_size == 0
+
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if write_header:
+            writer.writerow([
+                'sampled_at', 'application_name', 'client_addr', 'state', 'count',
+                'max_idle_seconds', 'max_idle_in_transaction_seconds', 'killed'
+            ])
+        timestamp = sampled_at.isoformat(timespec='seconds')
+        for row in aggregates:
+            writer.writerow([
+                timestamp, row['application_name'], row['client_addr'], row['state'], row['count'],
+                round(row['max_idle_seconds'], 1), round(row['max_idle_in_transaction_seconds'], 1),
+                killed_count
+            ])
+
+
+def reap_once(cursor, db_name, thresholds, reap=False, protected_apps=()):
+    """
+    Sample, aggregate and (optionally) terminate in one step.
+    Returns (samples, aggregates, victims, killed_pids).
+    """
+    samples = sample_connections(cursor, db_name)
+    aggregates = aggregate_samples(samples)
+    victims = select_victims(samples, thresholds, protected_apps)
+    killed = terminate_backends(cursor, [s['pid'] for s, _ in victims]) if reap else []
+    return samples, aggregates, victims, killed
+
+
+def print_snapshot(sampled_at, db_name, samples, aggregates, victims, killed, reap):
+    """Print one monitor tick in the same style as the other DB scripts"""
+    print(f'\n🕒 {sampled_at:%Y-%m-%d %H:%M:%S} | {db_name} | {len(samples)} connection(s)')
+    print('-' * 100)
+    print(f'{"APPLICATION":<30} {"CLIENT":<18} {"STATE":<30} {"COUNT":>5} {"IDLE MAX":>9} {"TXN MAX":>8}')
+    for row in aggregates:
+        print(
+            f'{row["application_name"][:30]:<30} {row["client_addr"][:18]:<18} {row["state"][:30]:<30} '
+            f'{row["count"]:>5} {row["max_idle_seconds"]:>8.0f}s {row["max_idle_in_transaction_seconds"]:>7.0f}s'
+        )
+
+    if not victims:
+        print('✅ No connections over the thresholds')
+        return
+
+    killed_set = set(killed)
+    verb = 'Terminated' if reap else 'Would terminate'
+    print(f'\n🔪 {verb} {len(killed) if reap else len(victims)} connection(s):')
+    for sample, reason in victims:
+        if reap and sample['pid'] not in killed_set:
+            icon = '⚠️ '
+        else:
+            icon = '✅' if reap else '🧪'
+        print(f'  {icon} PID {sample["pid"]}: {sample["application_name"]} | {sample["client_addr"]} | {reason}')
+
+
+def run_monitor(conn, db_name, thresholds, interval=10, iterations=None, reap=False,
+                csv_path=None, protected_apps=()):
+    """
+    Sample pg_stat_activity every `interval` seconds.
+    Runs forever when iterations is None; Ctrl+C stops cleanly.
+    """
+    cursor = conn.cursor()
+    tick = 0
+    total_killed = 0
+    try:
+        while iterations is None or tick < iterations:
+            sampled_at = datetime.now()
+            samples, aggregates, victims, killed = reap_once(cursor, db_name, thresholds, reap, protected_apps)
+            total_killed += len(killed)
+
+            print_snapshot(sampled_at, db_name, samples, aggregates, victims, killed, reap)
+            if csv_path:
+                append_time_series(csv_path, sampled_at, aggregates, len(killed))
+
+            tick += 1
+            if iterations is None or tick < iterations:
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        print('\n⏹️  Monitor stopped')
+    finally:
+        cursor.close()
+
+    return total_killed
@@ -0,0 +1,106 @@
+"""
+Shared PostgreSQL helpers for the Python maintenance scripts.
+
+Scripts in this folder are run as `python scripts/<name>.py`, so this
+module is importable with a plain `from db_utils import get_db_connection`.
+"""
+
+import itertools
+import os
+from pathlib import Path
+from urllib.parse import urlparse
+
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables from the repository .env file
+env_path = Path(__file__).parent.parent / '.env'
+load_dotenv(env_path)
+
+# Tag every script connection so it is easy to spot in pg_stat_activity
+DEFAULT_APPLICATION_NAME = 'berkomunitas-scripts'
+
+# Column names that point at members.id by convention, even without a constraint
+LOGICAL_MEMBER_FK_COLUMNS = ('id_member', 'member_id', 'author_id')
+
+# Unique names for server-side cursors opened by stream_rows()
+_cursor_ids = itertools.count(1)
+
+
+def parse_database_url(url, database=None):
+    """Parse PostgreSQL connection string (Prisma query params are dropped)"""
+    result = urlparse(url)
+    return {
+        'host': result.hostname,
+        'port': result.port or 5432,
+        'database': database or result.path[1:].split('?')[0],
+        'user': result.username,
+        'password': result.password
+    }
+
+
+def get_database_name():
+    """Name of the target database from DATABASE_URL"""
+    return parse_database_url(get_database_url())['database']
+
+
+def get_database_url():
+    """Read DATABASE_URL or fail with a clear message"""
+    url = os.getenv('DATABASE_URL')
+    if not url:
+        raise RuntimeError('DATABASE_URL not found in environment')
+    return url
+
+
+def get_db_connection(database=None, autocommit=False, application_name=DEFAULT_APPLICATION_NAME):
+    """
+    Open a psycopg2 connection from DATABASE_URL.
+    Pass `database='postgres'` to connect to the maintenance database instead
+    of the target one (useful when the target has no free slots).
+    """
+    params = parse_database_url(get_database_url(), database=database)
+    conn = psycopg2.connect(application_name=application_name, **params)
+    conn.autocommit = autocommit
+    return conn
+
+
+def stream_rows(conn, query, params=None, itersize=2000, name=None):
+    """
+    Yield rows from a named (server-side) cursor instead of fetchall().
+
+    Rows are pulled from the server `itersize` at a time, so a full-table scan
+    runs in constant memory and the first rows are available immediately.
+    The cursor lives inside the connection's transaction, so the connection
+    must not be in autocommit mode and must not be committed mid-stream.
+    Use stream_pages() when the caller does slow work (HTTP, uploads) per row.
+    """
+    cursor = conn.cursor(name=name or f'stream_{next(_cursor_ids)}')
+    cursor.itersize = itersize
+    try:
+        cursor.execute(query, params)
+        for row in cursor:
+            yield row
+    finally:
+        cursor.close()
+
+
+def stream_pages(conn, query, params=None, page_size=500, key=lambda row: row[0]):
+    """
+    Yield rows in keyset pages, ending the transaction after every page.
+
+    The query filters on `<key> > %(after)s`, orders by the key and ends in
+    LIMIT %(limit)s; key(row) gives the next page's start. Nothing stays open
+    while the caller works on the rows, so per-row network I/O never leaves
+    the session idle in transaction (and the reaper alone).
+    """
+    params = dict(params or {})
+    after = params.pop('after', 0)
+    while True:
+        with conn.cursor() as cursor:
+            cursor.execute(query, {**params, 'after': after, 'limit': page_size})
+            rows = cursor.fetchall()
+        conn.commit()
+        yield from rows
+        if len(rows) < page_size:
+            return
+        after = key(rows[-1])
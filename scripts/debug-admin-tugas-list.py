@@ -2,7 +2,7 @@
 """
 Debug script untuk menganalisis kenapa list tugas tidak muncul di admin panel.
 Checks:
-1. API endpoint response
+1. API route handlers (auth, privilege check, queries, pagination - via route_analyzer.py)
 2. Database query
 3. User privileges
 """
@@ -11,55 +11,65 @@ import os
 import sys
 from pathlib import Path
 
+from route_analyzer import analyze_file, handler_findings
+
+API_ROUTE = 'src/app/api/admin/tugas/route.js'
+
 def check_api_file():
-    """Check API route file for potential issues."""
+    """Check API route handlers with the static route analyzer."""
     print("=" * 80)
     print("CHECKING: /api/admin/tugas/route.js")
     print("=" * 80)
     print()
     
-    api_file = Path(__file__).parent.parent / 'src/app/api/admin/tugas/route.js'
+    api_file = Path(__file__).parent.parent / API_ROUTE
     
     if not api_file.exists():
         print("❌ File not found!")
         return
     
-    with open(api_file, 'r', encoding='utf-8') as f:
-        content = f.read()
+    route = analyze_file(api_file)
+    handlers = {handler['method']: handler for handler in route['handlers']}
+    get = handlers.get('GET')
     
     issues = []
     
-    # Check 1: Has getCurrentUser?
-    if 'getCurrentUser' not in content:
-        issues.append("❌ Missing getCurrentUser import/call")
-    else:
-        print("✅ Has getCurrentUser")
-    
-    # Check 2: Has admin privilege check?
-    if 'user_privileges' not in content:
-        issues.append("❌ Missing admin privilege check")
-    elif 'member_id: user.id' not in content:
-        issues.append("⚠️  Using wrong field for user_privileges (should be member_id)")
-    else:
-        print("✅ Has admin privilege check with member_id")
-    
-    # Check 3: Has prisma query?
-    if 'prisma.tugas' not in content:
-        issues.append("❌ Missing prisma.tugas query")
-    else:
-        print("✅ Has prisma.tugas query")
-    
-    # Check 4: Returns correct response?
-    if 'NextResponse.json' not in content:
-        issues.append("❌ Missing NextResponse.json")
-    else:
-        print("✅ Returns NextResponse.json")
-    
-    # Check 5: Has pagination?
-    if 'page' not in content or 'limit' not in content:
-        issues.append("⚠️  Missing pagination params")
+    if get is None:
+        issues.append("❌ No exported GET handler")
     else:
-        print("✅ Has pagination")
+        # Check 1: Has getCurrentUser?
+        if 'getCurrentUser' not in get['auth']:
+            issues.append("❌ GET does not call getCurrentUser")
+        else:
+            print("✅ GET calls getCurrentUser")
+        
+        # Check 2: Has admin privilege check on member_id?
+        privilege_calls = [c for c in get['prisma'] if c['model'] == 'user_privileges']
+        if not get['privileges']:
+            issues.append("❌ Missing admin privilege check")
+        elif privilege_calls and not any('member_id' in ((c['options'] or {}).get('where') or {})
+                                         for c in privilege_calls):
+            issues.append("⚠️  Using wrong field for user_privileges (should be member_id)")
+        else:
+            print(f"✅ Has admin privilege check ({', '.join(get['privileges'])})")
+        
+        # Check 3: Queries tugas?
+        tugas_calls = [c for c in get['prisma'] if c['model'] and c['model'].startswith('tugas')]
+        if not tugas_calls:
+            issues.append("❌ GET has no prisma.tugas* query")
+        else:
+            print("✅ Queries " + ", ".join(f"{c['model']}.{c['method']}" for c in tugas_calls))
+        
+        # Check 4: Has pagination?
+        if 'page' not in get['pagination'] or 'limit' not in get['pagination']:
+            issues.append("⚠️  Missing pagination params")
+        else:
+            print("✅ Has pagination")
+    
+    # Check 5: Unbounded queries / N+1 / auth in every handler
+    for handler in route['handlers']:
+        for kind, line, message in handler_findings(handler):
+            issues.append(f"⚠️  {handler['method']} line {line}: {message}")
     
     print()
     if issues:
@@ -68,6 +78,7 @@ def check_api_file():
             print(f"   {issue}")
     else:
         print("✅ API file looks good!")
+    print("   (whole API: python scripts/analyze-api-routes.py)")
     
     print()
 
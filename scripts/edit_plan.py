@@ -0,0 +1,127 @@
+"""
+Edit plans: codemod output computed in memory, shown as a diff, applied
+atomically, and replayable on another checkout.
+
+A plan is plain JSON:
+
+    {"version": "<codemod version>", "rules": [...],
+     "files": [{"path": "src/...", "sha1": "<of the original>",
+                "edits": [[start, end, "replacement", "rule"], ...]}]}
+
+Offsets are character offsets into the original file, so a plan only
+applies to a file whose sha1 still matches. apply_plan() checks every
+file and writes every new version to a temp file next to it before the
+first os.replace(). A stale file or a failed write leaves the tree
+untouched.
+
+    plan = new_plan(codemod, file_plans)
+    sys.stdout.writelines(plan_diff(plan))
+    apply_plan(plan)
+    save_plan(plan, 'clerk.plan.json'); apply_plan(load_plan('clerk.plan.json'))
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import tempfile
+from collections import namedtuple
+
+from source_tree import REPO_ROOT, read_source
+
+PLAN_FORMAT = 1
+
+Edit = namedtuple('Edit', 'start end text rule')
+
+
+class StalePlanError(Exception):
+    """A file no longer matches the content the plan was computed from"""
+
+
+def apply_edits(text, edits):
+    """Splice non-overlapping Edits into text in one pass"""
+    pieces = []
+    pos = 0
+    for edit in sorted(edits, key=lambda e: (e.start, e.end)):
+        if edit.start < pos:
+            raise ValueError(f'Overlapping edit at offset {edit.start} ({edit.rule})')
+        pieces.append(text[pos:edit.start])
+        pieces.append(edit.text)
+        pos = edit.end
+    pieces.append(text[pos:])
+    return ''.join(pieces)
+
+
+def text_sha1(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def file_plan(rel_path, text, edits):
+    return {'path': rel_path, 'sha1': text_sha1(text), 'edits': [list(edit) for edit in edits]}
+
+
+def new_plan(codemod, file_plans):
+    """Plan from per-file plans (files without edits are dropped)"""
+    return {
+        'format': PLAN_FORMAT,
+        'version': codemod.version,
+        'rules': [rule.name for rule in codemod.rules],
+        'files': [fp for fp in file_plans if fp['edits']],
+    }
+
+
+def save_plan(plan, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, indent=1, ensure_ascii=False)
+
+
+def load_plan(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        plan = json.load(f)
+    if plan.get('format') != PLAN_FORMAT:
+        raise ValueError(f'{path}: unsupported plan format {plan.get("format")!r}')
+    return plan
+
+
+def _planned_texts(plan, base_dir):
+    """(path, new_text) per planned file, after checking every file is unchanged"""
+    results = []
+    for fp in plan['files']:
+        path = base_dir / fp['path']
+        if not path.exists():
+            raise StalePlanError(f'{fp["path"]}: file is missing')
+        text = read_source(path)
+        if text_sha1(text) != fp['sha1']:
+            raise StalePlanError(f'{fp["path"]}: content changed since the plan was made')
+        results.append((path, fp['path'], text, apply_edits(text, [Edit(*e) for e in fp['edits']])))
+    return results
+
+
+def plan_diff(plan, base_dir=REPO_ROOT, context=3):
+    """Unified diff lines (git-style a/ b/ paths, usable with git apply / patch -p1)"""
+    for _, rel, old, new in _planned_texts(plan, base_dir):
+        yield from difflib.unified_diff(
+            old.splitlines(keepends=True), new.splitlines(keepends=True),
+            fromfile=f'a/{rel}', tofile=f'b/{rel}', n=context,
+        )
+
+
+def apply_plan(plan, base_dir=REPO_ROOT):
+    """Write every planned file via temp file + os.replace; returns the paths written"""
+    staged = []
+    try:
+        for path, _, _, new in _planned_texts(plan, base_dir):
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.codemod')
+            staged.append((tmp, path))
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                f.write(new)
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+    except BaseException:
+        for tmp, _ in staged:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        raise
+
+    for tmp, path in staged:
+        os.replace(tmp, path)
+    return [path for _, path in staged]
@@ -0,0 +1,143 @@
+"""
+Persistent per-file result cache for the source codemods and validators.
+
+Results are stored in .cache/codemods.sqlite, keyed by (namespace, path)
+and stamped with the file's mtime, size and sha1 plus a version string for
+the rules/checks that produced them. A file is a hit when:
+
+  - mtime and size are unchanged (no read at all), or
+  - mtime moved but the sha1 is the same (checkout, touch); the stamp is
+    refreshed
+
+and the version matches. Only misses are handed to the per-file function,
+so an unchanged tree costs one stat() per file:
+
+    cache = FileCache('validate-lib-imports', source_version(__file__))
+    for path, result in process_files_cached(check_file, paths, cache, jobs=4):
+        ...
+
+Results must be JSON-serialisable (tuples come back as lists).
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+
+from source_tree import REPO_ROOT, process_files, relative_path
+
+CACHE_PATH = REPO_ROOT / '.cache' / 'codemods.sqlite'
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS file_results (
+        namespace  TEXT NOT NULL,
+        path       TEXT NOT NULL,
+        mtime_ns   INTEGER NOT NULL,
+        size       INTEGER NOT NULL,
+        sha1       TEXT NOT NULL,
+        version    TEXT NOT NULL,
+        result     TEXT NOT NULL,
+        checked_at REAL NOT NULL,
+        PRIMARY KEY (namespace, path)
+    )
+"""
+
+
+def file_sha1(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def source_version(*paths):
+    """Version string derived from the source of the checks themselves"""
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class FileCache:
+    def __init__(self, namespace, version, path=CACHE_PATH):
+        self.namespace = namespace
+        self.version = version
+        self.stats = {'hits': 0, 'rehashed': 0, 'misses': 0}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute(SCHEMA)
+        self.rows = {
+            row[0]: row[1:]
+            for row in self.conn.execute(
+                'SELECT path, mtime_ns, size, sha1, version, result FROM file_results WHERE namespace = ?',
+                (namespace,)
+            )
+        }
+
+    def get(self, path):
+        """(True, result) on a hit, (False, None) otherwise"""
+        rel = relative_path(path)
+        row = self.rows.get(rel)
+        if row is None or row[3] != self.version:
+            self.stats['misses'] += 1
+            return False, None
+        mtime_ns, size, sha1, _, result = row
+        stat = path.stat()
+        if (stat.st_mtime_ns, stat.st_size) == (mtime_ns, size):
+            self.stats['hits'] += 1
+            return True, json.loads(result)
+        if stat.st_size == size and file_sha1(path) == sha1:
+            self._store(rel, stat, sha1, result)
+            self.stats['rehashed'] += 1
+            return True, json.loads(result)
+        self.stats['misses'] += 1
+        return False, None
+
+    def put(self, path, result):
+        self._store(relative_path(path), path.stat(), file_sha1(path), json.dumps(result))
+
+    def _store(self, rel, stat, sha1, result):
+        self.rows[rel] = (stat.st_mtime_ns, stat.st_size, sha1, self.version, result)
+        self.conn.execute(
+            'INSERT OR REPLACE INTO file_results VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (self.namespace, rel, stat.st_mtime_ns, stat.st_size, sha1, self.version, result, time.time())
+        )
+
+    def clear(self):
+        self.conn.execute('DELETE FROM file_results WHERE namespace = ?', (self.namespace,))
+        self.rows = {}
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def add_cache_arguments(parser):
+    parser.add_argument('--since', metavar='GIT_REF',
+                        help='Only files changed since this ref (git diff --name-only) plus untracked ones')
+    parser.add_argument('--no-cache', action='store_true', help=f'Ignore and rebuild {CACHE_PATH.name}')
+
+
+def process_files_cached(func, paths, cache, jobs=1, cacheable=None):
+    """
+    process_files() that serves unchanged files from the cache.
+
+    cacheable(result) can veto storing a result, e.g. when func rewrote the
+    file and the result no longer describes what is on disk.
+    """
+    paths = list(paths)
+    results = {}
+    misses = []
+    for path in paths:
+        hit, result = cache.get(path)
+        if hit:
+            results[path] = result
+        else:
+            misses.append(path)
+
+    for path, result in process_files(func, misses, jobs=jobs):
+        if cacheable is None or cacheable(result):
+            cache.put(path, result)
+        results[path] = result
+
+    for path in paths:
+        yield path, results[path]
@@ -4,6 +4,7 @@ Database Relation Migration Script
 Migrates clerk_id-based relations to member_id for SSO compatibility
 """
 
+import argparse
 import os
 import sys
 from dotenv import load_dotenv
@@ -11,6 +12,8 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 from datetime import datetime
 
+from backfill import BackfillRunner, add_backfill_arguments, runner_options
+
 # Load environment variables
 load_dotenv()
 
@@ -126,7 +129,7 @@ def analyze_database_relations():
     
     return True
 
-def migrate_member_emails():
+def migrate_member_emails(backfill_options):
     """Migrate member_emails from clerk_id to member_id"""
     print("\n" + "="*80)
     print("🔄 MIGRATING member_emails TABLE")
@@ -154,17 +157,17 @@ def migrate_member_emails():
         else:
             print("✅ member_id column already exists")
         
-        # Populate member_id from clerk_id
+        # Populate member_id from clerk_id in small committed chunks
         print("\n📝 Populating member_id from clerk_id...")
-        cursor.execute("""
+        runner = BackfillRunner(conn, 'member_emails_member_id', 'member_emails', """
             UPDATE member_emails me
             SET member_id = m.id
             FROM members m
-            WHERE me.clerk_id = m.clerk_id
+            WHERE me.id > %(lo)s AND me.id <= %(hi)s
+            AND me.clerk_id = m.clerk_id
             AND me.member_id IS NULL
-        """)
-        updated = cursor.rowcount
-        conn.commit()
+        """, **backfill_options)
+        updated = runner.run()
         print(f"✅ Updated {updated} records")
         
         # Create foreign key constraint if not exists
@@ -208,7 +211,7 @@ def migrate_member_emails():
         conn.close()
         return False
 
-def migrate_user_privileges():
+def migrate_user_privileges(backfill_options):
     """Migrate user_privileges from clerk_id to member_id"""
     print("\n" + "="*80)
     print("🔄 MIGRATING user_privileges TABLE")
@@ -236,17 +239,17 @@ def migrate_user_privileges():
         else:
             print("✅ member_id column already exists")
         
-        # Populate member_id from clerk_id
+        # Populate member_id from clerk_id in small committed chunks
         print("\n📝 Populating member_id from clerk_id...")
-        cursor.execute("""
+        runner = BackfillRunner(conn, 'user_privileges_member_id', 'user_privileges', """
             UPDATE user_privileges up
             SET member_id = m.id
             FROM members m
-            WHERE up.clerk_id = m.clerk_id
+            WHERE up.id > %(lo)s AND up.id <= %(hi)s
+            AND up.clerk_id = m.clerk_id
             AND up.member_id IS NULL
-        """)
-        updated = cursor.rowcount
-        conn.commit()
+        """, **backfill_options)
+        updated = runner.run()
         print(f"✅ Updated {updated} records")
         
         # Show admin privileges status
@@ -361,6 +364,10 @@ def verify_migration():
 
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description='Migrate clerk_id relations to member_id')
+    add_backfill_arguments(parser)
+    backfill_options = runner_options(parser.parse_args())
+    
     print("\n" + "="*80)
     print("🚀 DATABASE RELATION MIGRATION SCRIPT")
     print("="*80)
@@ -382,12 +389,12 @@ def main():
         sys.exit(0)
     
     # Step 2: Migrate member_emails
-    if not migrate_member_emails():
+    if not migrate_member_emails(backfill_options):
         print("\n❌ member_emails migration failed. Exiting.")
         sys.exit(1)
     
     # Step 3: Migrate user_privileges
-    if not migrate_user_privileges():
+    if not migrate_user_privileges(backfill_options):
         print("\n❌ user_privileges migration failed. Exiting.")
         sys.exit(1)
     
@@ -1,14 +1,27 @@
 #!/usr/bin/env python3
 """
 Fix Prisma connection pooling issue by replacing all 'new PrismaClient()' 
-with singleton import from utils/prisma.js
+with singleton import from lib/prisma.js
 """
 
 import os
 import re
 from pathlib import Path
 
-def fix_prisma_import(content):
+from module_resolver import ModuleResolver
+from source_tree import relative_path
+
+PRISMA_MODULE = 'lib/prisma.js'
+_resolver = None
+
+def get_resolver():
+    """Module index + jsconfig aliases, built once per run"""
+    global _resolver
+    if _resolver is None:
+        _resolver = ModuleResolver.for_tree()
+    return _resolver
+
+def fix_prisma_import(content, filepath):
     """Replace PrismaClient import and instantiation with singleton."""
     
     # Check if file already uses singleton
@@ -34,7 +47,7 @@ def fix_prisma_import(content):
     # Replace import
     content = re.sub(
         import_pattern,
-        "import prisma from '../../../../utils/prisma';  // Singleton Prisma client",
+        f"import prisma from {get_correct_import_path(filepath)};  // Singleton Prisma client",
         content
     )
     
@@ -48,54 +61,22 @@ def fix_prisma_import(content):
     return content
 
 def get_correct_import_path(filepath):
-    """Calculate correct relative path to utils/prisma.js"""
-    
-    # Convert to Path object
-    file_path = Path(filepath)
-    
-    # Get relative path from file to utils/prisma.js
-    try:
-        # Assuming structure: src/app/api/.../route.js
-        # Need to go up to src, then to utils
-        
-        # Count how many levels deep we are in src/app/api/
-        parts = file_path.parts
-        
-        # Find index of 'api' in path
-        if 'api' in parts:
-            api_index = parts.index('api')
-            # Count levels after 'api'
-            levels_deep = len(parts) - api_index - 2  # -2 for 'api' and filename
-            
-            # Generate relative path
-            if levels_deep == 0:
-                return "'../../../utils/prisma'"
-            elif levels_deep == 1:
-                return "'../../../../utils/prisma'"
-            elif levels_deep == 2:
-                return "'../../../../../utils/prisma'"
-            elif levels_deep == 3:
-                return "'../../../../../../utils/prisma'"
-            else:
-                return "'../../../../utils/prisma'"  # Default
-        
-        return "'../../../../utils/prisma'"  # Default
-    except:
-        return "'../../../../utils/prisma'"  # Default
+    """Quoted specifier for lib/prisma.js as seen from filepath"""
+    return f"'{get_resolver().specifier_for(relative_path(filepath), PRISMA_MODULE)}'"
 
 def fix_import_path(content, filepath):
-    """Fix the import path to correct relative path."""
+    """Point any existing import of a Prisma singleton at the canonical specifier."""
     
-    correct_path = get_correct_import_path(filepath)
+    resolver = get_resolver()
+    importer = relative_path(filepath)
     
-    # Replace the placeholder path with correct one
-    content = re.sub(
-        r"from\s+['\"]\.\.\/\.\.\/\.\.\/\.\.\/utils\/prisma['\"]",
-        f"from {correct_path}",
-        content
-    )
+    def canonical(match):
+        target = resolver.resolve(importer, match.group(2))
+        if target not in (PRISMA_MODULE, 'src/utils/prisma.js'):
+            return match.group(0)
+        return f"{match.group(1)}{get_correct_import_path(filepath)}"
     
-    return content
+    return re.sub(r"(import\s+prisma\s+from\s+)['\"]([^'\"]+)['\"]", canonical, content)
 
 def process_file(filepath):
     """Process a single file."""
@@ -105,7 +86,7 @@ def process_file(filepath):
             original = f.read()
         
         # Apply fixes
-        fixed = fix_prisma_import(original)
+        fixed = fix_prisma_import(original, filepath)
         fixed = fix_import_path(fixed, filepath)
         
         if fixed == original:
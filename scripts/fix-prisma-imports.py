@@ -8,30 +8,25 @@ import os
 import re
 from pathlib import Path
 
-def fix_prisma_imports(content):
-    """Replace all relative prisma imports with @/lib/prisma alias."""
-    
-    # Pattern 1: import prisma from '../../../../../utils/prisma';
-    # Pattern 2: import prisma from '../../../../lib/prisma';
-    # Pattern 3: Any relative path to prisma
-    patterns = [
-        r"import\s+prisma\s+from\s+['\"]\.\.\/\.\.\/\.\.\/\.\.\/\.\.\/\.\.\/utils\/prisma['\"];?",
-        r"import\s+prisma\s+from\s+['\"]\.\.\/\.\.\/\.\.\/\.\.\/\.\.\/utils\/prisma['\"];?",
-        r"import\s+prisma\s+from\s+['\"]\.\.\/\.\.\/\.\.\/\.\.\/utils\/prisma['\"];?",
-        r"import\s+prisma\s+from\s+['\"]\.\.\/\.\.\/\.\.\/utils\/prisma['\"];?",
-        r"import\s+prisma\s+from\s+['\"]\.\.\/\.\.\/\.\.\/\.\.\/\.\.\/lib\/prisma(\.js)?['\"];?",
-        r"import\s+prisma\s+from\s+['\"]\.\.\/\.\.\/\.\.\/\.\.\/\.\.\/lib\/prisma(\.js)?['\"];?",
-        r"import\s+prisma\s+from\s+['\"]\.\.\/\.\.\/\.\.\/\.\.\/lib\/prisma(\.js)?['\"];?",
-        r"import\s+prisma\s+from\s+['\"]\.\.\/\.\.\/\.\.\/lib\/prisma(\.js)?['\"];?",
-        r"import\s+prisma\s+from\s+['\"]\.\.\/\.\.\/lib\/prisma(\.js)?['\"];?",
-    ]
+from module_resolver import ModuleResolver
+from source_tree import relative_path
+
+# lib/prisma.js is the shared client; src/utils/prisma.js is the older copy
+PRISMA_MODULES = ('lib/prisma.js', 'src/utils/prisma.js')
+resolver = ModuleResolver.for_tree()
+
+def fix_prisma_imports(content, filepath):
+    """Point every import of a Prisma singleton (any relative depth or alias) at lib/prisma.js."""
     
-    replacement = "import prisma from '@/lib/prisma';"
+    importer = relative_path(filepath)
     
-    for pattern in patterns:
-        content = re.sub(pattern, replacement, content)
+    def canonical(match):
+        target = resolver.resolve(importer, match.group(2))
+        if target not in PRISMA_MODULES:
+            return match.group(0)
+        return f"import prisma from '{resolver.specifier_for(importer, 'lib/prisma.js')}';"
     
-    return content
+    return re.sub(r"import\s+prisma\s+from\s+(['\"])([^'\"]+)['\"];?", canonical, content)
 
 def process_file(filepath):
     """Process a single file."""
@@ -45,7 +40,7 @@ def process_file(filepath):
             return False
         
         # Apply fixes
-        fixed = fix_prisma_imports(original)
+        fixed = fix_prisma_imports(original, filepath)
         
         if fixed == original:
             return False
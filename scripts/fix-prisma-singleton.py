@@ -8,6 +8,12 @@ import os
 import re
 from pathlib import Path
 
+from module_resolver import ModuleResolver
+from source_tree import relative_path
+
+PRISMA_MODULE = 'lib/prisma.js'
+resolver = ModuleResolver.for_tree()
+
 def fix_prisma_import(content, filepath):
     """Replace PrismaClient import and instantiation with singleton import."""
     
@@ -20,6 +26,7 @@ def fix_prisma_import(content, filepath):
         return content, False
     
     changed = False
+    prisma_import = f"import prisma from '{resolver.specifier_for(relative_path(filepath), PRISMA_MODULE)}';"
     
     # Pattern 1: import { PrismaClient } from '@prisma/client'
     # const prisma = new PrismaClient();
@@ -43,7 +50,7 @@ def fix_prisma_import(content, filepath):
             # Add after 'use client'
             content = re.sub(
                 r"(['\"]use client['\"];?\s*\n)",
-                r"\1import prisma from '@/utils/prisma';\n",
+                lambda m: m.group(1) + prisma_import + "\n",
                 content,
                 count=1
             )
@@ -52,10 +59,10 @@ def fix_prisma_import(content, filepath):
             first_import_match = re.search(r"(import\s+.*?;?\s*\n)", content)
             if first_import_match:
                 insert_pos = first_import_match.start()
-                content = content[:insert_pos] + "import prisma from '@/utils/prisma';\n" + content[insert_pos:]
+                content = content[:insert_pos] + prisma_import + "\n" + content[insert_pos:]
             else:
                 # No imports yet, add at top
-                content = "import prisma from '@/utils/prisma';\n\n" + content
+                content = prisma_import + "\n\n" + content
         
         changed = True
     
@@ -1,14 +1,22 @@
 """
 Force kill connections by connecting to postgres database (not target database)
 Use this when target database is completely full and won't accept new connections
+
+By default only connections over the idle thresholds are terminated
+(see monitor-db-connections.py). Pass --all to kill every connection.
 """
 import psycopg2
 from urllib.parse import urlparse
 import os
+import sys
 from dotenv import load_dotenv
 
+from connection_reaper import DEFAULT_THRESHOLDS, select_victims, sample_connections
+
 load_dotenv()
 
+KILL_ALL = '--all' in sys.argv
+
 def force_kill():
     url = os.getenv('DATABASE_URL')
     u = urlparse(url)
@@ -52,13 +60,21 @@ def force_kill():
         pid, user, app, addr, state, state_change, started = row
         print(f'  PID {pid}: {user} | {app} | {addr} | {state} | {started}')
 
-    # Kill ALL connections to target database
-    print(f'\n🔪 Killing {len(connections)} connection(s) to {target_db}...')
+    if KILL_ALL:
+        # Kill ALL connections to target database
+        targets = [row[0] for row in connections]
+    else:
+        # Only kill connections that are idle past the thresholds
+        victims = select_victims(sample_connections(cur, target_db), DEFAULT_THRESHOLDS)
+        targets = [sample['pid'] for sample, _ in victims]
+        for sample, reason in victims:
+            print(f'  💤 PID {sample["pid"]}: {reason}')
+
+    print(f'\n🔪 Killing {len(targets)} connection(s) to {target_db}...')
     
     killed = 0
     errors = 0
-    for row in connections:
-        pid = row[0]
+    for pid in targets:
         try:
             cur.execute("SELECT pg_terminate_backend(%s)", (pid,))
             result = cur.fetchone()[0]
@@ -90,7 +106,10 @@ def force_kill():
     print(f'📊 Remaining: {remaining}')
     print('='*60)
     
-    if remaining == 0:
+    if not KILL_ALL:
+        print('\n✅ Stale connections killed, live pool connections kept.')
+        print('💡 Use --all only if the database is still refusing connections')
+    elif remaining == 0:
         print('\n✅ SUCCESS! All connections killed.')
         print('💡 Now you can restart Next.js: npm run dev')
     else:
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Import graph queries for src/ and lib/
+
+By default, reports every server-only module (@/lib/prisma, @/lib/ssoAuth,
+anything importing @prisma/client) reachable from a 'use client' component,
+directly or through other imports, with the import chain. See
+import_graph.py for how the graph is built and cached.
+
+Usage:
+  python scripts/import-graph.py                          # client/server boundary check
+  python scripts/import-graph.py --dependents @/lib/prisma
+  python scripts/import-graph.py --dependents lib/ssoAuth.js --direct
+  python scripts/import-graph.py --dependencies src/app/page.js
+  python scripts/import-graph.py --unresolved             # local imports that point nowhere
+  python scripts/import-graph.py --json --jobs 0
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from file_cache import CACHE_PATH
+from import_graph import build_graph
+from source_tree import add_jobs_argument
+
+
+def print_modules(title, modules):
+    print(f'\n{title}: {len(modules)}')
+    for module in modules:
+        print(f'   {module}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the src/ + lib/ import graph')
+    query = parser.add_mutually_exclusive_group()
+    query.add_argument('--dependents', metavar='MODULE', help='Modules that import MODULE (path or @/ specifier)')
+    query.add_argument('--dependencies', metavar='MODULE', help='Modules MODULE imports')
+    query.add_argument('--unresolved', action='store_true', help='List local imports that resolve to no file')
+    parser.add_argument('--direct', action='store_true', help='With --dependents: direct importers only')
+    parser.add_argument('--json', action='store_true', help='Print the result as JSON')
+    parser.add_argument('--no-cache', action='store_true', help=f'Rescan every file (rebuilds {CACHE_PATH.name})')
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    graph = build_graph(jobs=args.jobs, use_cache=not args.no_cache)
+    elapsed = time.perf_counter() - started
+
+    if args.dependents or args.dependencies:
+        name = args.dependents or args.dependencies
+        module = graph.find(name)
+        if module is None:
+            print(f'❌ Unknown module: {name}')
+            return 1
+        if args.dependents:
+            result = graph.dependents(module, transitive=not args.direct)
+            title = f'{"Direct importers" if args.direct else "Dependents"} of {module}'
+        else:
+            result = graph.dependencies(module)
+            title = f'Dependencies of {module}'
+        if args.json:
+            print(json.dumps({'module': module, 'modules': result}, indent=2))
+        else:
+            print_modules(f'📦 {title}', result)
+        return 0
+
+    if args.unresolved:
+        if args.json:
+            print(json.dumps(graph.unresolved, indent=2, sort_keys=True))
+        else:
+            for module, specifiers in sorted(graph.unresolved.items()):
+                print(f'📄 {module}: {", ".join(specifiers)}')
+            print(f'\n📊 {sum(len(s) for s in graph.unresolved.values())} unresolved import(s)')
+        return 0
+
+    violations = graph.boundary_violations()
+    if args.json:
+        print(json.dumps(violations, indent=2))
+        return 1 if violations else 0
+
+    print('=' * 60)
+    print('🧭 CLIENT/SERVER IMPORT BOUNDARY')
+    print('=' * 60)
+    edges = sum(len(t) for t in graph.edges.values())
+    print(f'{len(graph.modules)} modules, {edges} imports, {len(graph.client)} client components '
+          f'(built in {elapsed:.2f}s)\n')
+    for v in violations:
+        print(f'❌ {v["component"]} reaches {v["module"]}')
+        print(f'      {" -> ".join(v["chain"])}')
+    if violations:
+        print(f'\n❌ {len(violations)} server-only import(s) reachable from client components')
+        return 1
+    print('✅ No server-only module is reachable from a client component')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
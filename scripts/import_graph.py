@@ -0,0 +1,169 @@
+"""
+Import graph for src/ and lib/ with client/server boundary analysis.
+
+Each file is scanned once for its import/export-from/require/import()
+specifiers (ignoring any inside comments or strings, see js_tokens.py) and
+its 'use client' directive; scans are cached per file in
+.cache/codemods.sqlite (namespace 'import-graph'), so rebuilding the graph
+after a small change only re-reads the changed files. Specifiers are then
+resolved in memory with module_resolver.ModuleResolver.
+
+    graph = build_graph(jobs=4)
+    for violation in graph.boundary_violations():
+        print(violation['component'], ' -> '.join(violation['chain']))
+    graph.dependents('lib/prisma.js')           # everything that reaches it
+
+A client component pulls every module it imports into the browser bundle,
+so a server-only module reachable from one (directly or through any chain
+of imports) is a violation.
+"""
+
+import posixpath
+import re
+from collections import deque
+
+import js_tokens
+from file_cache import FileCache, process_files_cached, source_version
+from js_tokens import NonCode
+from module_resolver import ModuleResolver
+from source_tree import iter_source_files, read_source, relative_path
+
+# Modules that must never end up in a client bundle
+SERVER_ONLY_MODULES = ('lib/prisma.js', 'lib/ssoAuth.js')
+# Importing one of these packages makes a module server-only as well
+SERVER_ONLY_PACKAGES = ('@prisma/client', 'server-only')
+
+IMPORT_PATTERNS = [
+    re.compile(r'''\bimport\s+(?:[\w$*{}\s,]+?\s+from\s*)?['"]([^'"\n]+)['"]'''),
+    re.compile(r'''\bexport\s+(?:\*(?:\s+as\s+[\w$]+)?|\{[^}]*\})\s*from\s*['"]([^'"\n]+)['"]'''),
+    re.compile(r'''\b(?:require|import)\s*\(\s*['"]([^'"\n]+)['"]\s*\)'''),
+]
+USE_CLIENT_RE = re.compile(r'''^(?:\s|//[^\n]*\n|/\*.*?\*/)*['"]use client['"]''', re.DOTALL)
+
+
+def parse_imports(text):
+    """Import specifiers in source order (duplicates removed), skipping commented-out ones"""
+    non_code = NonCode(text)
+    found = []
+    for pattern in IMPORT_PATTERNS:
+        found.extend((m.start(), m.group(1)) for m in pattern.finditer(text) if not non_code.containing(m.start()))
+    seen = set()
+    return [spec for _, spec in sorted(found) if not (spec in seen or seen.add(spec))]
+
+
+def scan_file(path):
+    """Per-file unit of work for the cache/worker pool"""
+    text = read_source(path)
+    return {'imports': parse_imports(text), 'client': bool(USE_CLIENT_RE.match(text))}
+
+
+def package_name(specifier):
+    parts = specifier.split('/')
+    return '/'.join(parts[:2]) if specifier.startswith('@') else parts[0]
+
+
+class ImportGraph:
+    def __init__(self, scans, resolver):
+        """scans: {rel_path: scan_file() result}"""
+        self.modules = sorted(scans)
+        self.resolver = resolver
+        self.client = {rel for rel, scan in scans.items() if scan['client']}
+        self.edges = {rel: [] for rel in self.modules}
+        self.packages = {rel: set() for rel in self.modules}
+        self.unresolved = {}
+        for rel, scan in scans.items():
+            for specifier in scan['imports']:
+                target = resolver.resolve(rel, specifier)
+                if target:
+                    if target not in self.edges[rel]:
+                        self.edges[rel].append(target)
+                elif resolver.is_local(specifier):
+                    # Assets (.css, .json) resolve to nothing as well; only report missing code
+                    if not re.search(r'\.(css|scss|json|svg|png|jpe?g|gif)$', specifier):
+                        self.unresolved.setdefault(rel, []).append(specifier)
+                else:
+                    self.packages[rel].add(package_name(specifier))
+        self.reverse = {rel: [] for rel in self.modules}
+        for rel, targets in self.edges.items():
+            for target in targets:
+                self.reverse[target].append(rel)
+
+    def server_only(self):
+        modules = {m for m in SERVER_ONLY_MODULES if m in self.edges}
+        modules.update(rel for rel, packages in self.packages.items()
+                       if packages.intersection(SERVER_ONLY_PACKAGES) and rel not in self.client)
+        return modules
+
+    def _bfs(self, start, adjacency):
+        """Parent map of everything reachable from start"""
+        parents = {start: None}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for nxt in adjacency.get(node, ()):
+                if nxt not in parents:
+                    parents[nxt] = node
+                    queue.append(nxt)
+        return parents
+
+    @staticmethod
+    def _chain(parents, node):
+        chain = []
+        while node is not None:
+            chain.append(node)
+            node = parents[node]
+        return chain[::-1]
+
+    def boundary_violations(self, server_only=None):
+        """
+        One BFS per client component. Every server-only module it reaches is
+        reported once with the shortest import chain; the search does not
+        continue past a server-only module.
+        """
+        server_only = self.server_only() if server_only is None else set(server_only)
+        violations = []
+        for component in sorted(self.client):
+            for package in sorted(self.packages[component].intersection(SERVER_ONLY_PACKAGES)):
+                violations.append({'component': component, 'module': package, 'chain': [component, package]})
+            parents = {component: None}
+            queue = deque([component])
+            while queue:
+                node = queue.popleft()
+                for nxt in self.edges.get(node, ()):
+                    if nxt in parents:
+                        continue
+                    parents[nxt] = node
+                    if nxt in server_only:
+                        violations.append({'component': component, 'module': nxt,
+                                           'chain': self._chain(parents, nxt)})
+                    else:
+                        queue.append(nxt)
+        return violations
+
+    def find(self, name):
+        """Module for a repo path or an alias specifier ('@/lib/prisma'); None when unknown"""
+        if self.resolver.is_local(name) and not name.startswith('.'):
+            return self.resolver.resolve('', name)
+        return self.resolver.probe(posixpath.normpath(name.replace('\\', '/')))
+
+    def dependencies(self, module):
+        """Everything module imports, directly or transitively"""
+        return sorted(set(self._bfs(module, self.edges)) - {module})
+
+    def dependents(self, module, transitive=True):
+        """Modules importing module (directly, or through any chain when transitive)"""
+        if not transitive:
+            return sorted(self.reverse.get(module, ()))
+        return sorted(set(self._bfs(module, self.reverse)) - {module})
+
+
+def build_graph(jobs=1, use_cache=True):
+    paths = list(iter_source_files())
+    cache = FileCache('import-graph', source_version(__file__, js_tokens.__file__))
+    if not use_cache:
+        cache.clear()
+    try:
+        scans = {relative_path(path): scan for path, scan in process_files_cached(scan_file, paths, cache, jobs=jobs)}
+    finally:
+        cache.close()
+    return ImportGraph(scans, ModuleResolver.for_tree(list(scans)))
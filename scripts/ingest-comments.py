@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Bulk-load scraped comments from JSONL into the comments table
+
+Records are streamed from the file, COPYed batch by batch into a temp
+staging table and merged with a single INSERT ... SELECT ... ON CONFLICT DO
+NOTHING per batch. Both unique keys (comment_id and comment_id+partner_id)
+are covered by the bare ON CONFLICT. id_member is resolved from
+profil_sosial_media.username_sosmed in the same statement, unless the
+record already carries one. Values are checked against the column types
+while reading, so a record that would fail a cast (bad timestamp,
+non-integer id, over-long varchar) is rejected and reported rather than
+aborting its batch.
+
+One JSON object per line. Keys are the comments columns; the Graph API
+names id / text / timestamp / from.username are accepted as well:
+
+  {"comment_id": "179...", "username": "budi", "comment": "Mantap!",
+   "comment_timestamp": "2025-01-05T10:00:00+0000", "id_task": 42, ...}
+
+Usage:
+  python scripts/ingest-comments.py comments.jsonl
+  python scripts/ingest-comments.py dump1.jsonl dump2.jsonl --batch-size 50000
+  cat comments.jsonl | python scripts/ingest-comments.py -
+  python scripts/ingest-comments.py comments.jsonl --dry-run    # merge, then roll back
+"""
+
+import argparse
+import csv
+import io
+import json
+import re
+import sys
+import time
+from datetime import datetime
+
+from db_utils import get_db_connection
+
+# Staging columns in COPY order, with the cast applied during the merge
+COMMENT_COLUMNS = {
+    'comment_id': 'text',
+    'permalink': 'text',
+    'post_timestamp': 'timestamptz',
+    'comment_timestamp': 'timestamptz',
+    'username': 'varchar(255)',
+    'comment': 'text',
+    'source_profile_link': 'text',
+    'platform': 'varchar(50)',
+    'id_task': 'integer',
+    'id_member': 'integer',
+    'is_reply': 'boolean',
+    'parent_comment_id': 'varchar(255)',
+    'partner_name': 'varchar(255)',
+    'partner_id': 'varchar(100)',
+    'submission_id': 'integer',
+}
+
+# Graph API / scraper field names -> comments columns
+FIELD_ALIASES = {
+    'id': 'comment_id',
+    'text': 'comment',
+    'message': 'comment',
+    'timestamp': 'comment_timestamp',
+    'created_time': 'comment_timestamp',
+    'parent_id': 'parent_comment_id',
+}
+
+INT4_RANGE = (-2**31, 2**31 - 1)
+BOOLEAN_VALUES = {'true': True, 't': True, '1': True, 'false': False, 'f': False, '0': False}
+# "+0000" / "Z" offsets, as the Graph API writes them
+UTC_OFFSET = re.compile(r'(?:Z|([+-]\d{2})(\d{2}))$')
+# First rejected lines printed in the summary
+MAX_REJECTS_SHOWN = 10
+
+CREATE_STAGING = f"""
+    CREATE TEMP TABLE comments_staging (
+        line_no bigint,
+        {', '.join(f'{name} text' for name in COMMENT_COLUMNS)}
+    ) ON COMMIT DELETE ROWS
+"""
+
+COPY_STAGING = f"""
+    COPY comments_staging (line_no, {', '.join(COMMENT_COLUMNS)})
+    FROM STDIN WITH (FORMAT csv)
+"""
+
+_insert_columns = [c for c in COMMENT_COLUMNS if c != 'id_member']
+
+MERGE_QUERY = f"""
+    WITH batch AS (
+        -- First occurrence wins when a file repeats a comment
+        SELECT DISTINCT ON (comment_id) *
+        FROM comments_staging
+        ORDER BY comment_id, line_no
+    ),
+    usernames AS (
+        SELECT DISTINCT ON (ps.username_sosmed) ps.username_sosmed, ps.id_member
+        FROM profil_sosial_media ps
+        WHERE ps.username_sosmed IN (SELECT username FROM batch WHERE username IS NOT NULL)
+        ORDER BY ps.username_sosmed, ps.id
+    ),
+    inserted AS (
+        INSERT INTO comments ({', '.join(_insert_columns)}, id_member)
+        SELECT {', '.join(f'b.{c}::{COMMENT_COLUMNS[c]}' for c in _insert_columns)},
+               COALESCE(b.id_member::integer, u.id_member)
+        FROM batch b
+        LEFT JOIN usernames u ON u.username_sosmed = b.username
+        ON CONFLICT DO NOTHING
+        RETURNING id_member
+    )
+    SELECT (SELECT COUNT(*) FROM batch), COUNT(*), COUNT(id_member)
+    FROM inserted
+"""
+
+
+def coerce_value(column, value):
+    """Value ready for the staging cast to COMMENT_COLUMNS[column]; ValueError if it cannot pass"""
+    if value is None:
+        return None
+    kind = COMMENT_COLUMNS[column]
+    if kind == 'integer':
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+            raise ValueError(f'not an integer: {value!r}')
+        number = int(str(value).strip()) if isinstance(value, str) else int(value)
+        if not INT4_RANGE[0] <= number <= INT4_RANGE[1]:
+            raise ValueError(f'out of integer range: {value!r}')
+        return number
+    if kind == 'boolean':
+        if isinstance(value, bool):
+            return value
+        flag = BOOLEAN_VALUES.get(str(value).strip().lower())
+        if flag is None:
+            raise ValueError(f'not a boolean: {value!r}')
+        return flag
+    if kind == 'timestamptz':
+        text = UTC_OFFSET.sub(lambda m: f'{m.group(1)}:{m.group(2)}' if m.group(1) else '+00:00', str(value).strip())
+        return datetime.fromisoformat(text).isoformat()
+
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    # PostgreSQL text cannot hold NUL characters
+    value = str(value).replace('\x00', '')
+    if kind.startswith('varchar('):
+        limit = int(kind[len('varchar('):-1])
+        if len(value) > limit:
+            raise ValueError(f'longer than {limit} characters')
+    return value
+
+
+def normalize_record(record):
+    """
+    Map a raw JSON object onto the comments columns; None when unusable.
+    Values that would fail the staging casts raise ValueError, so one bad
+    record is rejected instead of aborting its whole COPY batch.
+    """
+    if not isinstance(record, dict):
+        return None
+    row = {}
+    for key, value in record.items():
+        column = FIELD_ALIASES.get(key, key)
+        if column in COMMENT_COLUMNS and row.get(column) is None:
+            row[column] = value
+    # Graph API nests the author: {"from": {"username": ...}}
+    author = record.get('from')
+    if isinstance(author, dict) and not row.get('username'):
+        row['username'] = author.get('username') or author.get('name')
+    if not row.get('comment_id'):
+        return None
+    for column, value in row.items():
+        try:
+            row[column] = coerce_value(column, value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f'{column}: {e}') from None
+    return row
+
+
+def read_records(paths):
+    """Yield (line_no, row) for every usable line; counts skipped and rejected lines"""
+    stats = {'lines': 0, 'skipped': 0, 'rejected': 0, 'rejects': []}
+
+    def generate():
+        line_no = 0
+        for path in paths:
+            stream = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+            try:
+                for line in stream:
+                    line_no += 1
+                    if not line.strip():
+                        continue
+                    stats['lines'] += 1
+                    try:
+                        row = normalize_record(json.loads(line))
+                    except json.JSONDecodeError:
+                        row = None
+                    except ValueError as e:
+                        stats['rejected'] += 1
+                        if len(stats['rejects']) < MAX_REJECTS_SHOWN:
+                            stats['rejects'].append((line_no, str(e)))
+                        continue
+                    if row is None:
+                        stats['skipped'] += 1
+                        continue
+                    yield line_no, row
+            finally:
+                if stream is not sys.stdin:
+                    stream.close()
+
+    return generate(), stats
+
+
+def to_csv(batch):
+    """Serialise a batch for COPY ... (FORMAT csv); None becomes an unquoted empty field (NULL)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for line_no, row in batch:
+        values = [line_no]
+        for column in COMMENT_COLUMNS:
+            values.append(row.get(column))
+        writer.writerow(values)
+    buffer.seek(0)
+    return buffer
+
+
+def load_batch(conn, batch, dry_run=False):
+    with conn.cursor() as cur:
+        cur.copy_expert(COPY_STAGING, to_csv(batch))
+        cur.execute(MERGE_QUERY)
+        distinct, inserted, with_member = cur.fetchone()
+    if dry_run:
+        conn.rollback()
+    else:
+        conn.commit()
+    return {'staged': len(batch), 'distinct': distinct, 'inserted': inserted, 'with_member': with_member}
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description='COPY + upsert JSONL comments into the comments table')
+    parser.add_argument('files', nargs='+', help="JSONL files ('-' for stdin)")
+    parser.add_argument('--batch-size', type=int, default=20000, help='Records per COPY/merge (default: 20000)')
+    parser.add_argument('--dry-run', action='store_true', help='Run every merge, then roll it back')
+    args = parser.parse_args()
+
+    print('=' * 60)
+    print('📥 COMMENT INGESTION' + (' (DRY RUN)' if args.dry_run else ''))
+    print('=' * 60)
+
+    records, stats = read_records(args.files)
+    totals = {'staged': 0, 'distinct': 0, 'inserted': 0, 'with_member': 0}
+    started = time.perf_counter()
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(CREATE_STAGING)
+        conn.commit()
+
+        for number, batch in enumerate(batched(records, args.batch_size), 1):
+            batch_started = time.perf_counter()
+            result = load_batch(conn, batch, args.dry_run)
+            for key in totals:
+                totals[key] += result[key]
+            rate = result['staged'] / max(time.perf_counter() - batch_started, 1e-6)
+            print(f'   📦 Batch {number}: {result["inserted"]}/{result["staged"]} new, '
+                  f'{result["with_member"]} matched to a member ({rate:,.0f} rows/s)')
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - started
+    duplicates = totals['staged'] - totals['inserted']
+    print(f'\n📊 Lines read: {stats["lines"]} | skipped (bad JSON / no comment_id): {stats["skipped"]} '
+          f'| rejected (invalid values): {stats["rejected"]}')
+    for line_no, reason in stats['rejects']:
+        print(f'   ⚠️  line {line_no}: {reason}')
+    if stats['rejected'] > len(stats['rejects']):
+        print(f'   ... {stats["rejected"] - len(stats["rejects"])} more rejected line(s)')
+    print(f'✅ Inserted {totals["inserted"]} comment(s), {duplicates} already present or repeated, '
+          f'{totals["with_member"]} with id_member')
+    print(f'⏱️  {elapsed:.1f}s, {totals["staged"] / max(elapsed, 1e-6):,.0f} rows/s overall')
+    if args.dry_run:
+        print('ℹ️  Dry run: nothing was committed')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Lightweight JavaScript tokenizer for the codemods and the import graph.
+
+Not a parser: it only needs to know where strings, template literals,
+comments and regex literals start and end, so that rules never fire inside
+them. Template literals are split around ${...} so the expressions inside
+stay code. Regex literals are told apart from division by the previous
+significant token. Unterminated strings stop at the end of the line, which
+keeps a stray apostrophe in JSX text from swallowing the rest of the file.
+
+    for kind, start, end in tokenize(text):
+        ...                     # kind: name number string template comment regex punct space
+
+    mask = NonCode(text)
+    mask.containing(pos)        # (start, end) of the string/comment around pos, or None
+
+    tokens = significant_tokens(text)   # [Token(kind, start, end, value)], no space/comments
+    pairs = bracket_pairs(tokens)       # {index of '(' / '[' / '{': index of its closer}
+"""
+
+import bisect
+import re
+from collections import namedtuple
+
+NAME_RE = re.compile(r'[A-Za-z_$\u0080-\uffff][\w$\u0080-\uffff]*')
+NUMBER_RE = re.compile(r'\.?\d[\w.]*')
+SPACE_RE = re.compile(r'[\s\ufeff]+')
+# Multi-character punctuators; anything else is a single-character punct token
+PUNCT_RE = re.compile(r'=>|\.\.\.|\?\.(?!\d)|===|!==|\*\*=?|>>>=?|<<=?|>>=?|&&=?|\|\|=?|\?\?=?|\+\+|--|[=!<>+\-*/%&|^]=')
+NON_CODE = ('string', 'template', 'comment', 'regex')
+BRACKETS = {'(': ')', '[': ']', '{': '}'}
+
+Token = namedtuple('Token', 'kind start end value')
+
+# After these keywords a '/' starts a regex literal, not a division
+REGEX_KEYWORDS = {
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+    'case', 'do', 'else', 'yield', 'await',
+}
+
+
+def _scan_string(text, i, quote):
+    j = i + 1
+    n = len(text)
+    while j < n:
+        ch = text[j]
+        if ch == '\\':
+            j += 2
+        elif ch == quote:
+            return j + 1
+        elif ch == '\n':
+            return j
+        else:
+            j += 1
+    return n
+
+
+def _scan_template(text, j):
+    """From inside a template literal to its end or the next '${'; returns (end, interpolating)"""
+    n = len(text)
+    while j < n:
+        ch = text[j]
+        if ch == '\\':
+            j += 2
+        elif ch == '`':
+            return j + 1, False
+        elif ch == '$' and text.startswith('${', j):
+            return j + 2, True
+        else:
+            j += 1
+    return n, False
+
+
+def _scan_regex(text, i):
+    """End of a regex literal starting at i, or None when it is not one"""
+    j = i + 1
+    n = len(text)
+    in_class = False
+    while j < n:
+        ch = text[j]
+        if ch == '\\':
+            j += 2
+            continue
+        if ch == '\n':
+            return None
+        if ch == '[':
+            in_class = True
+        elif ch == ']':
+            in_class = False
+        elif ch == '/' and not in_class:
+            flags = NAME_RE.match(text, j + 1)
+            return flags.end() if flags else j + 1
+        j += 1
+    return None
+
+
+def _regex_allowed(prev):
+    if prev is None:
+        return True
+    kind, value = prev
+    if kind == 'punct':
+        # '<' before '/' is a JSX closing tag
+        return value not in (')', ']', '}', '<')
+    if kind == 'name':
+        return value in REGEX_KEYWORDS
+    return False
+
+
+def tokenize(text):
+    """Yield (kind, start, end) covering the whole text"""
+    i = 0
+    n = len(text)
+    templates = []  # open '{' count inside each active ${ ... }
+    prev = None
+    while i < n:
+        ch = text[i]
+        if ch.isspace() or ch == '\ufeff':
+            end = SPACE_RE.match(text, i).end()
+            yield 'space', i, end
+            i = end
+            continue
+
+        if text.startswith('//', i):
+            end = text.find('\n', i)
+            end = n if end < 0 else end
+            kind = 'comment'
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            end = n if end < 0 else end + 2
+            kind = 'comment'
+        elif ch in '\'"':
+            end, kind = _scan_string(text, i, ch), 'string'
+        elif ch == '`':
+            end, interpolating = _scan_template(text, i + 1)
+            kind = 'template'
+            if interpolating:
+                templates.append(0)
+        elif ch == '}' and templates and templates[-1] == 0:
+            templates.pop()
+            end, interpolating = _scan_template(text, i + 1)
+            kind = 'template'
+            if interpolating:
+                templates.append(0)
+        elif ch == '/' and _regex_allowed(prev) and (end := _scan_regex(text, i)):
+            kind = 'regex'
+        elif ch.isdigit() or (ch == '.' and i + 1 < n and text[i + 1].isdigit()):
+            end, kind = NUMBER_RE.match(text, i).end(), 'number'
+        else:
+            name = NAME_RE.match(text, i)
+            if name:
+                end, kind = name.end(), 'name'
+            else:
+                punct = PUNCT_RE.match(text, i)
+                end, kind = (punct.end() if punct else i + 1), 'punct'
+                if templates and ch == '{':
+                    templates[-1] += 1
+                elif templates and ch == '}':
+                    templates[-1] -= 1
+
+        yield kind, i, end
+        if kind != 'comment':
+            prev = (kind, text[i:end])
+        i = end
+
+
+def significant_tokens(text):
+    """Tokens without whitespace and comments"""
+    return [Token(kind, start, end, text[start:end])
+            for kind, start, end in tokenize(text) if kind not in ('space', 'comment')]
+
+
+def bracket_pairs(tokens):
+    """Index of every opening bracket token -> index of its closer (unbalanced ones are left out)"""
+    pairs = {}
+    stack = []
+    for index, token in enumerate(tokens):
+        if token.kind != 'punct':
+            continue
+        if token.value in BRACKETS:
+            stack.append(index)
+        elif token.value in (')', ']', '}'):
+            # Pop until the matching opener so one stray bracket does not shift everything after it
+            for depth in range(len(stack) - 1, -1, -1):
+                if BRACKETS[tokens[stack[depth]].value] == token.value:
+                    pairs[stack[depth]] = index
+                    del stack[depth:]
+                    break
+    return pairs
+
+
+class NonCode:
+    """Position lookups against the string/template/comment/regex spans of a file"""
+
+    def __init__(self, text):
+        self.spans = [(start, end) for kind, start, end in tokenize(text) if kind in NON_CODE]
+        self.starts = [start for start, _ in self.spans]
+
+    def containing(self, pos):
+        """Span with start <= pos < end, or None when pos is in code"""
+        index = bisect.bisect_right(self.starts, pos) - 1
+        if index >= 0 and pos < self.spans[index][1]:
+            return self.spans[index]
+        return None
+
+    def splits(self, pos):
+        """True when pos falls strictly inside a span (a match may not end there)"""
+        span = self.containing(pos)
+        return span is not None and span[0] < pos
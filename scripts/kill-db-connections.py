@@ -1,14 +1,22 @@
 """
-Kill all orphaned PostgreSQL connections for berkomunitas database
+Kill stale PostgreSQL connections for berkomunitas database
 Run this when getting "too many clients already" error
+
+By default only connections over the idle thresholds are terminated
+(see monitor-db-connections.py). Pass --all to kill every connection.
 """
 import psycopg2
 from urllib.parse import urlparse
 import os
+import sys
 from dotenv import load_dotenv
 
+from connection_reaper import DEFAULT_THRESHOLDS, select_victims, sample_connections
+
 load_dotenv()
 
+KILL_ALL = '--all' in sys.argv
+
 def kill_connections():
     url = os.getenv('DATABASE_URL')
     u = urlparse(url)
@@ -48,11 +56,20 @@ def kill_connections():
     for pid, user, app, addr, state, started in connections:
         print(f'  PID {pid}: {user} | {app} | {addr} | {state} | Started: {started}')
 
-    # Kill all connections except current one
-    print(f'\n🔪 Killing {len(connections)} connection(s)...')
+    if KILL_ALL:
+        # Kill all connections except current one
+        targets = [row[0] for row in connections]
+    else:
+        # Only kill connections that are idle past the thresholds
+        victims = select_victims(sample_connections(cur, db_name), DEFAULT_THRESHOLDS)
+        targets = [sample['pid'] for sample, _ in victims]
+        for sample, reason in victims:
+            print(f'  💤 PID {sample["pid"]}: {reason}')
+
+    print(f'\n🔪 Killing {len(targets)} connection(s)...')
     
     killed = 0
-    for pid, _, _, _, _, _ in connections:
+    for pid in targets:
         try:
             cur.execute("SELECT pg_terminate_backend(%s)", (pid,))
             result = cur.fetchone()[0]
@@ -77,7 +94,7 @@ def kill_connections():
     print('SUMMARY')
     print('='*60)
     print(f'✅ Killed: {killed}')
-    print(f'📊 Remaining: {remaining} (this script\'s connection)')
+    print(f'📊 Remaining: {remaining}')
     print('='*60)
     print('\n💡 Now restart your Next.js dev server!')
 
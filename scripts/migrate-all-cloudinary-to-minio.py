@@ -17,6 +17,8 @@ import os
 from urllib.parse import urlparse
 import sys
 
+from db_utils import stream_pages
+
 try:
     from minio import Minio
     USE_MINIO_SDK = True
@@ -44,23 +46,32 @@ MINIO_CONFIG = {
     'public_url': 'http://storage.berkomunitas.com/berkomunitas'
 }
 
-def get_cloudinary_members():
-    """Get all members with Cloudinary profile pictures"""
-    conn = psycopg2.connect(**DB_CONFIG)
-    cur = conn.cursor()
-    
-    cur.execute("""
+CLOUDINARY_FILTER = "foto_profil_url LIKE %(cloudinary)s"
+CLOUDINARY_PARAMS = {'cloudinary': '%cloudinary.com%'}
+
+def get_cloudinary_members(conn):
+    """Members with Cloudinary profile pictures, in keyset pages (no transaction held between pages)"""
+    return stream_pages(conn, f"""
         SELECT id, nama_lengkap, email, foto_profil_url
         FROM members
-        WHERE foto_profil_url LIKE '%cloudinary.com%'
+        WHERE {CLOUDINARY_FILTER}
+          AND id > %(after)s
         ORDER BY id
-    """)
+        LIMIT %(limit)s
+    """, CLOUDINARY_PARAMS, page_size=100)
+
+def count_cloudinary_members():
+    """Count members still using Cloudinary"""
+    conn = psycopg2.connect(**DB_CONFIG)
+    cur = conn.cursor()
+    
+    cur.execute(f"SELECT COUNT(*) FROM members WHERE {CLOUDINARY_FILTER}", CLOUDINARY_PARAMS)
+    total = cur.fetchone()[0]
     
-    members = cur.fetchall()
     cur.close()
     conn.close()
     
-    return members
+    return total
 
 def download_from_cloudinary(url):
     """Download image from Cloudinary"""
@@ -208,20 +219,24 @@ def migrate_member(member, dry_run=False):
 
 def check_status():
     """Check current migration status"""
-    members = get_cloudinary_members()
+    total = count_cloudinary_members()
     
     print("\n" + "="*60)
     print("📊 CLOUDINARY MIGRATION STATUS CHECK")
     print("="*60)
     
-    if not members:
+    if not total:
         print("\n✅ No members using Cloudinary!")
         print("   All profile pictures have been migrated.")
     else:
-        print(f"\n❌ Found {len(members)} members still using Cloudinary:\n")
-        for member_id, nama_lengkap, email, url in members:
-            print(f"   [{member_id}] {nama_lengkap} ({email})")
-            print(f"        {url}\n")
+        print(f"\n❌ Found {total} members still using Cloudinary:\n")
+        conn = psycopg2.connect(**DB_CONFIG)
+        try:
+            for member_id, nama_lengkap, email, url in get_cloudinary_members(conn):
+                print(f"   [{member_id}] {nama_lengkap} ({email})")
+                print(f"        {url}\n")
+        finally:
+            conn.close()
     
     print("="*60)
 
@@ -242,14 +257,14 @@ def main():
     
     # Get all Cloudinary members
     print("\n📋 Fetching members with Cloudinary profile pictures...")
-    members = get_cloudinary_members()
+    total = count_cloudinary_members()
     
-    if not members:
+    if not total:
         print("\n✅ No members using Cloudinary!")
         print("   All profile pictures have been migrated.")
         return
     
-    print(f"\n📊 Found {len(members)} members to migrate")
+    print(f"\n📊 Found {total} members to migrate")
     
     if dry_run:
         print("\n🔍 DRY RUN MODE - No changes will be made\n")
@@ -260,15 +275,21 @@ def main():
     success_count = 0
     error_count = 0
     
-    for member in members:
-        try:
-            if migrate_member(member, dry_run):
-                success_count += 1
-            else:
+    # Rows are read in pages with no transaction open during downloads and
+    # uploads; updates go through their own connection
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        for member in get_cloudinary_members(conn):
+            try:
+                if migrate_member(member, dry_run):
+                    success_count += 1
+                else:
+                    error_count += 1
+            except Exception as e:
+                print(f"    ❌ Migration error: {e}")
                 error_count += 1
-        except Exception as e:
-            print(f"    ❌ Migration error: {e}")
-            error_count += 1
+    finally:
+        conn.close()
     
     # Summary
     print("\n" + "="*60)
@@ -276,7 +297,7 @@ def main():
     print("="*60)
     print(f"✅ Success: {success_count}")
     print(f"❌ Errors:  {error_count}")
-    print(f"📊 Total:   {len(members)}")
+    print(f"📊 Total:   {success_count + error_count}")
     print("="*60)
     
     if not dry_run and success_count > 0:
@@ -285,9 +306,9 @@ def main():
         print(f"   Public URL: {MINIO_CONFIG['public_url']}/profile-pictures/")
         
         # Check remaining Cloudinary users
-        remaining = get_cloudinary_members()
+        remaining = count_cloudinary_members()
         if remaining:
-            print(f"\n⚠️  {len(remaining)} members still using Cloudinary (check errors above)")
+            print(f"\n⚠️  {remaining} members still using Cloudinary (check errors above)")
         else:
             print("\n🎉 ALL members successfully migrated to MinIO!")
 
@@ -2,6 +2,10 @@
 """
 Safe Database Migration: Enable Cascade Delete for task_submissions
 With drift detection and rollback mechanism
+
+Usage:
+  python scripts/migrate-cascade-delete-safe.py            # drop + re-add in one transaction
+  python scripts/migrate-cascade-delete-safe.py --online   # NOT VALID + swap + VALIDATE CONSTRAINT
 """
 
 import os
@@ -11,6 +15,9 @@ from psycopg2 import sql
 from datetime import datetime
 import json
 
+from online_constraints import swap_foreign_key_online
+from prisma_schema import load_schema
+
 # Color codes for terminal output
 RED = '\033[91m'
 GREEN = '\033[92m'
@@ -20,6 +27,9 @@ MAGENTA = '\033[95m'
 CYAN = '\033[96m'
 RESET = '\033[0m'
 
+# Online mode avoids holding ACCESS EXCLUSIVE during the validation scan
+ONLINE = '--online' in sys.argv
+
 def get_db_connection():
     """Get database connection from environment variables"""
     try:
@@ -244,6 +254,38 @@ def perform_migration(conn, cursor, state):
         
         return False
 
+def perform_migration_online(conn, state):
+    """
+    Perform the migration without blocking writers:
+    add the CASCADE constraint as NOT VALID, swap it in, then validate
+    """
+    print(f"\n{BLUE}{'='*60}{RESET}")
+    print(f"{BLUE}STEP 2: MIGRATION EXECUTION (ONLINE){RESET}")
+    print(f"{BLUE}{'='*60}{RESET}\n")
+    
+    if not state['migration_needed']:
+        print(f"{GREEN}[SKIP]{RESET} Migration not needed")
+        return True
+    
+    old_name = None
+    if state['fk_constraint_exists']:
+        old_name = state['fk_constraint_details']['constraint_name']
+    
+    try:
+        return swap_foreign_key_online(
+            conn, 'task_submissions', 'id_task', 'tugas_ai', 'id',
+            name='task_submissions_id_task_fkey',
+            old_name=old_name,
+            on_delete='CASCADE'
+        )
+    except Exception as e:
+        print(f"\n{RED}[ERROR]{RESET} Online migration failed: {e}")
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        return False
+
 def verify_migration(cursor, state):
     """
     Verify that migration was successful
@@ -301,12 +343,21 @@ def generate_migration_log(state, success):
 
 def update_prisma_schema():
     """
-    Provide instructions to update Prisma schema
+    Check prisma/schema.prisma and provide instructions to update it
     """
     print(f"\n{BLUE}{'='*60}{RESET}")
-    print(f"{BLUE}STEP 4: PRISMA SCHEMA UPDATE (MANUAL){RESET}")
+    print(f"{BLUE}STEP 4: PRISMA SCHEMA UPDATE{RESET}")
     print(f"{BLUE}{'='*60}{RESET}\n")
     
+    relation = load_schema().relation_for('task_submissions', ['id_task'])
+    if relation is None:
+        print(f"{RED}[WARNING]{RESET} No @relation on task_submissions.id_task in prisma/schema.prisma")
+        return
+    if relation.on_delete == 'Cascade':
+        print(f"{GREEN}[OK]{RESET} prisma/schema.prisma already declares "
+              f"{relation.field} {relation.target} @relation(..., onDelete: Cascade)")
+        return
+    
     print(f"{YELLOW}[TODO]{RESET} Update your Prisma schema file:\n")
     
     print(f"{CYAN}File:{RESET} prisma/schema.prisma\n")
@@ -314,14 +365,14 @@ def update_prisma_schema():
     print(f"{CYAN}Find:{RESET}")
     print(f"  model task_submissions {{")
     print(f"    ...")
-    print(f"    tugas_ai_relation tugas_ai @relation(..., {RED}onDelete: NoAction{RESET}, ...)")
+    print(f"    {relation.field} {relation.target} @relation(..., {RED}onDelete: {relation.on_delete}{RESET}, ...)")
     print(f"    ...")
     print(f"  }}\n")
     
     print(f"{CYAN}Replace with:{RESET}")
     print(f"  model task_submissions {{")
     print(f"    ...")
-    print(f"    tugas_ai_relation tugas_ai @relation(..., {GREEN}onDelete: Cascade{RESET}, ...)")
+    print(f"    {relation.field} {relation.target} @relation(..., {GREEN}onDelete: Cascade{RESET}, ...)")
     print(f"    ...")
     print(f"  }}\n")
     
@@ -354,7 +405,10 @@ def main():
             confirmation = input().strip().lower()
             
             if confirmation == 'yes':
-                success = perform_migration(conn, cursor, state)
+                if ONLINE:
+                    success = perform_migration_online(conn, state)
+                else:
+                    success = perform_migration(conn, cursor, state)
                 
                 # Step 3: Verify migration
                 if success:
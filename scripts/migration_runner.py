@@ -0,0 +1,378 @@
+"""
+Transactional runner for the hand-written .sql migrations.
+
+Each file is split into statements (quotes, comments and $$ bodies are
+respected) and executed one by one inside a single transaction, with
+`statement_timeout` / `lock_timeout` set and per-statement timing. Notices
+raised by DO blocks are collected after every statement. The file name and
+a SHA-256 checksum are recorded in the `_script_migrations` ledger in the
+same transaction, so a file is applied exactly once and an edited file is
+refused instead of silently re-run.
+
+    from migration_runner import apply_migration
+
+    apply_migration(conn, 'prisma/migrations/add_cascade_delete_missing_tables.sql')
+"""
+
+import hashlib
+import re
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+MIGRATIONS_DIR = REPO_ROOT / 'prisma' / 'migrations'
+
+LEDGER_TABLE = '_script_migrations'
+
+CREATE_LEDGER = f"""
+    CREATE TABLE IF NOT EXISTS {LEDGER_TABLE} (
+        name        TEXT PRIMARY KEY,
+        checksum    TEXT NOT NULL,
+        statements  INTEGER NOT NULL,
+        duration_ms INTEGER NOT NULL,
+        applied_by  TEXT NOT NULL DEFAULT current_user,
+        applied_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+RECORD_MIGRATION = f"""
+    INSERT INTO {LEDGER_TABLE} (name, checksum, statements, duration_ms)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (name) DO UPDATE
+    SET checksum = EXCLUDED.checksum,
+        statements = EXCLUDED.statements,
+        duration_ms = EXCLUDED.duration_ms,
+        applied_by = current_user,
+        applied_at = now()
+"""
+
+# The runner owns the transaction, so BEGIN/COMMIT lines in a file are skipped
+TRANSACTION_CONTROL = {'BEGIN', 'START', 'COMMIT', 'END', 'ROLLBACK'}
+DML_KEYWORDS = {'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'MERGE'}
+# Statements PostgreSQL refuses to run inside a transaction block
+NON_TRANSACTIONAL_RE = re.compile(
+    r'\bCONCURRENTLY\b|^VACUUM\b|^CREATE\s+DATABASE\b|^DROP\s+DATABASE\b|^ALTER\s+SYSTEM\b',
+    re.I
+)
+DOLLAR_TAG_RE = re.compile(r'\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$')
+MAX_RESULT_ROWS = 10
+
+# Serialises concurrent runners; any constant works as long as it is shared
+ADVISORY_LOCK_KEY = 727_001
+
+
+class MigrationError(Exception):
+    pass
+
+
+def split_statements(text):
+    """Split SQL source on top-level semicolons; leading comments are dropped"""
+    statements = []
+    i, n = 0, len(text)
+    code_start = None
+
+    while i < n:
+        ch = text[i]
+        if text.startswith('--', i):
+            end = text.find('\n', i)
+            i = n if end == -1 else end
+            continue
+        if text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if ch.isspace():
+            i += 1
+            continue
+
+        if code_start is None:
+            code_start = i
+
+        if ch in ("'", '"'):
+            # '' / "" inside a literal is an escaped quote, which this handles
+            # as two adjacent literals
+            end = text.find(ch, i + 1)
+            i = n if end == -1 else end + 1
+            continue
+        if ch == '$':
+            match = DOLLAR_TAG_RE.match(text, i)
+            if match:
+                end = text.find(match.group(0), match.end())
+                i = n if end == -1 else end + len(match.group(0))
+                continue
+        if ch == ';':
+            statements.append(text[code_start:i].strip())
+            code_start = None
+        i += 1
+
+    if code_start is not None:
+        tail = text[code_start:].strip()
+        if tail:
+            statements.append(tail)
+    return statements
+
+
+def statement_keyword(statement):
+    match = re.match(r'[A-Za-z]+', statement)
+    return match.group(0).upper() if match else ''
+
+
+def summarize(statement, width=70):
+    """First line of a statement, shortened for progress output"""
+    line = ' '.join(statement.split())
+    return line if len(line) <= width else line[:width - 3] + '...'
+
+
+def file_checksum(path):
+    """SHA-256 of the file with line endings normalised (Windows checkouts match)"""
+    data = Path(path).read_bytes().replace(b'\r\n', b'\n')
+    return hashlib.sha256(data).hexdigest()
+
+
+def migration_name(path):
+    """Ledger key: path relative to the repository root"""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(REPO_ROOT.resolve()).as_posix()
+    except ValueError:
+        return path.name
+
+
+def load_migration(path):
+    path = Path(path)
+    statements = split_statements(path.read_text(encoding='utf-8'))
+    return {
+        'path': path,
+        'name': migration_name(path),
+        'checksum': file_checksum(path),
+        'statements': statements,
+        'transactional': not any(NON_TRANSACTIONAL_RE.search(s) for s in statements),
+    }
+
+
+def ledger_entries(cursor):
+    """{name: row} from the ledger, or {} when it has not been created yet"""
+    cursor.execute("SELECT to_regclass(%s)", (LEDGER_TABLE,))
+    if cursor.fetchone()[0] is None:
+        return {}
+    cursor.execute(f"SELECT name, checksum, statements, duration_ms, applied_by, applied_at FROM {LEDGER_TABLE}")
+    return {
+        row[0]: {'checksum': row[1], 'statements': row[2], 'duration_ms': row[3],
+                 'applied_by': row[4], 'applied_at': row[5]}
+        for row in cursor.fetchall()
+    }
+
+
+def migration_status(migration, ledger):
+    """'pending', 'applied' or 'changed' (applied, but the file was edited since)"""
+    entry = ledger.get(migration['name'])
+    if entry is None:
+        return 'pending'
+    return 'applied' if entry['checksum'] == migration['checksum'] else 'changed'
+
+
+def _drain_notices(conn):
+    notices = [n.strip() for n in conn.notices]
+    del conn.notices[:]
+    return notices
+
+
+def _run_statements(conn, cur, migration):
+    """Execute every statement with timing; returns the number executed"""
+    executed = 0
+    total = len(migration['statements'])
+    for index, statement in enumerate(migration['statements'], 1):
+        keyword = statement_keyword(statement)
+        if keyword in TRANSACTION_CONTROL:
+            print(f'   [{index}/{total}] ⏭️  {summarize(statement)} (runner manages the transaction)')
+            continue
+
+        started = time.perf_counter()
+        try:
+            cur.execute(statement)
+        except Exception as e:
+            raise MigrationError(f'statement {index}/{total} failed: {summarize(statement)}\n      {e}') from e
+        elapsed = (time.perf_counter() - started) * 1000
+        executed += 1
+
+        rows = f', {cur.rowcount} row(s)' if keyword in DML_KEYWORDS and cur.rowcount >= 0 else ''
+        print(f'   [{index}/{total}] ✅ {elapsed:8.1f} ms{rows}  {summarize(statement)}')
+        if cur.description:
+            # Verification SELECTs at the end of a migration
+            columns = [d[0] for d in cur.description]
+            for row in cur.fetchmany(MAX_RESULT_ROWS):
+                print(f'      {dict(zip(columns, row))}')
+        for notice in _drain_notices(conn):
+            print(f'      📣 {notice}')
+    return executed
+
+
+def apply_migration(conn, path, statement_timeout='5min', lock_timeout='10s', force=False):
+    """
+    Apply one .sql file and record it in the ledger.
+    Returns 'applied' or 'skipped'; raises MigrationError on failure.
+    """
+    migration = load_migration(path)
+    started = time.perf_counter()
+    conn.autocommit = not migration['transactional']
+
+    with conn.cursor() as cur:
+        if migration['transactional']:
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (ADVISORY_LOCK_KEY,))
+        else:
+            cur.execute("SELECT pg_advisory_lock(%s)", (ADVISORY_LOCK_KEY,))
+        try:
+            cur.execute(CREATE_LEDGER)
+            status = migration_status(migration, ledger_entries(cur))
+            if status == 'applied' and not force:
+                print(f'⏭️  {migration["name"]} already applied (checksum {migration["checksum"][:12]})')
+                if not conn.autocommit:
+                    conn.rollback()
+                return 'skipped'
+            if status == 'changed' and not force:
+                if not conn.autocommit:
+                    conn.rollback()
+                raise MigrationError(
+                    f'{migration["name"]} was edited after it was applied; '
+                    'write a new migration or re-run with --force'
+                )
+
+            mode = 'one transaction' if migration['transactional'] else 'autocommit (non-transactional statements)'
+            print(f'🚀 {migration["name"]}: {len(migration["statements"])} statement(s), {mode}')
+            print(f'   statement_timeout={statement_timeout} lock_timeout={lock_timeout}')
+            scope = 'LOCAL ' if migration['transactional'] else ''
+            cur.execute(f'SET {scope}statement_timeout = %s', (statement_timeout,))
+            cur.execute(f'SET {scope}lock_timeout = %s', (lock_timeout,))
+            _drain_notices(conn)
+
+            try:
+                executed = _run_statements(conn, cur, migration)
+            except MigrationError:
+                if migration['transactional']:
+                    conn.rollback()
+                    print('   🔄 Rolled back, nothing was applied')
+                else:
+                    print('   ⚠️  Autocommit mode: statements before the failure stay applied')
+                raise
+
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            cur.execute(RECORD_MIGRATION, (migration['name'], migration['checksum'], executed, duration_ms))
+            if migration['transactional']:
+                conn.commit()
+            print(f'   ✅ Committed in {duration_ms} ms')
+            return 'applied'
+        finally:
+            if not migration['transactional']:
+                cur.execute('RESET statement_timeout')
+                cur.execute('RESET lock_timeout')
+                cur.execute("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_KEY,))
+
+
+# Lock taken by common DDL forms, first match wins (shown by the static plan)
+LOCK_HINTS = [
+    (re.compile(r'^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\b', re.I | re.S),
+     'SHARE UPDATE EXCLUSIVE, writers keep running'),
+    (re.compile(r'^CREATE\s+(?:UNIQUE\s+)?INDEX\b', re.I | re.S), 'SHARE, blocks writes for the whole build'),
+    (re.compile(r'^ALTER\s+TABLE\b.*\bVALIDATE\s+CONSTRAINT\b', re.I | re.S),
+     'SHARE UPDATE EXCLUSIVE, validation scan with writers running'),
+    (re.compile(r'^ALTER\s+TABLE\b.*\bFOREIGN\s+KEY\b.*\bNOT\s+VALID\b', re.I | re.S),
+     'SHARE ROW EXCLUSIVE on both tables, no scan'),
+    (re.compile(r'^ALTER\s+TABLE\b.*\bFOREIGN\s+KEY\b', re.I | re.S),
+     'SHARE ROW EXCLUSIVE on both tables plus a validation scan, blocks writes'),
+    (re.compile(r'^(?:ALTER|DROP)\s+TABLE\b|^TRUNCATE\b', re.I | re.S), 'ACCESS EXCLUSIVE, blocks reads and writes'),
+    (re.compile(r'^DO\b', re.I | re.S), 'procedural block, locks depend on its body'),
+]
+
+
+def lock_hint(statement):
+    for pattern, hint in LOCK_HINTS:
+        if pattern.search(statement):
+            return hint
+    return None
+
+
+def plan_migration(conn, path):
+    """
+    Print a static plan of a migration without changing anything.
+
+    DDL and DO blocks are never executed: they are listed with the lock
+    they take. DML statements get a plain EXPLAIN (not ANALYZE) inside a
+    READ ONLY transaction, each behind a savepoint, so a statement that
+    depends on a table the migration creates is reported instead of
+    aborting the plan. Returns the number of DML statements that could not
+    be planned; plan_migration_on_scratch() plans them against the changed
+    schema.
+    """
+    migration = load_migration(path)
+    conn.autocommit = False
+    total = len(migration['statements'])
+    mode = 'one transaction' if migration['transactional'] else 'autocommit (non-transactional statements)'
+    print(f'🔎 {migration["name"]}: {total} statement(s), would run in {mode}')
+
+    unplanned = 0
+    try:
+        with conn.cursor() as cur:
+            cur.execute('SET TRANSACTION READ ONLY')
+            for index, statement in enumerate(migration['statements'], 1):
+                keyword = statement_keyword(statement)
+                label = f'   [{index}/{total}]'
+                if keyword in TRANSACTION_CONTROL:
+                    continue
+                if keyword not in DML_KEYWORDS:
+                    hint = lock_hint(statement)
+                    print(f'{label} ⚙️  {summarize(statement)}' + (f'\n         🔒 {hint}' if hint else ''))
+                    continue
+                cur.execute('SAVEPOINT plan_statement')
+                try:
+                    cur.execute(f'EXPLAIN {statement}')
+                except Exception as e:
+                    cur.execute('ROLLBACK TO SAVEPOINT plan_statement')
+                    unplanned += 1
+                    print(f'{label} ⚠️  {summarize(statement)}')
+                    print(f'         cannot plan before the DDL above runs: {str(e).strip().splitlines()[0]}')
+                    continue
+                print(f'{label} 📊 {summarize(statement)}')
+                for (line,) in cur.fetchall():
+                    print(f'         {line}')
+                _drain_notices(conn)
+    finally:
+        conn.rollback()
+    return unplanned
+
+
+def plan_migration_on_scratch(conn, path, statement_timeout='30s', lock_timeout='3s'):
+    """
+    EXPLAIN every DML statement against the changed schema.
+
+    DDL and DO blocks are executed in one transaction that is rolled back
+    at the end, so they take their real locks: only pass a connection to a
+    scratch copy of the database, never the live one.
+    """
+    migration = load_migration(path)
+    conn.autocommit = False
+    total = len(migration['statements'])
+    print(f'🔎 {migration["name"]}: {total} statement(s), planned on a scratch database')
+
+    try:
+        with conn.cursor() as cur:
+            cur.execute('SET LOCAL statement_timeout = %s', (statement_timeout,))
+            cur.execute('SET LOCAL lock_timeout = %s', (lock_timeout,))
+            for index, statement in enumerate(migration['statements'], 1):
+                keyword = statement_keyword(statement)
+                label = f'   [{index}/{total}]'
+                if keyword in TRANSACTION_CONTROL:
+                    continue
+                if NON_TRANSACTIONAL_RE.search(statement):
+                    print(f'{label} ⏭️  not plannable in a transaction: {summarize(statement)}')
+                    continue
+                if keyword in DML_KEYWORDS:
+                    cur.execute(f'EXPLAIN {statement}')
+                    print(f'{label} 📊 {summarize(statement)}')
+                    for (line,) in cur.fetchall():
+                        print(f'         {line}')
+                else:
+                    cur.execute(statement)
+                    print(f'{label} ⚙️  {summarize(statement)} (executed, will roll back)')
+                _drain_notices(conn)
+    finally:
+        conn.rollback()
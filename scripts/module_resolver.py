@@ -0,0 +1,143 @@
+"""
+Import specifier resolution for the Next.js tree.
+
+Mirrors what the bundler does with jsconfig.json "paths": the longest
+matching alias wins ('@/src/lib/sso' goes through '@/src/lib/*', not '@/*'),
+then the usual extension and /index probing. Resolution runs against an
+in-memory set of known modules, so no filesystem access is needed once the
+resolver is built.
+
+The other direction is precomputed as well: for every module, the alias
+specifier that round-trips back to it ('src/lib/sso.js' is '@/src/lib/sso',
+because '@/lib/sso' would resolve to lib/sso.js). specifier_for() then
+gives the canonical specifier for any (importer, target) pair with a dict
+lookup: './x' for the importer's own directory and below, the alias
+otherwise, and '../' only when the target has no alias.
+
+    resolver = ModuleResolver.for_tree()
+    resolver.resolve('src/app/api/tasks/route.js', '@/lib/prisma')   # 'lib/prisma.js'
+    resolver.resolve('src/app/page.js', 'react')                      # None (package)
+    resolver.specifier_for('src/app/api/tasks/route.js', 'lib/prisma.js')   # '@/lib/prisma'
+"""
+
+import json
+import posixpath
+import re
+
+from source_tree import JS_EXTENSIONS, REPO_ROOT, iter_source_files, relative_path
+
+JSCONFIG_PATH = REPO_ROOT / 'jsconfig.json'
+INDEX_FILES = tuple(f'/index{ext}' for ext in JS_EXTENSIONS)
+
+
+def load_aliases(path=JSCONFIG_PATH):
+    """
+    jsconfig "paths" as [(prefix, wildcard, [target prefixes])], longest
+    prefix first. Targets are repo-relative POSIX paths.
+    """
+    if not path.exists():
+        return []
+    text = path.read_text(encoding='utf-8')
+    # jsconfig allows comments; strip the line comments the editor tends to add
+    config = json.loads(re.sub(r'^\s*//.*$', '', text, flags=re.MULTILINE))
+    options = config.get('compilerOptions', {})
+    base_url = options.get('baseUrl', '.')
+    aliases = []
+    for pattern, targets in options.get('paths', {}).items():
+        wildcard = pattern.endswith('*')
+        prefix = pattern[:-1] if wildcard else pattern
+        resolved = [posixpath.normpath(posixpath.join(base_url, t[:-1] if t.endswith('*') else t))
+                    for t in targets]
+        resolved = [('' if t == '.' else t) + ('/' if wildcard and t != '.' else '') for t in resolved]
+        aliases.append((prefix, wildcard, resolved))
+    aliases.sort(key=lambda alias: len(alias[0]), reverse=True)
+    return aliases
+
+
+class ModuleResolver:
+    def __init__(self, modules, aliases):
+        """modules: repo-relative POSIX paths of every importable file"""
+        self.modules = set(modules)
+        self.aliases = aliases
+        self.alias_index = self._build_alias_index()
+
+    @classmethod
+    def for_tree(cls, modules=None):
+        if modules is None:
+            modules = [relative_path(p) for p in iter_source_files()]
+        return cls(modules, load_aliases())
+
+    @staticmethod
+    def _strip_module_suffix(path):
+        for suffix in INDEX_FILES + JS_EXTENSIONS:
+            if path.endswith(suffix):
+                return path[:-len(suffix)]
+        return path
+
+    def _build_alias_index(self):
+        """{module: alias specifier} for every module some alias reaches"""
+        index = {}
+        for module in sorted(self.modules):
+            bare = self._strip_module_suffix(module)
+            options = []
+            for prefix, wildcard, targets in self.aliases:
+                for target in targets:
+                    if wildcard and bare.startswith(target):
+                        options.append(prefix + bare[len(target):])
+                    elif not wildcard and bare == target:
+                        options.append(prefix)
+            # Shortest specifier that actually resolves back to this module
+            for specifier in sorted(options, key=lambda o: (len(o), o)):
+                if self.resolve('', specifier) == module:
+                    index[module] = specifier
+                    break
+        return index
+
+    def relative_specifier(self, importer, target):
+        path = posixpath.relpath(self._strip_module_suffix(target), posixpath.dirname(importer) or '.')
+        if path == '.':
+            return './'
+        return path if path.startswith('.') else './' + path
+
+    def specifier_for(self, importer, target):
+        """Canonical specifier for importing target from importer"""
+        relative = self.relative_specifier(importer, target)
+        if relative.startswith('./'):
+            return relative
+        return self.alias_index.get(target, relative)
+
+    def probe(self, base):
+        """base itself, base + extension or base/index.*, whichever is a known module"""
+        if base in self.modules:
+            return base
+        for suffix in JS_EXTENSIONS + INDEX_FILES:
+            if base + suffix in self.modules:
+                return base + suffix
+        return None
+
+    def candidates(self, importer, specifier):
+        """Repo-relative base paths a specifier may point at; [] for packages"""
+        if specifier.startswith('.'):
+            return [posixpath.normpath(posixpath.join(posixpath.dirname(importer), specifier))]
+        for prefix, wildcard, targets in self.aliases:
+            if wildcard and specifier.startswith(prefix):
+                rest = specifier[len(prefix):]
+                return [posixpath.normpath(target + rest) for target in targets]
+            if not wildcard and specifier == prefix:
+                return targets
+        return []
+
+    def resolve(self, importer, specifier):
+        """Module a specifier points at, or None (package, asset or missing file)"""
+        for base in self.candidates(importer, specifier):
+            found = self.probe(base)
+            if found:
+                return found
+        return None
+
+    def is_local(self, specifier):
+        """True for relative and aliased specifiers (as opposed to packages)"""
+        return specifier.startswith('.') or any(
+            specifier.startswith(prefix) if wildcard else specifier == prefix
+            for prefix, wildcard, _ in self.aliases
+        )
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Monitor PostgreSQL connections and reap only stale ones
+
+Samples pg_stat_activity on an interval, aggregates by
+application_name / client_addr / state and terminates only backends that
+exceed the idle thresholds. Healthy Prisma pool connections and running
+queries are never touched.
+
+Usage:
+  python scripts/monitor-db-connections.py                      # watch only (dry run)
+  python scripts/monitor-db-connections.py --reap               # terminate stale backends
+  python scripts/monitor-db-connections.py --once --reap        # single pass, e.g. from cron
+  python scripts/monitor-db-connections.py --csv .cache/connections.csv
+  python scripts/monitor-db-connections.py --via-postgres --reap  # target DB is full
+"""
+
+import argparse
+import sys
+
+from connection_reaper import DEFAULT_THRESHOLDS, run_monitor
+from db_utils import get_database_name, get_db_connection
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Monitor and reap stale PostgreSQL connections')
+    parser.add_argument('--interval', type=float, default=10, help='Seconds between samples (default: 10)')
+    parser.add_argument('--count', type=int, default=None, help='Number of samples to take (default: forever)')
+    parser.add_argument('--once', action='store_true', help='Take a single sample and exit')
+    parser.add_argument('--reap', action='store_true', help='Terminate backends over the thresholds')
+    parser.add_argument('--idle-timeout', type=float, default=DEFAULT_THRESHOLDS['idle_seconds'],
+                        help='Seconds a connection may stay idle (default: %(default)s)')
+    parser.add_argument('--idle-in-transaction-timeout', type=float,
+                        default=DEFAULT_THRESHOLDS['idle_in_transaction_seconds'],
+                        help='Seconds a connection may sit idle in a transaction (default: %(default)s)')
+    parser.add_argument('--max-age', type=float, default=DEFAULT_THRESHOLDS['max_age_seconds'],
+                        help='Maximum backend age in seconds for idle connections (default: off)')
+    parser.add_argument('--protect', action='append', default=[], metavar='APP',
+                        help='application_name that must never be terminated (repeatable)')
+    parser.add_argument('--csv', default=None, help='Append the aggregated time series to this CSV file')
+    parser.add_argument('--via-postgres', action='store_true',
+                        help='Connect through the postgres database (use when the target DB is full)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    thresholds = {
+        'idle_seconds': args.idle_timeout,
+        'idle_in_transaction_seconds': args.idle_in_transaction_timeout,
+        'max_age_seconds': args.max_age,
+    }
+    iterations = 1 if args.once else args.count
+
+    db_name = get_database_name()
+    print('=' * 60)
+    print('  POSTGRES CONNECTION MONITOR')
+    print('=' * 60)
+    print(f'🎯 Target database: {db_name}')
+    print(f'Mode: {"🔪 REAP" if args.reap else "🧪 MONITOR ONLY"}')
+    print(f'⏱️  Idle > {thresholds["idle_seconds"]:.0f}s | '
+          f'idle in transaction > {thresholds["idle_in_transaction_seconds"]:.0f}s | '
+          f'max age {thresholds["max_age_seconds"] or "off"}')
+
+    try:
+        conn = get_db_connection(database='postgres' if args.via_postgres else None, autocommit=True)
+    except Exception as e:
+        print(f'❌ Database connection failed: {e}')
+        return 1
+
+    try:
+        total_killed = run_monitor(
+            conn, db_name, thresholds,
+            interval=args.interval,
+            iterations=iterations,
+            reap=args.reap,
+            csv_path=args.csv,
+            protected_apps=tuple(args.protect),
+        )
+    finally:
+        conn.close()
+
+    if args.reap:
+        print(f'\n✅ Total terminated: {total_killed}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Online foreign key changes: NOT VALID + swap + VALIDATE CONSTRAINT.
+
+Dropping and re-adding a foreign key in one transaction holds an
+ACCESS EXCLUSIVE lock on the table for the whole validation scan, which
+blocks every writer. The online path splits that into short steps:
+
+  1. ADD CONSTRAINT <tmp> ... NOT VALID          (metadata only, new rows checked)
+  2. DROP old + RENAME <tmp> TO <name>            (one short transaction)
+  3. VALIDATE CONSTRAINT <name>                   (SHARE UPDATE EXCLUSIVE, writers keep going)
+
+Steps 1 and 2 run under a short `lock_timeout` and are retried with
+backoff, so they never queue behind a long-running query while holding up
+everyone else.
+"""
+
+import time
+
+from psycopg2 import errors, sql
+
+LOCK_ERRORS = (errors.LockNotAvailable, errors.DeadlockDetected)
+
+
+def _temp_name(name):
+    # Identifiers are capped at 63 bytes
+    return f'{name[:55]}_online'
+
+
+def run_locked(conn, statements, lock_timeout, max_retries, label):
+    """Run statements in one transaction under lock_timeout, retrying on lock conflicts"""
+    for attempt in range(1, max_retries + 1):
+        try:
+            with conn.cursor() as cur:
+                cur.execute('SET LOCAL lock_timeout = %s', (lock_timeout,))
+                for statement in statements:
+                    cur.execute(statement)
+            conn.commit()
+            return attempt
+        except LOCK_ERRORS as e:
+            conn.rollback()
+            if attempt == max_retries:
+                raise
+            backoff = min(30, 0.5 * 2 ** (attempt - 1))
+            print(f'   ⚠️  {label}: {type(e).__name__}, retry {attempt}/{max_retries - 1} in {backoff:.1f}s')
+            time.sleep(backoff)
+
+
+def build_online_plan(table, column, ref_table, ref_column, name, old_name=None,
+                      on_delete='CASCADE', on_update='NO ACTION'):
+    """The three phases as lists of composed SQL statements"""
+    tmp = _temp_name(name)
+    add = [
+        sql.SQL('ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {tmp}').format(
+            table=sql.Identifier(table), tmp=sql.Identifier(tmp)),
+        sql.SQL(
+            'ALTER TABLE {table} ADD CONSTRAINT {tmp} FOREIGN KEY ({col}) '
+            'REFERENCES {ref_table}({ref_col}) ON DELETE {on_delete} ON UPDATE {on_update} NOT VALID'
+        ).format(
+            table=sql.Identifier(table), tmp=sql.Identifier(tmp), col=sql.Identifier(column),
+            ref_table=sql.Identifier(ref_table), ref_col=sql.Identifier(ref_column),
+            on_delete=sql.SQL(on_delete), on_update=sql.SQL(on_update)),
+    ]
+
+    swap = []
+    if old_name:
+        swap.append(sql.SQL('ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {old}').format(
+            table=sql.Identifier(table), old=sql.Identifier(old_name)))
+    if name != old_name:
+        # Target name may still be taken by an unrelated leftover
+        swap.append(sql.SQL('ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}').format(
+            table=sql.Identifier(table), name=sql.Identifier(name)))
+    swap.append(sql.SQL('ALTER TABLE {table} RENAME CONSTRAINT {tmp} TO {name}').format(
+        table=sql.Identifier(table), tmp=sql.Identifier(tmp), name=sql.Identifier(name)))
+
+    validate = [sql.SQL('ALTER TABLE {table} VALIDATE CONSTRAINT {name}').format(
+        table=sql.Identifier(table), name=sql.Identifier(name))]
+
+    return {'add': add, 'swap': swap, 'validate': validate}
+
+
+def swap_foreign_key_online(conn, table, column, ref_table, ref_column='id', name=None, old_name=None,
+                            on_delete='CASCADE', on_update='NO ACTION', lock_timeout='3s',
+                            max_retries=10, validate=True, dry_run=False):
+    """
+    Replace the FK on table.column without blocking writers for a full scan.
+    Returns True when the new constraint is in place (and validated, if asked).
+    """
+    name = name or old_name or f'{table}_{column}_fkey'
+    plan = build_online_plan(table, column, ref_table, ref_column, name, old_name, on_delete, on_update)
+
+    if dry_run:
+        for phase in ('add', 'swap', 'validate'):
+            print(f'   [{phase}]')
+            for statement in plan[phase]:
+                print(f'      {statement.as_string(conn)};')
+        return True
+
+    if conn.autocommit:
+        conn.autocommit = False
+    else:
+        # Close whatever read transaction the caller left open so each
+        # phase below is its own short transaction
+        conn.commit()
+
+    print(f'   1. Adding {_temp_name(name)} as NOT VALID (lock_timeout {lock_timeout})')
+    attempts = run_locked(conn, plan['add'], lock_timeout, max_retries, 'add NOT VALID')
+    print(f'      ✅ Added after {attempts} attempt(s)')
+
+    print(f'   2. Swapping {old_name or "(none)"} → {name}')
+    attempts = run_locked(conn, plan['swap'], lock_timeout, max_retries, 'swap')
+    print(f'      ✅ Swapped after {attempts} attempt(s)')
+
+    if not validate:
+        print('   3. Skipping VALIDATE CONSTRAINT (run it later during low traffic)')
+        return True
+
+    print(f'   3. Validating {name} (SHARE UPDATE EXCLUSIVE, writes continue)')
+    started = time.monotonic()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET LOCAL statement_timeout = 0")
+            for statement in plan['validate']:
+                cur.execute(statement)
+        conn.commit()
+    except errors.ForeignKeyViolation as e:
+        conn.rollback()
+        print(f'      ❌ Validation failed, existing rows violate the FK: {e.diag.message_detail or e}')
+        print('      💡 The constraint stays NOT VALID (new rows are still checked).')
+        print('         Clean up with check-orphaned-data.py --fix, then re-run validation.')
+        return False
+    print(f'      ✅ Validated in {time.monotonic() - started:.1f}s')
+    return True
@@ -0,0 +1,148 @@
+"""
+Static Prisma query-pattern profiler for the API routes.
+
+Works on the route_analyzer.py output (per handler Prisma calls with their
+options shape, loops and awaits) and the parsed prisma/schema.prisma, and
+turns them into scored hits:
+
+  n+1              Prisma call inside a loop / .map callback      5
+  await-in-loop    any other await inside a loop                   3
+  no-take          findMany without take                           3
+  no-select        findMany fetching whole rows (no select)        1
+  deep-include     include/select relation chain deeper than N     2 per level
+  raw-unsafe       $queryRawUnsafe / $executeRawUnsafe             4
+  raw              $queryRaw / $executeRaw                         1
+  unindexed-where  no where field leads an @@index/@@unique/@id    2
+
+Hits on a call that runs inside a loop score double. A where clause built
+in a variable (where: whereClause) is not followed, so only literal where
+keys are checked against the schema; fields under OR/NOT are ignored since
+they cannot narrow the scan on their own.
+
+    schema = load_schema()
+    for route in profile_routes(analyze_routes(), schema):
+        route['score'], route['hits']
+"""
+
+from route_analyzer import RAW_METHODS, is_unbounded
+
+WEIGHTS = {
+    'n+1': 5,
+    'await-in-loop': 3,
+    'no-take': 3,
+    'no-select': 1,
+    'deep-include': 2,
+    'raw-unsafe': 4,
+    'raw': 1,
+    'unindexed-where': 2,
+}
+DEFAULT_MAX_INCLUDE_DEPTH = 2
+# Methods whose where clause is a plain filter (findUnique/update/delete must hit a unique key)
+FILTER_METHODS = {'findMany', 'findFirst', 'findFirstOrThrow', 'count', 'aggregate', 'groupBy',
+                  'updateMany', 'deleteMany'}
+WHERE_OPERATORS = {'AND', 'OR', 'NOT'}
+# Awaits in loops that are not queries: retry back-off sleeps
+SLEEP_CALLS = {'new Promise', 'sleep', 'delay', 'wait'}
+
+
+def relation_depth(shape):
+    """Longest include/select relation chain in an options shape"""
+    if not isinstance(shape, dict):
+        return 0
+    depth = 0
+    for key in ('include', 'select'):
+        relations = shape.get(key)
+        if not isinstance(relations, dict):
+            continue
+        for name, value in relations.items():
+            if name == '_count' or (key == 'select' and not isinstance(value, dict)):
+                continue
+            depth = max(depth, 1 + relation_depth(value))
+    return depth
+
+
+def where_fields(where):
+    """Literal field names a where shape requires: top-level keys and AND objects (OR/NOT skipped)"""
+    if not isinstance(where, dict):
+        return []
+    fields = []
+    for key, value in where.items():
+        if key == 'AND':
+            fields.extend(where_fields(value))
+        elif key not in WHERE_OPERATORS and key != '...':
+            fields.append(key)
+    return fields
+
+
+def unindexed_fields(model, where):
+    """
+    Scalar where fields of model when none of them starts an index (primary
+    key, unique, @@index), else []. One indexed conjunct is enough for the
+    planner to narrow the scan, so the other fields are just filters.
+    """
+    fields = [name for name in where_fields(where) if name in model.fields and model.fields[name].is_scalar]
+    if any(model.leading_index([model.column_for(name)]) is not None for name in fields):
+        return []
+    return fields
+
+
+def _call_hits(call, schema, max_include_depth):
+    target = f'{call["model"]}.{call["method"]}' if call['model'] else call['method']
+    options = call['options'] if isinstance(call['options'], dict) else {}
+    hits = []
+    if call['loop']:
+        hits.append(('n+1', f'{target} inside {call["loop"]}'))
+    if call['method'] in RAW_METHODS:
+        hits.append(('raw-unsafe' if call['method'].endswith('Unsafe') else 'raw', target))
+    if call['method'] == 'findMany':
+        if is_unbounded(call):
+            hits.append(('no-take', f'{target} without take'))
+        if call['options'] is not None and 'select' not in options and '...' not in options:
+            hits.append(('no-select', f'{target} fetches whole rows'))
+    depth = relation_depth(options)
+    if depth > max_include_depth:
+        hits.append(('deep-include', f'{target} include depth {depth}'))
+    model = schema.models.get(call['model']) if call['model'] else None
+    if model is not None and call['method'] in FILTER_METHODS:
+        fields = unindexed_fields(model, options.get('where'))
+        if fields:
+            columns = ', '.join(model.column_for(field) for field in fields)
+            hits.append(('unindexed-where', f'{target} where {", ".join(fields)} '
+                                            f'(no index on {model.table_name} starts with any of {columns})'))
+    return hits
+
+
+def profile_handler(handler, schema, max_include_depth=DEFAULT_MAX_INCLUDE_DEPTH):
+    """[{kind, line, message, score}] for one analyzed handler"""
+    hits = []
+    for call in handler['prisma']:
+        multiplier = 2 if call['loop'] else 1
+        for kind, message in _call_hits(call, schema, max_include_depth):
+            weight = WEIGHTS[kind] * (1 if kind == 'n+1' else multiplier)
+            if kind == 'deep-include':
+                weight *= relation_depth(call['options']) - max_include_depth
+            hits.append({'kind': kind, 'line': call['line'], 'message': message, 'score': weight})
+
+    query_lines = {call['line'] for call in handler['prisma'] if call['loop']}
+    for entry in handler.get('loop_awaits', []):
+        if entry['line'] in query_lines or entry['call'] in SLEEP_CALLS:
+            continue
+        hits.append({'kind': 'await-in-loop', 'line': entry['line'], 'score': WEIGHTS['await-in-loop'],
+                     'message': f'await {entry["call"] or "<expression>"} inside {entry["loop"]}'})
+    return hits
+
+
+def profile_routes(routes, schema, max_include_depth=DEFAULT_MAX_INCLUDE_DEPTH):
+    """Routes with their hits, highest total score first (routes without hits are dropped)"""
+    profiled = []
+    for route in routes:
+        hits = []
+        for handler in route['handlers']:
+            for hit in profile_handler(handler, schema, max_include_depth):
+                hits.append(dict(hit, method=handler['method']))
+        if hits:
+            hits.sort(key=lambda hit: (-hit['score'], hit['line']))
+            profiled.append({'path': route['path'], 'route': route['route'],
+                             'score': sum(hit['score'] for hit in hits), 'hits': hits})
+    profiled.sort(key=lambda route: (-route['score'], route['path']))
+    return profiled
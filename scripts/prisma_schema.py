@@ -0,0 +1,462 @@
+"""
+Parser for prisma/schema.prisma.
+
+Loads models, fields, relations and block attributes (@@index, @@unique,
+@@id, @@map) into plain Python objects so maintenance scripts can reason
+about the schema without hard-coding table lists.
+
+Every @relation(fields: ...) becomes a Relation (the foreign key Prisma
+creates, with its effective onDelete/onUpdate and constraint name), and
+the model/schema helpers answer the questions the audit and advisor
+scripts used to ask pg_catalog:
+
+    from prisma_schema import load_schema
+
+    schema = load_schema()
+    schema.models['task_submissions'].column_names()
+    schema.relation_for('task_submissions', ['id_task']).on_delete    # 'Cascade'
+    schema.references_to('members')             # every FK pointing at members
+    schema.unindexed_relations()                # FKs without a leading index
+
+load_schema() is cached by the file's sha1: in-process, and across runs in
+.cache/codemods.sqlite (namespace 'prisma-schema').
+"""
+
+import hashlib
+import re
+from pathlib import Path
+
+SCHEMA_PATH = Path(__file__).parent.parent / 'prisma' / 'schema.prisma'
+
+# Prisma's referential action defaults for relations without onDelete/onUpdate
+DEFAULT_ON_UPDATE = 'Cascade'
+INTEGER_TYPES = {'Int', 'BigInt'}
+
+BLOCK_RE = re.compile(r'^(model|enum|view|type|generator|datasource)\s+(\w+)\s*\{')
+FIELD_RE = re.compile(r'^(\w+)\s+([\w.]+(?:\([^)]*\))?)(\[\])?(\?)?\s*(.*)$')
+
+
+def _strip_comment(line):
+    """Drop // comments that are not inside a string literal"""
+    in_string = False
+    for i, ch in enumerate(line):
+        if ch == '"' and (i == 0 or line[i - 1] != '\\'):
+            in_string = not in_string
+        elif ch == '/' and not in_string and line[i:i + 2] == '//':
+            return line[:i]
+    return line
+
+
+def _split_top_level(text, sep=','):
+    """Split on sep when not nested inside (), [] or a string"""
+    parts, depth, in_string, current = [], 0, False, []
+    for i, ch in enumerate(text):
+        if ch == '"' and (i == 0 or text[i - 1] != '\\'):
+            in_string = not in_string
+        elif not in_string:
+            if ch in '([':
+                depth += 1
+            elif ch in ')]':
+                depth -= 1
+            elif ch == sep and depth == 0:
+                parts.append(''.join(current).strip())
+                current = []
+                continue
+        current.append(ch)
+    tail = ''.join(current).strip()
+    if tail:
+        parts.append(tail)
+    return parts
+
+
+def _parse_value(text):
+    """Prisma attribute argument value -> str / list / raw expression"""
+    text = text.strip()
+    if text.startswith('"') and text.endswith('"'):
+        return text[1:-1]
+    if text.startswith('[') and text.endswith(']'):
+        return [_parse_value(item) for item in _split_top_level(text[1:-1])]
+    return text
+
+
+def _parse_args(text):
+    """'[a, b], map: "x"' -> {'_0': ['a', 'b'], 'map': 'x'}"""
+    args = {}
+    for i, part in enumerate(_split_top_level(text)):
+        match = re.match(r'^(\w+)\s*:\s*(.*)$', part, re.S)
+        if match and not part.startswith('"'):
+            args[match.group(1)] = _parse_value(match.group(2))
+        else:
+            args[f'_{i}'] = _parse_value(part)
+    return args
+
+
+def _parse_attributes(text):
+    """
+    '@id @default(autoincrement()) @db.VarChar(50)' ->
+    [('id', {}), ('default', {'_0': 'autoincrement()'}), ('db.VarChar', {'_0': '50'})]
+    """
+    attributes = []
+    i = 0
+    while i < len(text):
+        if text[i] != '@':
+            i += 1
+            continue
+        match = re.match(r'@@?([\w.]+)', text[i:])
+        name = match.group(1)
+        i += match.end()
+        args = {}
+        if i < len(text) and text[i] == '(':
+            depth, start, in_string = 0, i, False
+            while i < len(text):
+                ch = text[i]
+                if ch == '"' and text[i - 1] != '\\':
+                    in_string = not in_string
+                elif not in_string:
+                    if ch == '(':
+                        depth += 1
+                    elif ch == ')':
+                        depth -= 1
+                        if depth == 0:
+                            break
+                i += 1
+            args = _parse_args(text[start + 1:i])
+            i += 1
+        attributes.append((name, args))
+    return attributes
+
+
+def _index_columns(value):
+    """'[a, b(sort: Desc)]' parsed list -> ['a', 'b']"""
+    return [re.match(r'\w+', item).group(0) for item in (value or [])]
+
+
+class Field:
+    def __init__(self, name, type_name, is_list, optional, attributes):
+        self.name = name
+        self.type = type_name
+        self.is_list = is_list
+        self.optional = optional
+        self.attributes = attributes
+        attrs = dict(attributes)
+
+        self.column_name = attrs.get('map', {}).get('_0', name)
+        self.is_id = 'id' in attrs
+        self.is_unique = 'unique' in attrs
+        self.unique_map = attrs.get('unique', {}).get('map')
+        self.default = attrs.get('default', {}).get('_0')
+        self.is_updated_at = 'updatedAt' in attrs
+        self.db_type = next(
+            (f'{n[3:]}({a["_0"]})' if '_0' in a else n[3:] for n, a in attributes if n.startswith('db.')),
+            None
+        )
+        self.relation = attrs.get('relation')
+        # Resolved once every model is known (relation fields point at a model)
+        self.is_scalar = True
+
+    def __repr__(self):
+        return f'<Field {self.name}: {self.type}{"[]" if self.is_list else ""}{"?" if self.optional else ""}>'
+
+
+class Relation:
+    """Owning side of a relation: the foreign key Prisma creates for it"""
+
+    def __init__(self, model, field, target):
+        relation = field.relation
+        self.model = model.name
+        self.table = model.table_name
+        self.field = field.name
+        self.target = target.name
+        self.referenced_table = target.table_name
+        self.relation_name = relation.get('_0') or relation.get('name')
+        self.fields = list(relation['fields'])
+        self.columns = [model.column_for(f) for f in self.fields]
+        self.references = list(relation.get('references', []))
+        self.referenced_columns = [target.column_for(r) for r in self.references]
+        self.required = all(not model.fields[f].optional for f in self.fields if f in model.fields)
+        self.on_delete = relation.get('onDelete') or ('Restrict' if self.required else 'SetNull')
+        self.on_update = relation.get('onUpdate') or DEFAULT_ON_UPDATE
+        # Explicit map: name, or the name Prisma generates
+        self.map = relation.get('map')
+        self.constraint_name = self.map or f'{self.table}_{"_".join(self.columns)}_fkey'
+
+    def __repr__(self):
+        return (f'<Relation {self.table}({", ".join(self.columns)}) -> '
+                f'{self.referenced_table}({", ".join(self.referenced_columns)}) onDelete: {self.on_delete}>')
+
+
+class Model:
+    def __init__(self, name):
+        self.name = name
+        self.table_name = name
+        self.fields = {}
+        self.indexes = []       # {'columns': [...], 'name': map or None}
+        self.uniques = []       # {'columns': [...], 'name': map or None}
+        self.primary_key = []   # column names
+        self.primary_key_name = None
+        self.ignored = False
+        self.documentation = []
+        self.relations = []     # Relation per @relation(fields: ...) field
+
+    def scalar_fields(self):
+        return [f for f in self.fields.values() if f.is_scalar]
+
+    def column_names(self):
+        return [f.column_name for f in self.scalar_fields()]
+
+    def column_for(self, field_name):
+        """Database column for a Prisma field name"""
+        field = self.fields.get(field_name)
+        return field.column_name if field else field_name
+
+    def field_for_column(self, column_name):
+        return next((f for f in self.fields.values() if f.is_scalar and f.column_name == column_name), None)
+
+    def all_indexes(self):
+        """Primary key, unique constraints and indexes as {'kind', 'columns', 'name'}"""
+        entries = [{'kind': 'primary', 'columns': self.primary_key, 'name': self.primary_key_name}] \
+            if self.primary_key else []
+        entries += [{'kind': 'unique', 'columns': u['columns'], 'name': u['name']} for u in self.uniques]
+        entries += [{'kind': 'index', 'columns': i['columns'], 'name': i['name']} for i in self.indexes]
+        return entries
+
+    def leading_index(self, columns):
+        """First index whose leading columns are exactly `columns` (in any order), or None"""
+        wanted = set(columns)
+        for entry in self.all_indexes():
+            if len(entry['columns']) >= len(wanted) and set(entry['columns'][:len(wanted)]) == wanted:
+                return entry
+        return None
+
+    def __repr__(self):
+        return f'<Model {self.name} ({len(self.fields)} fields)>'
+
+
+class PrismaSchema:
+    def __init__(self):
+        self.models = {}
+        self.enums = {}
+
+    def model_for_table(self, table_name):
+        for model in self.models.values():
+            if model.table_name == table_name:
+                return model
+        return None
+
+    def _model(self, name):
+        """Model by Prisma name or table name"""
+        return self.models.get(name) or self.model_for_table(name)
+
+    def relations(self):
+        return [relation for model in self.models.values() for relation in model.relations]
+
+    def references_to(self, name):
+        """Relations whose foreign key points at the model/table `name`"""
+        target = self._model(name)
+        return [r for r in self.relations() if target is not None and r.target == target.name]
+
+    def relation_for(self, name, columns):
+        """Relation of model/table `name` over exactly these columns, or None"""
+        model = self._model(name)
+        if model is None:
+            return None
+        return next((r for r in model.relations if r.columns == list(columns)), None)
+
+    def logical_references(self, name, column_names):
+        """
+        (model, field) for integer columns named like a reference to `name`
+        (e.g. id_member / member_id -> members) that have no @relation
+        """
+        target = self._model(name)
+        found = []
+        for model in self.models.values():
+            if target is None or model is target or model.ignored:
+                continue
+            related = {column for r in model.relations for column in r.columns}
+            for field in model.scalar_fields():
+                if (field.column_name in column_names and field.type in INTEGER_TYPES
+                        and not field.is_list and field.column_name not in related):
+                    found.append((model, field))
+        return found
+
+    def unindexed_relations(self):
+        """Relations whose columns do not lead any index of their model"""
+        return [r for r in self.relations() if self.models[r.model].leading_index(r.columns) is None]
+
+    def constraint_names(self):
+        """{map/constraint name: (table, kind)} for every named index, unique, primary key and FK"""
+        names = {}
+        for model in self.models.values():
+            for entry in model.all_indexes():
+                if entry['name']:
+                    names[entry['name']] = (model.table_name, entry['kind'])
+            for relation in model.relations:
+                names[relation.constraint_name] = (model.table_name, 'foreign')
+        return names
+
+    def __repr__(self):
+        return f'<PrismaSchema {len(self.models)} models>'
+
+
+def _finish_model(model, schema):
+    """Resolve column names for block attributes once all fields are known"""
+    for collection in (model.indexes, model.uniques):
+        for entry in collection:
+            entry['columns'] = [model.column_for(c) for c in entry['fields']]
+    model.primary_key = [model.column_for(c) for c in model.primary_key]
+
+    for field in model.fields.values():
+        if field.is_id:
+            model.primary_key = [field.column_name]
+            model.primary_key_name = dict(field.attributes)['id'].get('map')
+        if field.is_unique:
+            model.uniques.append({'fields': [field.name], 'columns': [field.column_name], 'name': field.unique_map})
+    schema.models[model.name] = model
+
+
+def _resolve_relations(schema):
+    for model in schema.models.values():
+        model.relations = []
+        for field in model.fields.values():
+            field.is_scalar = field.type not in schema.models
+            if not field.is_scalar and (field.relation or {}).get('fields'):
+                model.relations.append(Relation(model, field, schema.models[field.type]))
+
+
+def parse_schema(text):
+    """Parse schema.prisma source into a PrismaSchema"""
+    schema = PrismaSchema()
+    block_kind, current, docs = None, None, []
+
+    for raw_line in text.splitlines():
+        stripped = raw_line.strip()
+        if stripped.startswith('///'):
+            docs.append(stripped[3:].strip())
+            continue
+        line = _strip_comment(raw_line).strip()
+        if not line:
+            continue
+
+        if block_kind is None:
+            match = BLOCK_RE.match(line)
+            if match:
+                block_kind = match.group(1)
+                if block_kind == 'model':
+                    current = Model(match.group(2))
+                    current.documentation = docs
+                elif block_kind == 'enum':
+                    current = schema.enums.setdefault(match.group(2), [])
+            docs = []
+            continue
+
+        if line == '}':
+            if block_kind == 'model':
+                _finish_model(current, schema)
+            block_kind, current, docs = None, None, []
+            continue
+
+        if block_kind == 'enum':
+            current.append(line.split()[0])
+            continue
+        if block_kind != 'model':
+            continue
+
+        if line.startswith('@@'):
+            for name, args in _parse_attributes(line):
+                if name == 'index':
+                    current.indexes.append({'fields': _index_columns(args.get('_0') or args.get('fields')),
+                                            'name': args.get('map')})
+                elif name == 'unique':
+                    current.uniques.append({'fields': _index_columns(args.get('_0') or args.get('fields')),
+                                            'name': args.get('map')})
+                elif name == 'id':
+                    current.primary_key = _index_columns(args.get('_0') or args.get('fields'))
+                    current.primary_key_name = args.get('map')
+                elif name == 'map':
+                    current.table_name = args['_0']
+                elif name == 'ignore':
+                    current.ignored = True
+            continue
+
+        match = FIELD_RE.match(line)
+        if match:
+            name, type_name, is_list, optional, rest = match.groups()
+            current.fields[name] = Field(name, type_name, bool(is_list), bool(optional), _parse_attributes(rest))
+        docs = []
+
+    _resolve_relations(schema)
+    return schema
+
+
+def _schema_to_data(schema):
+    """JSON-serialisable form of a parsed schema (relations are rebuilt on load)"""
+    return {
+        'enums': schema.enums,
+        'models': [
+            {
+                'name': m.name, 'table_name': m.table_name, 'indexes': m.indexes, 'uniques': m.uniques,
+                'primary_key': m.primary_key, 'primary_key_name': m.primary_key_name,
+                'ignored': m.ignored, 'documentation': m.documentation,
+                'fields': [[f.name, f.type, f.is_list, f.optional, f.attributes] for f in m.fields.values()],
+            }
+            for m in schema.models.values()
+        ],
+    }
+
+
+def _schema_from_data(data):
+    schema = PrismaSchema()
+    schema.enums = data['enums']
+    for entry in data['models']:
+        model = Model(entry['name'])
+        for key in ('table_name', 'indexes', 'uniques', 'primary_key', 'primary_key_name', 'ignored',
+                    'documentation'):
+            setattr(model, key, entry[key])
+        for name, type_name, is_list, optional, attributes in entry['fields']:
+            model.fields[name] = Field(name, type_name, is_list, optional,
+                                       [(attr, args) for attr, args in attributes])
+        schema.models[model.name] = model
+    _resolve_relations(schema)
+    return schema
+
+
+_loaded = {}
+
+
+def _load_cached(path):
+    """Parsed schema from .cache/codemods.sqlite, parsing and storing it on a miss"""
+    from file_cache import FileCache, source_version
+
+    cache = FileCache('prisma-schema', source_version(__file__))
+    try:
+        hit, data = cache.get(path)
+        if hit:
+            return _schema_from_data(data)
+        with open(path, 'r', encoding='utf-8') as f:
+            schema = parse_schema(f.read())
+        cache.put(path, _schema_to_data(schema))
+        return schema
+    finally:
+        cache.close()
+
+
+def load_schema(path=SCHEMA_PATH, use_cache=True):
+    """
+    Read and parse prisma/schema.prisma. Parsed schemas are cached by the
+    file's sha1; callers share the returned object, so treat it as read-only.
+    """
+    path = Path(path)
+    with open(path, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    if use_cache and digest in _loaded:
+        return _loaded[digest]
+
+    repo_root = Path(__file__).resolve().parent.parent
+    if use_cache and repo_root in path.resolve().parents:
+        schema = _load_cached(path)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            schema = parse_schema(f.read())
+    if use_cache:
+        _loaded[digest] = schema
+    return schema
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Worker for facebook_trigger_comment_queue
+
+Claims due jobs in batches (FOR UPDATE SKIP LOCKED), posts the trigger
+comments on a bounded thread pool and writes the batch results back in one
+UPDATE. Safe to run as several processes at once. See
+trigger_comment_queue.py for the status lifecycle and retry backoff.
+
+Messages come from --message (repeatable, first two are used) or from
+TRIGGER_COMMENT_MESSAGES in .env, separated by '|'. The page token is read
+from FACEBOOK_PAGE_ACCESS_TOKEN.
+
+Usage:
+  python scripts/process-trigger-comment-queue.py --drain            # until the queue is empty
+  python scripts/process-trigger-comment-queue.py                    # keep polling
+  python scripts/process-trigger-comment-queue.py --client fake --drain
+  python scripts/process-trigger-comment-queue.py --client fake --fake-failure-rate 0.3 --drain
+  python scripts/process-trigger-comment-queue.py --client mypkg.clients:StubClient
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from db_utils import get_db_connection
+from trigger_comment_queue import load_client, run_worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Process facebook_trigger_comment_queue')
+    parser.add_argument('--client', default='graph',
+                        help="'graph' (default), 'fake' or module:ClassName")
+    parser.add_argument('--message', action='append', help='Comment text (repeatable, max 2)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Jobs processed in parallel (default: 4)')
+    parser.add_argument('--batch-size', type=int, default=20, help='Jobs claimed per batch (default: 20)')
+    parser.add_argument('--max-attempts', type=int, default=5, help="Attempts before 'failed' (default: 5)")
+    parser.add_argument('--backoff-base', type=int, default=60,
+                        help='Retry delay in seconds, doubled per attempt (default: 60)')
+    parser.add_argument('--stale-after', type=int, default=900,
+                        help="Requeue jobs stuck in 'processing' this many seconds (default: 900)")
+    parser.add_argument('--poll-interval', type=int, default=10, help='Sleep when the queue is empty (default: 10)')
+    parser.add_argument('--drain', action='store_true', help='Exit once no job is due')
+    parser.add_argument('--max-batches', type=int, help='Stop after this many batches')
+    parser.add_argument('--fake-failure-rate', type=float, default=0.0, help='Failure rate for --client fake')
+    args = parser.parse_args()
+
+    messages = args.message or [m.strip() for m in os.getenv('TRIGGER_COMMENT_MESSAGES', '').split('|') if m.strip()]
+    if not messages:
+        print('❌ No comment text: pass --message or set TRIGGER_COMMENT_MESSAGES')
+        return 1
+
+    if args.client == 'graph':
+        token = os.getenv('FACEBOOK_PAGE_ACCESS_TOKEN')
+        if not token:
+            print('❌ FACEBOOK_PAGE_ACCESS_TOKEN not found in environment')
+            return 1
+        client = load_client('graph', access_token=token)
+    elif args.client == 'fake':
+        client = load_client('fake', failure_rate=args.fake_failure_rate)
+    else:
+        client = load_client(args.client)
+
+    print('=' * 60)
+    print(f'💬 TRIGGER COMMENT QUEUE WORKER (pid {os.getpid()}, client {args.client})')
+    print('=' * 60)
+    print(f'⚙️  batch {args.batch_size}, concurrency {args.concurrency}, max attempts {args.max_attempts}, '
+          f'backoff {args.backoff_base}s x 2^n\n')
+
+    conn = get_db_connection()
+    started = time.perf_counter()
+    try:
+        totals = run_worker(
+            conn, client, messages[:2],
+            concurrency=args.concurrency, batch_size=args.batch_size, max_attempts=args.max_attempts,
+            backoff_base=args.backoff_base, stale_after=args.stale_after,
+            poll_interval=args.poll_interval, drain=args.drain, max_batches=args.max_batches
+        )
+    except KeyboardInterrupt:
+        # Claimed jobs stay 'processing' and are picked up again after --stale-after
+        print('\n⏹️  Stopped')
+        return 130
+    finally:
+        conn.close()
+
+    summary = ', '.join(f'{k} {v}' for k, v in totals.items() if v) or 'nothing due'
+    print(f'\n✅ {summary} in {time.perf_counter() - started:.1f}s')
+    return 1 if totals.get('failed') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
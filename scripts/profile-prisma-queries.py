@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Rank API routes by risky Prisma query patterns
+
+Statically profiles every src/app/api/**/route.js (see prisma_profiler.py
+for the hit kinds and weights): N+1 queries and awaits inside loops,
+findMany without take/select, deep include chains, $queryRaw usage and
+where fields with no index in prisma/schema.prisma. Routes are listed
+highest score first.
+
+Usage:
+  python scripts/profile-prisma-queries.py                       # top 20 routes
+  python scripts/profile-prisma-queries.py --top 0               # every route with hits
+  python scripts/profile-prisma-queries.py --route profil --kind unindexed-where
+  python scripts/profile-prisma-queries.py --max-include-depth 1
+  python scripts/profile-prisma-queries.py --json > prisma-profile.json
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+
+from file_cache import CACHE_PATH
+from prisma_profiler import DEFAULT_MAX_INCLUDE_DEPTH, WEIGHTS, profile_routes
+from prisma_schema import SCHEMA_PATH, load_schema
+from route_analyzer import analyze_routes
+from source_tree import add_jobs_argument
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank API routes by risky Prisma query patterns')
+    parser.add_argument('--route', metavar='FILTER', help='Only routes whose URL or path contains FILTER')
+    parser.add_argument('--kind', action='append', choices=sorted(WEIGHTS),
+                        help='Only report these hit kinds (repeatable)')
+    parser.add_argument('--top', type=int, default=20, help='Number of routes to list (0 = all, default: 20)')
+    parser.add_argument('--max-include-depth', type=int, default=DEFAULT_MAX_INCLUDE_DEPTH,
+                        help=f'Flag include/select chains deeper than this (default: {DEFAULT_MAX_INCLUDE_DEPTH})')
+    parser.add_argument('--json', action='store_true', help='Print the ranked routes as JSON')
+    parser.add_argument('--no-cache', action='store_true', help=f'Re-analyze every file (rebuilds {CACHE_PATH.name})')
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    if not SCHEMA_PATH.exists():
+        print(f'❌ Schema not found: {SCHEMA_PATH}')
+        return 1
+    schema = load_schema()
+    routes = analyze_routes(jobs=args.jobs, use_cache=not args.no_cache, only=args.route)
+    profiled = profile_routes(routes, schema, args.max_include_depth)
+
+    if args.kind:
+        for route in profiled:
+            route['hits'] = [hit for hit in route['hits'] if hit['kind'] in args.kind]
+            route['score'] = sum(hit['score'] for hit in route['hits'])
+        profiled = sorted((r for r in profiled if r['hits']), key=lambda r: (-r['score'], r['path']))
+    shown = profiled[:args.top] if args.top > 0 else profiled
+
+    if args.json:
+        print(json.dumps(shown, indent=2))
+        return 0
+
+    print('=' * 60)
+    print('🔬 PRISMA QUERY PROFILE')
+    print('=' * 60)
+    print(f'{len(routes)} route files, {len(schema.models)} schema models, '
+          f'{len(profiled)} route(s) with hits\n')
+
+    for rank, route in enumerate(shown, 1):
+        print(f'{rank:>3}. [{route["score"]:>3}] {route["route"]}  ({route["path"]})')
+        for hit in route['hits']:
+            print(f'        {hit["score"]:>2}  {hit["kind"]:<16} {hit["method"]:<6} line {hit["line"]:<4} {hit["message"]}')
+    if len(shown) < len(profiled):
+        print(f'\n   ... {len(profiled) - len(shown)} more route(s), use --top 0 to list all')
+
+    counts = Counter(hit['kind'] for route in profiled for hit in route['hits'])
+    print('\n' + '=' * 60)
+    print('📊 SUMMARY')
+    print('=' * 60)
+    for kind in WEIGHTS:
+        if counts[kind]:
+            print(f'   {kind:<16} {counts[kind]:>4}  (weight {WEIGHTS[kind]})')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Recompute member_task_stats from task_submissions
+
+One GROUP BY id_member with COUNT(*) FILTER (...) per status, written with a
+single INSERT ... ON CONFLICT (member_id) DO UPDATE that skips rows whose
+counts did not change. Status buckets match recalculateCompletedTasks() in
+src/app/api/tugas/stats/route.js:
+
+  completed_tasks  'selesai'
+  pending_tasks    'sedang_verifikasi'
+  failed_tasks     'gagal_diverifikasi'
+  total_tasks      every submission
+
+--incremental only recomputes members that have a submission clicked,
+submitted or verified after their own member_task_stats.updated_at (or no
+stats row yet). Those members' rows get updated_at bumped even when their
+counts are unchanged, so the next run does not select them again.
+Submissions deleted by a cascade leave no timestamp behind, so run a full
+recompute periodically.
+
+Usage:
+  python scripts/recompute-member-task-stats.py                  # all members
+  python scripts/recompute-member-task-stats.py --incremental
+  python scripts/recompute-member-task-stats.py --member 24 --member 516
+  python scripts/recompute-member-task-stats.py --dry-run
+"""
+
+import argparse
+import sys
+import time
+
+from db_utils import get_db_connection
+
+# Members that have submissions, plus existing stats rows (zeroed if their
+# submissions are gone)
+ALL_TARGETS = """
+    SELECT id_member FROM task_submissions
+    UNION
+    SELECT member_id FROM member_task_stats
+"""
+
+MEMBER_TARGETS = """
+    SELECT id FROM members WHERE id = ANY(%(member_ids)s)
+"""
+
+# tanggal_* columns are timestamp without time zone written by Prisma in UTC,
+# so the session runs in UTC for the comparison with updated_at (timestamptz)
+INCREMENTAL_TARGETS = """
+    SELECT ts.id_member
+    FROM task_submissions ts
+    LEFT JOIN member_task_stats s ON s.member_id = ts.id_member
+    WHERE s.member_id IS NULL
+       OR GREATEST(ts.waktu_klik, ts.tanggal_submission, ts.tanggal_verifikasi) > s.updated_at
+    GROUP BY ts.id_member
+"""
+
+UPSERT_TEMPLATE = """
+    WITH targets(id_member) AS (
+        {targets}
+    ),
+    counts AS (
+        SELECT t.id_member,
+               COUNT(ts.id) AS total_tasks,
+               COUNT(ts.id) FILTER (WHERE ts.status_submission = 'selesai') AS completed_tasks,
+               COUNT(ts.id) FILTER (WHERE ts.status_submission = 'sedang_verifikasi') AS pending_tasks,
+               COUNT(ts.id) FILTER (WHERE ts.status_submission = 'gagal_diverifikasi') AS failed_tasks
+        FROM targets t
+        LEFT JOIN task_submissions ts ON ts.id_member = t.id_member
+        GROUP BY t.id_member
+    )
+    INSERT INTO member_task_stats AS s
+        (member_id, total_tasks, completed_tasks, pending_tasks, failed_tasks, updated_at)
+    SELECT id_member, total_tasks, completed_tasks, pending_tasks, failed_tasks, now()
+    FROM counts
+    ON CONFLICT (member_id) DO UPDATE
+    SET total_tasks = EXCLUDED.total_tasks,
+        completed_tasks = EXCLUDED.completed_tasks,
+        pending_tasks = EXCLUDED.pending_tasks,
+        failed_tasks = EXCLUDED.failed_tasks,
+        updated_at = now()
+    WHERE {write_condition}
+"""
+
+COUNTS_CHANGED = """
+    (s.total_tasks, s.completed_tasks, s.pending_tasks, s.failed_tasks)
+    IS DISTINCT FROM
+    (EXCLUDED.total_tasks, EXCLUDED.completed_tasks, EXCLUDED.pending_tasks, EXCLUDED.failed_tasks)
+"""
+
+
+def recompute_stats(conn, targets, params=None, dry_run=False, touch=False):
+    """
+    Run the upsert for one target set; returns the number of rows written.
+    Unchanged rows are skipped unless touch is set, which bumps their
+    updated_at (the --incremental watermark).
+    """
+    write_condition = 'true' if touch else COUNTS_CHANGED
+    with conn.cursor() as cur:
+        cur.execute("SET LOCAL TimeZone = 'UTC'")
+        cur.execute(UPSERT_TEMPLATE.format(targets=targets, write_condition=write_condition), params or {})
+        written = cur.rowcount
+    if dry_run:
+        conn.rollback()
+    else:
+        conn.commit()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild member_task_stats from task_submissions')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--incremental', action='store_true',
+                      help='Only members with submissions changed since their stats row')
+    mode.add_argument('--member', type=int, action='append', help='Recompute this member id (repeatable)')
+    parser.add_argument('--dry-run', action='store_true', help='Count rows that would change, then roll back')
+    args = parser.parse_args()
+
+    if args.member:
+        label, targets, params = f'{len(args.member)} member(s)', MEMBER_TARGETS, {'member_ids': args.member}
+    elif args.incremental:
+        label, targets, params = 'members with changed submissions', INCREMENTAL_TARGETS, None
+    else:
+        label, targets, params = 'all members', ALL_TARGETS, None
+
+    print('=' * 60)
+    print('📋 MEMBER TASK STATS RECOMPUTE' + (' (DRY RUN)' if args.dry_run else ''))
+    print('=' * 60)
+    print(f'🎯 Target: {label}')
+
+    conn = get_db_connection()
+    try:
+        started = time.perf_counter()
+        written = recompute_stats(conn, targets, params, args.dry_run, touch=args.incremental)
+        elapsed = time.perf_counter() - started
+    finally:
+        conn.close()
+
+    verb = 'would change' if args.dry_run else 'updated'
+    note = 'unchanged rows re-stamped' if args.incremental else 'unchanged rows skipped'
+    print(f'✅ {written} member_task_stats row(s) {verb} in {elapsed:.2f}s ({note})')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
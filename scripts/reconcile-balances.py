@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Reconcile members.loyalty_point / members.coin against their ledgers
+
+  members.loyalty_point  = SUM(loyalty_point_history.point)
+                           excluding event_type 'reward_redemption'
+  members.coin           = SUM(coin_history.coin)   (report only)
+
+Redeeming a reward writes a -cost 'reward_redemption' row to
+loyalty_point_history for the record but only decrements coin
+(src/app/api/rewards/redeem/route.js), so those rows are left out of the
+loyalty sum. Every other loyalty_point change goes through the history.
+
+Each ledger is summed with one grouped scan, member balances are streamed
+alongside it and the two are compared in memory. Every partition reads
+inside one REPEATABLE READ snapshot, so writes landing mid-scan cannot show
+up as false drift. --partitions splits members.id into ranges that run in
+parallel on a connection pool.
+
+coin is not a ledger sum: add-coin-system.sql seeded it from
+loyalty_point, and point awards (lib/coinLoyaltyManager.js), redemptions
+and refunds change coin without writing coin_history rows. Its drift is
+reported for review, but --fix never touches it.
+
+--fix sets loyalty_point to the ledger sum in batched UPDATEs. A row is
+only touched if its balance still equals the value read during the scan.
+
+Usage:
+  python scripts/reconcile-balances.py                          # report
+  python scripts/reconcile-balances.py --partitions 8 --workers 4
+  python scripts/reconcile-balances.py --ledger loyalty_point --fix
+  python scripts/reconcile-balances.py --json
+"""
+import argparse
+import json
+import math
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+from db_utils import DEFAULT_APPLICATION_NAME, get_database_url, parse_database_url, stream_rows
+
+# members column -> (ledger table, amount column, rows that count toward the balance)
+LEDGERS = {
+    'loyalty_point': ('loyalty_point_history', 'point', "event_type IS DISTINCT FROM 'reward_redemption'"),
+    'coin': ('coin_history', 'coin', None),
+}
+# Balances the ledger fully explains, so --fix may rewrite them
+FIXABLE = ['loyalty_point']
+
+MEMBER_RANGE_QUERY = "SELECT min(id), max(id) FROM members"
+
+
+def partition_ranges(lo, hi, partitions):
+    """Split [lo, hi] into at most `partitions` contiguous id ranges"""
+    if lo is None:
+        return []
+    step = max(1, math.ceil((hi - lo + 1) / partitions))
+    return [(start, min(start + step - 1, hi)) for start in range(lo, hi + 1, step)]
+
+
+def scan_partition(pool, id_range, ledgers):
+    """Ledger sums vs balances for members.id in id_range, from one snapshot"""
+    lo, hi = id_range
+    conn = pool.getconn()
+    try:
+        conn.autocommit = False
+        with conn.cursor() as cur:
+            cur.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+
+        sums = {}
+        for column in ledgers:
+            table, amount, counted = LEDGERS[column]
+            total = f'SUM({amount}) FILTER (WHERE {counted})' if counted else f'SUM({amount})'
+            sums[column] = dict(stream_rows(
+                conn,
+                f'SELECT member_id, {total} FROM {table} '
+                f'WHERE member_id BETWEEN %s AND %s GROUP BY member_id',
+                (lo, hi)
+            ))
+
+        drift = []
+        seen = set()
+        members = stream_rows(conn, 'SELECT id, loyalty_point, coin FROM members WHERE id BETWEEN %s AND %s', (lo, hi))
+        for member_id, loyalty_point, coin in members:
+            seen.add(member_id)
+            balances = {'loyalty_point': loyalty_point, 'coin': coin}
+            for column in ledgers:
+                expected = int(sums[column].get(member_id) or 0)
+                if balances[column] != expected:
+                    drift.append({
+                        'member_id': member_id,
+                        'column': column,
+                        'balance': balances[column],
+                        'ledger_sum': expected,
+                        'difference': balances[column] - expected,
+                    })
+        conn.rollback()
+    finally:
+        pool.putconn(conn)
+
+    # Ledger rows whose member no longer exists (see check-orphaned-data.py)
+    orphans = {column: len(set(sums[column]) - seen) for column in ledgers}
+    return {'range': id_range, 'members': len(seen), 'drift': drift, 'orphan_ledger_members': orphans}
+
+
+def reconcile(pool, ranges, ledgers, workers):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        parts = list(executor.map(lambda r: scan_partition(pool, r, ledgers), ranges))
+
+    drift = [d for part in parts for d in part['drift']]
+    drift.sort(key=lambda d: (-abs(d['difference']), d['member_id'], d['column']))
+    return {
+        'members_checked': sum(p['members'] for p in parts),
+        'partitions': len(parts),
+        'drift': drift,
+        'orphan_ledger_members': {c: sum(p['orphan_ledger_members'][c] for p in parts) for c in ledgers},
+    }
+
+
+def fix_balances(conn, drift, batch_size=500):
+    """
+    Set FIXABLE balances to the ledger sum, one batch per transaction. Rows
+    whose balance changed since the scan are left alone and counted as skipped.
+    """
+    fixed = skipped = 0
+    for column in FIXABLE:
+        rows = [(d['member_id'], d['balance'], d['ledger_sum']) for d in drift if d['column'] == column]
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i:i + batch_size]
+            with conn.cursor() as cur:
+                execute_values(cur, f"""
+                    UPDATE members m
+                    SET {column} = v.expected
+                    FROM (VALUES %s) AS v(id, observed, expected)
+                    WHERE m.id = v.id AND m.{column} = v.observed
+                """, batch, page_size=batch_size)
+                updated = cur.rowcount
+            conn.commit()
+            fixed += updated
+            skipped += len(batch) - updated
+            print(f'   🔧 {column}: {fixed} fixed, {skipped} skipped (changed since scan)')
+    return fixed, skipped
+
+
+def print_report(result, limit):
+    print(f'👥 Members checked: {result["members_checked"]} in {result["partitions"]} partition(s)')
+    for column, count in result['orphan_ledger_members'].items():
+        if count:
+            print(f'⚠️  {count} member id(s) in {LEDGERS[column][0]} no longer exist in members')
+
+    drift = result['drift']
+    if not drift:
+        print('\n✅ Every balance matches its ledger')
+        return
+
+    by_column = {c: [d for d in drift if d['column'] == c] for c in LEDGERS}
+    print(f'\n⚠️  {len(drift)} balance(s) drifted from their ledger')
+    for column, rows in by_column.items():
+        if rows:
+            print(f'   {column}: {len(rows)} member(s), net {sum(d["difference"] for d in rows):+d}')
+
+    print(f'\n{"MEMBER":>8}  {"COLUMN":<14} {"BALANCE":>10} {"LEDGER":>10} {"DIFF":>10}')
+    print('-' * 58)
+    for d in drift[:limit]:
+        print(f'{d["member_id"]:>8}  {d["column"]:<14} {d["balance"]:>10} {d["ledger_sum"]:>10} {d["difference"]:>+10}')
+    if len(drift) > limit:
+        print(f'   ... {len(drift) - limit} more (use --limit or --json)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare member balances with loyalty/coin ledgers')
+    parser.add_argument('--ledger', action='append', choices=sorted(LEDGERS),
+                        help='Only reconcile this balance (repeatable, default: both)')
+    parser.add_argument('--partitions', type=int, default=1, help='Split members.id into N ranges (default: 1)')
+    parser.add_argument('--workers', type=int, default=4, help='Partitions scanned concurrently (default: 4)')
+    parser.add_argument('--fix', action='store_true', help='Set drifted loyalty_point balances to the ledger sum')
+    parser.add_argument('--batch-size', type=int, default=500, help='Rows per UPDATE batch (default: 500)')
+    parser.add_argument('--limit', type=int, default=50, help='Drift rows to print (default: 50)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    if args.fix and args.ledger and set(args.ledger) - set(FIXABLE):
+        parser.error('--fix only applies to ' + ', '.join(FIXABLE) + '; coin drift is report only')
+    ledgers = args.ledger or (FIXABLE if args.fix else list(LEDGERS))
+    workers = max(1, min(args.workers, args.partitions))
+    params = parse_database_url(get_database_url())
+    pool = ThreadedConnectionPool(1, workers, application_name=DEFAULT_APPLICATION_NAME, **params)
+
+    try:
+        conn = pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(MEMBER_RANGE_QUERY)
+                lo, hi = cur.fetchone()
+            conn.rollback()
+        finally:
+            pool.putconn(conn)
+
+        if not args.json:
+            print('=' * 60)
+            print('⚖️  BALANCE RECONCILIATION: ' + ', '.join(ledgers))
+            print('=' * 60)
+
+        started = time.perf_counter()
+        result = reconcile(pool, partition_ranges(lo, hi, args.partitions), ledgers, workers)
+        result['elapsed_seconds'] = round(time.perf_counter() - started, 2)
+
+        if args.json:
+            print(json.dumps(result, indent=2, default=str))
+        else:
+            print_report(result, args.limit)
+            print(f'\n⏱️  Scanned in {result["elapsed_seconds"]}s')
+
+        if args.fix and result['drift']:
+            print('\n🔧 Fixing balances from the ledgers...')
+            conn = pool.getconn()
+            try:
+                conn.autocommit = False
+                fixed, skipped = fix_balances(conn, result['drift'], args.batch_size)
+            finally:
+                pool.putconn(conn)
+            print(f'✅ {fixed} balance(s) fixed, {skipped} skipped')
+        elif result['drift'] and not args.json:
+            print('💡 Run with --fix to set loyalty_point to the ledger sums (coin is report only)')
+    finally:
+        pool.closeall()
+
+    return 1 if result['drift'] and not args.fix else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
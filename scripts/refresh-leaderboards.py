@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Rebuild the peringkat_* leaderboard tables
+
+Each leaderboard is computed with one window-function query into a shadow
+table (CREATE TABLE ... (LIKE ... INCLUDING ALL)), then swapped in with a
+drop + rename in one short transaction under lock_timeout. Readers see
+either the old ranking or the new one, never a half-built table.
+
+peringkat_sumber_tugas and peringkat_tugas_populer use `peringkat` as their
+primary key, so they are ranked with ROW_NUMBER() instead of RANK().
+
+--incremental updates peringkat_member_loyalty in place: only members with
+loyalty_point_history rows newer than the last refresh are upserted (or
+removed once their points drop to 0), then ranks are recomputed and written
+only where they changed.
+
+Usage:
+  python scripts/refresh-leaderboards.py                       # rebuild all
+  python scripts/refresh-leaderboards.py --only peringkat_member_loyalty
+  python scripts/refresh-leaderboards.py --incremental         # loyalty in place, rest rebuilt
+  python scripts/refresh-leaderboards.py --dry-run             # row counts only
+"""
+
+import argparse
+import sys
+import time
+from datetime import timedelta
+
+from psycopg2 import sql
+
+from db_utils import get_db_connection
+from online_constraints import run_locked
+
+# First username registered by each member
+FIRST_USERNAME = """
+    LEFT JOIN LATERAL (
+        SELECT ps.username_sosmed
+        FROM profil_sosial_media ps
+        WHERE ps.id_member = m.id
+        ORDER BY ps.id
+        LIMIT 1
+    ) p ON true
+"""
+
+LEADERBOARDS = {
+    'peringkat_member_loyalty': {
+        'columns': ['peringkat', 'id_member', 'nama_lengkap', 'username_sosmed',
+                    'total_loyalty_point', 'terakhir_diupdate'],
+        'query': f"""
+            SELECT RANK() OVER (ORDER BY m.loyalty_point DESC),
+                   m.id, m.nama_lengkap, p.username_sosmed, m.loyalty_point, now()
+            FROM members m
+            {FIRST_USERNAME}
+            WHERE m.loyalty_point > 0
+        """,
+    },
+    'peringkat_member_comments': {
+        'columns': ['peringkat', 'username_sosmed', 'nama_tampilan', 'jumlah_komentar', 'terakhir_diupdate'],
+        'query': """
+            WITH counts AS (
+                SELECT c.username, COUNT(*) AS jumlah
+                FROM comments c
+                WHERE c.username IS NOT NULL
+                GROUP BY c.username
+            ),
+            names AS (
+                SELECT DISTINCT ON (ps.username_sosmed) ps.username_sosmed, m.nama_lengkap
+                FROM profil_sosial_media ps
+                JOIN members m ON m.id = ps.id_member
+                ORDER BY ps.username_sosmed, ps.id
+            )
+            SELECT RANK() OVER (ORDER BY counts.jumlah DESC),
+                   counts.username, names.nama_lengkap, counts.jumlah, now()
+            FROM counts
+            LEFT JOIN names ON names.username_sosmed = counts.username
+        """,
+    },
+    'peringkat_sumber_tugas': {
+        'columns': ['peringkat', 'source_profile_link', 'jumlah_komentar', 'terakhir_diupdate'],
+        'query': """
+            SELECT ROW_NUMBER() OVER (ORDER BY COUNT(*) DESC, c.source_profile_link),
+                   c.source_profile_link, COUNT(*), now()
+            FROM comments c
+            WHERE c.source_profile_link IS NOT NULL
+            GROUP BY c.source_profile_link
+        """,
+    },
+    'peringkat_tugas_populer': {
+        'columns': ['peringkat', 'id_tugas', 'keyword_tugas', 'jumlah_pengerjaan', 'terakhir_diupdate'],
+        'query': """
+            SELECT ROW_NUMBER() OVER (ORDER BY s.jumlah DESC, t.id),
+                   t.id, t.keyword_tugas, s.jumlah, now()
+            FROM (
+                SELECT id_task, COUNT(*) AS jumlah
+                FROM task_submissions
+                GROUP BY id_task
+            ) s
+            JOIN tugas_ai t ON t.id = s.id_task
+        """,
+    },
+}
+
+INDEXES_QUERY = """
+    SELECT i.relname, x.indkey::text, x.indisprimary, x.indisunique
+    FROM pg_index x
+    JOIN pg_class i ON i.oid = x.indexrelid
+    WHERE x.indrelid = %s::regclass
+"""
+
+CHANGED_MEMBERS = """
+    WITH changed AS (
+        SELECT DISTINCT member_id
+        FROM loyalty_point_history
+        WHERE created_at > %(since)s
+    )
+"""
+
+INCREMENTAL_UPSERT = f"""
+    {CHANGED_MEMBERS}
+    INSERT INTO peringkat_member_loyalty AS t
+        (peringkat, id_member, nama_lengkap, username_sosmed, total_loyalty_point, terakhir_diupdate)
+    SELECT 0, m.id, m.nama_lengkap, p.username_sosmed, m.loyalty_point, now()
+    FROM members m
+    JOIN changed ON changed.member_id = m.id
+    {FIRST_USERNAME}
+    WHERE m.loyalty_point > 0
+    ON CONFLICT (id_member) DO UPDATE
+    SET total_loyalty_point = EXCLUDED.total_loyalty_point,
+        nama_lengkap = EXCLUDED.nama_lengkap,
+        username_sosmed = EXCLUDED.username_sosmed,
+        terakhir_diupdate = now()
+    WHERE (t.total_loyalty_point, t.nama_lengkap, t.username_sosmed)
+          IS DISTINCT FROM
+          (EXCLUDED.total_loyalty_point, EXCLUDED.nama_lengkap, EXCLUDED.username_sosmed)
+"""
+
+# Members whose points dropped to 0 leave the board, as in the full rebuild
+INCREMENTAL_DELETE = f"""
+    {CHANGED_MEMBERS}
+    DELETE FROM peringkat_member_loyalty t
+    USING changed
+    JOIN members m ON m.id = changed.member_id
+    WHERE t.id_member = changed.member_id
+      AND m.loyalty_point <= 0
+"""
+
+RERANK_LOYALTY = """
+    UPDATE peringkat_member_loyalty t
+    SET peringkat = r.peringkat
+    FROM (
+        SELECT id_member, RANK() OVER (ORDER BY total_loyalty_point DESC) AS peringkat
+        FROM peringkat_member_loyalty
+    ) r
+    WHERE r.id_member = t.id_member
+      AND t.peringkat IS DISTINCT FROM r.peringkat
+"""
+
+
+def shadow_name(table):
+    return f'{table}_shadow'
+
+
+def build_shadow(conn, table, definition):
+    """Fill <table>_shadow with the fresh ranking; returns the row count"""
+    shadow = shadow_name(table)
+    with conn.cursor() as cur:
+        cur.execute(sql.SQL('DROP TABLE IF EXISTS {shadow}').format(shadow=sql.Identifier(shadow)))
+        cur.execute(sql.SQL('CREATE TABLE {shadow} (LIKE {table} INCLUDING ALL)').format(
+            shadow=sql.Identifier(shadow), table=sql.Identifier(table)))
+        cur.execute(sql.SQL('INSERT INTO {shadow} ({columns}) {query}').format(
+            shadow=sql.Identifier(shadow),
+            columns=sql.SQL(', ').join(sql.Identifier(c) for c in definition['columns']),
+            query=sql.SQL(definition['query'])))
+        rows = cur.rowcount
+        cur.execute(sql.SQL('ANALYZE {shadow}').format(shadow=sql.Identifier(shadow)))
+    conn.commit()
+    return rows
+
+
+def index_renames(cursor, table):
+    """
+    LIKE ... INCLUDING ALL gives the shadow's indexes generated names.
+    Pair them with the live table's indexes so the originals' names
+    (and the primary key constraint name) survive the swap.
+    """
+    def indexes(relation):
+        cursor.execute(INDEXES_QUERY, (relation,))
+        return {(key, primary, unique): name for name, key, primary, unique in cursor.fetchall()}
+
+    live = indexes(table)
+    shadow = indexes(shadow_name(table))
+    return [(shadow[signature], name) for signature, name in live.items()
+            if signature in shadow and shadow[signature] != name]
+
+
+def swap_in(conn, table, lock_timeout, max_retries):
+    with conn.cursor() as cur:
+        renames = index_renames(cur, table)
+    conn.commit()
+
+    statements = [
+        sql.SQL('DROP TABLE {table}').format(table=sql.Identifier(table)),
+        sql.SQL('ALTER TABLE {shadow} RENAME TO {table}').format(
+            shadow=sql.Identifier(shadow_name(table)), table=sql.Identifier(table)),
+    ]
+    # Renaming a constraint's index renames the constraint as well
+    statements += [
+        sql.SQL('ALTER INDEX {old} RENAME TO {new}').format(old=sql.Identifier(old), new=sql.Identifier(new))
+        for old, new in renames
+    ]
+    return run_locked(conn, statements, lock_timeout, max_retries, f'swap {table}')
+
+
+def refresh_full(conn, table, lock_timeout, max_retries, dry_run=False):
+    definition = LEADERBOARDS[table]
+    started = time.perf_counter()
+
+    if dry_run:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT COUNT(*) FROM ({definition['query']}) q")
+            rows = cur.fetchone()[0]
+        conn.rollback()
+        print(f'   🔍 {table}: would write {rows} row(s)')
+        return rows
+
+    rows = build_shadow(conn, table, definition)
+    built = time.perf_counter()
+    attempts = swap_in(conn, table, lock_timeout, max_retries)
+    print(f'   ✅ {table}: {rows} row(s), built in {built - started:.2f}s, '
+          f'swapped in {time.perf_counter() - built:.2f}s ({attempts} attempt(s))')
+    return rows
+
+
+def refresh_loyalty_incremental(conn, overlap, lock_timeout, max_retries, dry_run=False):
+    """Upsert members with new loyalty_point_history rows, then re-rank in place"""
+    table = 'peringkat_member_loyalty'
+    with conn.cursor() as cur:
+        cur.execute('SELECT max(terakhir_diupdate) FROM peringkat_member_loyalty')
+        watermark = cur.fetchone()[0]
+    conn.rollback()
+
+    if watermark is None:
+        print(f'   ℹ️  {table} is empty, doing a full rebuild')
+        return refresh_full(conn, table, lock_timeout, max_retries, dry_run)
+
+    # Re-read a little before the watermark: rows committed late by long
+    # transactions can carry an earlier created_at. Re-processing is a no-op.
+    since = watermark - overlap
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        # loyalty_point_history.created_at is timestamp without time zone
+        # written by Prisma in UTC, compared here with a timestamptz watermark
+        cur.execute("SET LOCAL TimeZone = 'UTC'")
+        cur.execute('SET LOCAL lock_timeout = %s', (lock_timeout,))
+        cur.execute(INCREMENTAL_UPSERT, {'since': since})
+        upserted = cur.rowcount
+        cur.execute(INCREMENTAL_DELETE, {'since': since})
+        removed = cur.rowcount
+        cur.execute(RERANK_LOYALTY)
+        reranked = cur.rowcount
+
+    if dry_run:
+        conn.rollback()
+        print(f'   🔍 {table}: would upsert {upserted} member(s), '
+              f'remove {removed} and re-rank {reranked} row(s)')
+    else:
+        conn.commit()
+        print(f'   ✅ {table}: {upserted} member(s) changed since {since:%Y-%m-%d %H:%M:%S}, '
+              f'{removed} removed, {reranked} rank(s) updated in {time.perf_counter() - started:.2f}s')
+    return upserted
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute the peringkat_* leaderboard tables')
+    parser.add_argument('--only', action='append', choices=sorted(LEADERBOARDS),
+                        help='Refresh only this leaderboard (repeatable)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Update peringkat_member_loyalty in place from loyalty_point_history')
+    parser.add_argument('--overlap-minutes', type=int, default=5,
+                        help='Incremental mode re-reads this far before the last refresh (default: 5)')
+    parser.add_argument('--lock-timeout', default='2s', help='lock_timeout for the swap (default: 2s)')
+    parser.add_argument('--max-retries', type=int, default=10, help='Swap attempts on lock timeout (default: 10)')
+    parser.add_argument('--dry-run', action='store_true', help='Compute row counts without writing')
+    args = parser.parse_args()
+
+    tables = args.only or list(LEADERBOARDS)
+
+    print('=' * 60)
+    print('🏆 LEADERBOARD REFRESH' + (' (DRY RUN)' if args.dry_run else ''))
+    print('=' * 60)
+
+    conn = get_db_connection()
+    started = time.perf_counter()
+    failed = 0
+    try:
+        for table in tables:
+            try:
+                if args.incremental and table == 'peringkat_member_loyalty':
+                    refresh_loyalty_incremental(conn, timedelta(minutes=args.overlap_minutes),
+                                                args.lock_timeout, args.max_retries, args.dry_run)
+                else:
+                    refresh_full(conn, table, args.lock_timeout, args.max_retries, args.dry_run)
+            except Exception as e:
+                conn.rollback()
+                failed += 1
+                print(f'   ❌ {table}: {e}')
+    finally:
+        conn.close()
+
+    print(f'\n⏱️  Done in {time.perf_counter() - started:.2f}s'
+          + (f', {failed} leaderboard(s) failed' if failed else ''))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Daily statistics rollup for statistik_harian and statistik_global
+
+Per-day counts come from:
+  total_komentar_baru   comments.comment_timestamp
+  total_tugas_selesai   task_submissions.tanggal_verifikasi (status 'selesai')
+  total_poin_diberikan  loyalty_point_history.created_at (positive points)
+  total_member_baru     members.tanggal_daftar
+
+Incremental runs keep watermarks (max ids, last tanggal_verifikasi) in
+.cache/rollups/statistik_harian.json, find the days that received rows
+since then and recompute only those days with one aggregate query per
+chunk, upserting rows whose numbers actually changed. statistik_global is
+re-derived from the daily table afterwards.
+
+Deleted source rows are not seen by the incremental path; run --backfill
+over the affected range to correct them.
+
+Usage:
+  python scripts/rollup-statistics.py                        # incremental
+  python scripts/rollup-statistics.py --backfill             # all history
+  python scripts/rollup-statistics.py --backfill --from 2025-01-01 --to 2025-03-31
+  python scripts/rollup-statistics.py --backfill --chunk-days 7
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from db_utils import get_db_connection
+
+STATE_PATH = Path(__file__).parent.parent / '.cache' / 'rollups' / 'statistik_harian.json'
+
+# Days are local (Jakarta) days. timestamptz columns convert directly; the
+# timestamp columns (tanggal_verifikasi, loyalty_point_history.created_at)
+# hold UTC wall time written by Prisma's new Date(), so they are read as UTC
+# first, and local day bounds are converted back to UTC wall time to compare
+DEFAULT_TIMEZONE = 'Asia/Jakarta'
+
+# A verification committed late can carry an earlier tanggal_verifikasi
+VERIFICATION_OVERLAP = timedelta(minutes=10)
+# Likewise an insert committed late can carry an id below the max id seen,
+# so each id watermark is re-read from this far back (re-counting a day is
+# harmless). Transactions that stay open longer are only caught by --backfill.
+ID_OVERLAP = 1000
+
+WATERMARKS_QUERY = """
+    SELECT (SELECT max(id) FROM comments),
+           (SELECT max(id) FROM loyalty_point_history),
+           (SELECT max(id) FROM members),
+           (SELECT max(tanggal_verifikasi) FROM task_submissions)
+"""
+
+CHANGED_DAYS_QUERY = """
+    SELECT day FROM (
+        SELECT (comment_timestamp AT TIME ZONE %(tz)s)::date AS day
+        FROM comments
+        WHERE id > %(comments_id)s AND id <= %(comments_id_to)s AND comment_timestamp IS NOT NULL
+        UNION
+        SELECT (created_at AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s)::date
+        FROM loyalty_point_history
+        WHERE id > %(history_id)s AND id <= %(history_id_to)s
+        UNION
+        SELECT (tanggal_daftar AT TIME ZONE %(tz)s)::date
+        FROM members
+        WHERE id > %(members_id)s AND id <= %(members_id_to)s AND tanggal_daftar IS NOT NULL
+        UNION
+        SELECT (tanggal_verifikasi AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s)::date
+        FROM task_submissions
+        WHERE tanggal_verifikasi > %(verified_after)s AND tanggal_verifikasi <= %(verified_to)s
+    ) changed
+    ORDER BY day
+"""
+
+HISTORY_RANGE_QUERY = """
+    SELECT LEAST(
+        (SELECT min(comment_timestamp AT TIME ZONE %(tz)s)::date FROM comments),
+        (SELECT (min(created_at) AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s)::date FROM loyalty_point_history),
+        (SELECT min(tanggal_daftar AT TIME ZONE %(tz)s)::date FROM members),
+        (SELECT (min(tanggal_verifikasi) AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s)::date FROM task_submissions)
+    )
+"""
+
+# One pass per source over [first day, last day + 1), joined onto the day list
+ROLLUP_UPSERT = """
+    WITH days AS (
+        SELECT unnest(%(days)s::date[]) AS tanggal
+    ),
+    bounds AS (
+        SELECT min(tanggal) AS lo, max(tanggal) + 1 AS hi FROM days
+    ),
+    komentar AS (
+        SELECT (c.comment_timestamp AT TIME ZONE %(tz)s)::date AS tanggal, COUNT(*) AS n
+        FROM comments c, bounds b
+        WHERE c.comment_timestamp >= b.lo::timestamp AT TIME ZONE %(tz)s
+          AND c.comment_timestamp < b.hi::timestamp AT TIME ZONE %(tz)s
+        GROUP BY 1
+    ),
+    tugas AS (
+        SELECT (ts.tanggal_verifikasi AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s)::date AS tanggal, COUNT(*) AS n
+        FROM task_submissions ts, bounds b
+        WHERE ts.status_submission = 'selesai'
+          AND ts.tanggal_verifikasi >= (b.lo::timestamp AT TIME ZONE %(tz)s) AT TIME ZONE 'UTC'
+          AND ts.tanggal_verifikasi < (b.hi::timestamp AT TIME ZONE %(tz)s) AT TIME ZONE 'UTC'
+        GROUP BY 1
+    ),
+    poin AS (
+        SELECT (h.created_at AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s)::date AS tanggal,
+               SUM(h.point) FILTER (WHERE h.point > 0) AS n
+        FROM loyalty_point_history h, bounds b
+        WHERE h.created_at >= (b.lo::timestamp AT TIME ZONE %(tz)s) AT TIME ZONE 'UTC'
+          AND h.created_at < (b.hi::timestamp AT TIME ZONE %(tz)s) AT TIME ZONE 'UTC'
+        GROUP BY 1
+    ),
+    member_baru AS (
+        SELECT (m.tanggal_daftar AT TIME ZONE %(tz)s)::date AS tanggal, COUNT(*) AS n
+        FROM members m, bounds b
+        WHERE m.tanggal_daftar >= b.lo::timestamp AT TIME ZONE %(tz)s
+          AND m.tanggal_daftar < b.hi::timestamp AT TIME ZONE %(tz)s
+        GROUP BY 1
+    )
+    INSERT INTO statistik_harian AS s
+        (tanggal, total_komentar_baru, total_tugas_selesai, total_poin_diberikan, total_member_baru)
+    SELECT d.tanggal,
+           COALESCE(komentar.n, 0),
+           COALESCE(tugas.n, 0),
+           COALESCE(poin.n, 0),
+           COALESCE(member_baru.n, 0)
+    FROM days d
+    LEFT JOIN komentar USING (tanggal)
+    LEFT JOIN tugas USING (tanggal)
+    LEFT JOIN poin USING (tanggal)
+    LEFT JOIN member_baru USING (tanggal)
+    ON CONFLICT (tanggal) DO UPDATE
+    SET total_komentar_baru = EXCLUDED.total_komentar_baru,
+        total_tugas_selesai = EXCLUDED.total_tugas_selesai,
+        total_poin_diberikan = EXCLUDED.total_poin_diberikan,
+        total_member_baru = EXCLUDED.total_member_baru
+    WHERE (s.total_komentar_baru, s.total_tugas_selesai, s.total_poin_diberikan, s.total_member_baru)
+          IS DISTINCT FROM
+          (EXCLUDED.total_komentar_baru, EXCLUDED.total_tugas_selesai,
+           EXCLUDED.total_poin_diberikan, EXCLUDED.total_member_baru)
+"""
+
+# Same names populate-statistics.js seeds and the dashboard reads
+GLOBAL_UPSERT = """
+    INSERT INTO statistik_global AS g (nama_statistik, nilai_statistik, terakhir_diupdate)
+    SELECT name, value, now()
+    FROM (
+        SELECT COALESCE(SUM(total_komentar_baru), 0) AS total_komentar,
+               COALESCE(SUM(total_tugas_selesai), 0) AS total_tugas_selesai,
+               COALESCE(SUM(total_poin_diberikan), 0) AS total_poin_diberikan,
+               (SELECT COUNT(*) FROM members) AS total_member
+        FROM statistik_harian
+    ) totals,
+    LATERAL (VALUES
+        ('total_komentar', totals.total_komentar),
+        ('total_tugas_selesai', totals.total_tugas_selesai),
+        ('total_poin_diberikan', totals.total_poin_diberikan),
+        ('total_member', totals.total_member)
+    ) AS v(name, value)
+    ON CONFLICT (nama_statistik) DO UPDATE
+    SET nilai_statistik = EXCLUDED.nilai_statistik,
+        terakhir_diupdate = now()
+    WHERE g.nilai_statistik IS DISTINCT FROM EXCLUDED.nilai_statistik
+"""
+
+
+def load_state():
+    if STATE_PATH.exists():
+        with open(STATE_PATH, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('verified_at'):
+            state['verified_at'] = datetime.fromisoformat(state['verified_at'])
+        return state
+    return None
+
+
+def save_state(watermarks):
+    state = dict(watermarks)
+    if state.get('verified_at'):
+        state['verified_at'] = state['verified_at'].isoformat()
+    state['updated_at'] = datetime.now().isoformat(timespec='seconds')
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = STATE_PATH.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    tmp_path.replace(STATE_PATH)
+
+
+def read_watermarks(cursor):
+    cursor.execute(WATERMARKS_QUERY)
+    comments_id, history_id, members_id, verified_at = cursor.fetchone()
+    return {
+        'comments_id': comments_id or 0,
+        'history_id': history_id or 0,
+        'members_id': members_id or 0,
+        'verified_at': verified_at,
+    }
+
+
+def changed_days(cursor, previous, current, tz):
+    verified_after = previous['verified_at'] - VERIFICATION_OVERLAP if previous['verified_at'] else datetime.min
+    after = {key: max(0, previous[key] - ID_OVERLAP) for key in ('comments_id', 'history_id', 'members_id')}
+    cursor.execute(CHANGED_DAYS_QUERY, {
+        'tz': tz,
+        'comments_id': after['comments_id'], 'comments_id_to': current['comments_id'],
+        'history_id': after['history_id'], 'history_id_to': current['history_id'],
+        'members_id': after['members_id'], 'members_id_to': current['members_id'],
+        'verified_after': verified_after, 'verified_to': current['verified_at'] or datetime.min,
+    })
+    return [row[0] for row in cursor.fetchall()]
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def rollup_days(conn, days, tz, chunk_days):
+    """Upsert statistik_harian for the given days, one transaction per chunk"""
+    written = 0
+    started = time.perf_counter()
+    for index, chunk in enumerate(chunked(days, chunk_days), 1):
+        chunk_started = time.perf_counter()
+        with conn.cursor() as cur:
+            cur.execute(ROLLUP_UPSERT, {'days': chunk, 'tz': tz})
+            changed = cur.rowcount
+        conn.commit()
+        written += changed
+        done = min(index * chunk_days, len(days))
+        print(f'   📅 {chunk[0]} → {chunk[-1]}: {changed} day(s) changed '
+              f'({time.perf_counter() - chunk_started:.2f}s, {done}/{len(days)} days)')
+    print(f'   ✅ {written} statistik_harian row(s) written in {time.perf_counter() - started:.2f}s')
+    return written
+
+
+def refresh_global(conn):
+    with conn.cursor() as cur:
+        cur.execute(GLOBAL_UPSERT)
+        changed = cur.rowcount
+    conn.commit()
+    print(f'   ✅ statistik_global: {changed} value(s) changed')
+
+
+def parse_date(value):
+    return date.fromisoformat(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Roll raw activity up into statistik_harian / statistik_global')
+    parser.add_argument('--backfill', action='store_true', help='Recompute every day in --from/--to')
+    parser.add_argument('--from', dest='start', type=parse_date, help='First day to backfill (default: oldest data)')
+    parser.add_argument('--to', dest='end', type=parse_date, help='Last day to backfill (default: today)')
+    parser.add_argument('--chunk-days', type=int, default=31, help='Days per transaction (default: 31)')
+    parser.add_argument('--timezone', default=DEFAULT_TIMEZONE, help=f'Day boundary time zone (default: {DEFAULT_TIMEZONE})')
+    args = parser.parse_args()
+
+    print('=' * 60)
+    print('📊 STATISTICS ROLLUP' + (' (BACKFILL)' if args.backfill else ''))
+    print('=' * 60)
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            # Captured before reading any rows, so rows that land during this
+            # run are picked up by the next one (late commits below the
+            # watermark only within ID_OVERLAP / VERIFICATION_OVERLAP)
+            current = read_watermarks(cur)
+            previous = load_state()
+
+            if args.backfill or previous is None:
+                if not args.backfill:
+                    print('ℹ️  No watermark state yet, backfilling all history first')
+                start = args.start
+                if start is None:
+                    cur.execute(HISTORY_RANGE_QUERY, {'tz': args.timezone})
+                    start = cur.fetchone()[0] or date.today()
+                end = args.end or date.today()
+                days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+                print(f'📅 Backfilling {len(days)} day(s): {start} → {end}')
+            else:
+                days = changed_days(cur, previous, current, args.timezone)
+                print(f'🔍 {len(days)} day(s) received new rows since {previous.get("updated_at")}')
+        conn.commit()
+
+        if days:
+            rollup_days(conn, days, args.timezone, args.chunk_days)
+        refresh_global(conn)
+
+        # A partial --from/--to backfill says nothing about rows outside the range
+        if not (args.backfill and (args.start or args.end)):
+            save_state(current)
+    finally:
+        conn.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,311 @@
+"""
+Static analysis of the Next.js API route handlers (src/app/api/**/route.js).
+
+Each route file is tokenized once (js_tokens.py) and split into its
+exported handlers (export async function GET(...) / export const POST =
+...). Per handler it records:
+
+  auth          calls to getCurrentUser / requireAuth / requireAdmin / ...
+  privileges    privilege checks (user_privileges queries, hasPrivilege, ...)
+  prisma        every prisma.<model>.<method>(...) / tx.<model>.<method>(...)
+                call with its line, the loop it sits in (for/while/.map/
+                .forEach/...) and the shape of its options object literal
+  pagination    searchParams.get('page' | 'limit' | 'cursor' | ...) params
+  loop_awaits   every await inside a loop body/callback, with the awaited call
+
+The options shape is a nested dict of the literal's keys, e.g.
+{'where': {'status': "'aktif'"}, 'include': {'members': 'true'}}, or
+None when the call passes a variable. Results are plain JSON and cached
+per file in .cache/codemods.sqlite (namespace 'route-analyzer').
+
+    routes = analyze_routes(jobs=4)
+    for route in routes:
+        for handler in route['handlers']:
+            ...
+"""
+
+import bisect
+import re
+
+import js_tokens
+from file_cache import FileCache, process_files_cached, source_version
+from js_tokens import bracket_pairs, significant_tokens
+from source_tree import iter_source_files, read_source, relative_path
+
+API_ROOT = 'src/app/api'
+HTTP_METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS')
+
+AUTH_FUNCTIONS = {
+    'getCurrentUser', 'requireAuth', 'requireAdmin', 'withSSOAuth', 'verifyToken', 'verifyJWT',
+    'jwtVerify', 'auth', 'currentUser', 'getServerSession',
+}
+PRIVILEGE_FUNCTIONS = {
+    'requireAdmin', 'hasPrivilege', 'checkUserPrivileges', 'canAccessFeature', 'requirePrivilege',
+    'isAdmin', 'checkAdmin', 'checkAdminPrivileges',
+}
+PRIVILEGE_MODELS = {'user_privileges'}
+# Receivers treated as a Prisma client ('tx' inside $transaction callbacks)
+PRISMA_CLIENTS = {'prisma', 'tx', 'trx', 'prismaTx', 'db'}
+PRISMA_METHODS = {
+    'findMany', 'findFirst', 'findFirstOrThrow', 'findUnique', 'findUniqueOrThrow', 'count', 'aggregate',
+    'groupBy', 'create', 'createMany', 'update', 'updateMany', 'upsert', 'delete', 'deleteMany',
+}
+RAW_METHODS = {'$queryRaw', '$queryRawUnsafe', '$executeRaw', '$executeRawUnsafe'}
+PAGINATION_PARAMS = {'page', 'limit', 'take', 'skip', 'cursor', 'offset', 'pageSize', 'page_size',
+                     'perPage', 'per_page'}
+LOOP_METHODS = {'map', 'forEach', 'flatMap', 'reduce', 'filter', 'some', 'every', 'find'}
+
+
+def route_path(rel_path):
+    """'src/app/api/admin/tugas/[id]/route.js' -> '/api/admin/tugas/[id]'"""
+    return '/' + rel_path[len('src/app/'):].rsplit('/', 1)[0]
+
+
+class _File:
+    def __init__(self, text):
+        self.text = text
+        self.tokens = significant_tokens(text)
+        self.pairs = bracket_pairs(self.tokens)
+        self.newlines = [m.start() for m in re.finditer('\n', text)]
+
+    def line(self, index):
+        return bisect.bisect_right(self.newlines, self.tokens[index].start) + 1
+
+    def is_punct(self, index, value):
+        return 0 <= index < len(self.tokens) and self.tokens[index].kind == 'punct' and self.tokens[index].value == value
+
+    def is_name(self, index, value=None):
+        return (0 <= index < len(self.tokens) and self.tokens[index].kind == 'name'
+                and (value is None or self.tokens[index].value == value))
+
+    def next_open(self, index, value, stop):
+        """Index of the first `value` bracket at or after index (before stop), or None"""
+        for i in range(index, stop):
+            if self.is_punct(i, value):
+                return i
+        return None
+
+    def chain(self, index):
+        """Dotted call chain ending at the name token at index: prisma.tugas.findMany -> [...]"""
+        names = [self.tokens[index].value]
+        i = index
+        while self.is_punct(i - 1, '.') or self.is_punct(i - 1, '?.'):
+            if not self.is_name(i - 2):
+                break
+            names.insert(0, self.tokens[i - 2].value)
+            i -= 2
+        return names
+
+    def object_shape(self, open_index, depth=0):
+        """Keys of the object literal at open_index: {key: nested shape | value source}"""
+        close = self.pairs.get(open_index)
+        if close is None:
+            return {}
+        shape = {}
+        i = open_index + 1
+        while i < close:
+            token = self.tokens[i]
+            if token.kind == 'punct' and token.value == '...':
+                shape.setdefault('...', None)
+            elif token.kind in ('name', 'string') and (self.is_punct(i + 1, ':') or
+                                                       self.is_punct(i + 1, ',') or i + 1 == close):
+                key = token.value.strip('\'"')
+                if self.is_punct(i + 1, ':'):
+                    value_start = i + 2
+                    value_end = self._value_end(value_start, close)
+                    if self.is_punct(value_start, '{') and depth < 6:
+                        shape[key] = self.object_shape(value_start, depth + 1)
+                    else:
+                        start = self.tokens[value_start].start if value_start < close else token.end
+                        end = self.tokens[value_end - 1].end if value_end > value_start else start
+                        shape[key] = ' '.join(self.text[start:end].split())[:80]
+                    i = value_end
+                    continue
+                shape[key] = key  # shorthand { take }
+            i = self._value_end(i, close) if not self.is_punct(i, ',') else i + 1
+        return shape
+
+    def _value_end(self, index, close):
+        """Index of the ',' (or close) ending the property value starting at index"""
+        i = index
+        while i < close:
+            if self.is_punct(i, ','):
+                return i
+            i = self.pairs.get(i, i) + 1
+        return close
+
+
+def _handlers(f):
+    """(method, body_open, body_close, line) for each exported handler"""
+    handlers = []
+    tokens = f.tokens
+    for i, token in enumerate(tokens):
+        if not f.is_name(i, 'export'):
+            continue
+        j = i + 1
+        if f.is_name(j, 'async'):
+            j += 1
+        if f.is_name(j, 'function') and f.is_name(j + 1) and tokens[j + 1].value in HTTP_METHODS:
+            method = tokens[j + 1].value
+            params = f.next_open(j + 2, '(', len(tokens))
+            body = f.next_open(f.pairs.get(params, j + 2), '{', len(tokens)) if params is not None else None
+        elif (f.is_name(j, 'const') or f.is_name(j, 'let')) and f.is_name(j + 1) and tokens[j + 1].value in HTTP_METHODS:
+            method = tokens[j + 1].value
+            # export const GET = async (request) => { ... } / withAuth(async (req) => { ... })
+            arrow = next((k for k in range(j + 2, min(j + 40, len(tokens))) if f.is_punct(k, '=>')), None)
+            body = arrow + 1 if arrow is not None and f.is_punct(arrow + 1, '{') else None
+        else:
+            continue
+        if body is not None and body in f.pairs:
+            handlers.append((method, body, f.pairs[body], f.line(i)))
+    return handlers
+
+
+def _loops(f, start, stop):
+    """[(kind, first, last)] token ranges of loop bodies/callbacks inside start..stop"""
+    loops = []
+    for i in range(start, stop):
+        token = f.tokens[i]
+        if token.kind != 'name':
+            continue
+        if token.value in ('for', 'while') and f.is_punct(i + 1, '(') or token.value == 'for' and f.is_name(i + 1, 'await'):
+            head = i + 1 if f.is_punct(i + 1, '(') else i + 2
+            head_close = f.pairs.get(head)
+            if head_close is None:
+                continue
+            if f.is_punct(head_close + 1, '{') and head_close + 1 in f.pairs:
+                loops.append((token.value, head_close + 1, f.pairs[head_close + 1]))
+            else:
+                end = next((k for k in range(head_close + 1, stop) if f.is_punct(k, ';')), stop)
+                loops.append((token.value, head_close + 1, end))
+        elif token.value == 'do' and f.is_punct(i + 1, '{') and i + 1 in f.pairs:
+            loops.append(('do', i + 1, f.pairs[i + 1]))
+        elif token.value in LOOP_METHODS and f.is_punct(i - 1, '.') and f.is_punct(i + 1, '(') and i + 1 in f.pairs:
+            loops.append((token.value, i + 1, f.pairs[i + 1]))
+    return loops
+
+
+def _innermost_loop(loops, index):
+    inside = [loop for loop in loops if loop[1] < index < loop[2]]
+    return min(inside, key=lambda loop: loop[2] - loop[1])[0] if inside else None
+
+
+def _awaited_call(f, index):
+    """'prisma.members.update' / 'fetch' / 'new Promise' for the expression after an await, or None"""
+    if f.is_name(index, 'new'):
+        call = _awaited_call(f, index + 1)
+        return f'new {call}' if call else None
+    i = index
+    while f.is_name(i) and (f.is_punct(i + 1, '.') or f.is_punct(i + 1, '?.')):
+        i += 2
+    return '.'.join(f.chain(i)) if f.is_name(i) else None
+
+
+def analyze_handler(f, method, body_open, body_close, line):
+    loops = _loops(f, body_open, body_close)
+    handler = {'method': method, 'line': line, 'auth': [], 'privileges': [], 'prisma': [], 'pagination': [],
+               'loop_awaits': []}
+    for i in range(body_open + 1, body_close):
+        token = f.tokens[i]
+        if token.kind == 'name' and token.value == 'await':
+            loop = _innermost_loop(loops, i)
+            # 'return await x()' leaves the loop (retry helpers), so it runs once
+            if loop and not f.is_name(i - 1, 'return'):
+                handler['loop_awaits'].append({'line': f.line(i), 'loop': loop, 'call': _awaited_call(f, i + 1)})
+            continue
+        if token.kind != 'name' or not f.is_punct(i + 1, '('):
+            # Tagged template: prisma.$queryRaw`...`
+            if token.kind == 'name' and i + 1 < body_close and f.tokens[i + 1].kind == 'template':
+                chain = f.chain(i)
+                if chain[0] in PRISMA_CLIENTS and chain[-1] in RAW_METHODS:
+                    handler['prisma'].append({'model': None, 'method': chain[-1], 'line': f.line(i),
+                                              'loop': _innermost_loop(loops, i), 'options': None})
+            continue
+        chain = f.chain(i)
+        name = chain[-1]
+        if name in AUTH_FUNCTIONS and name not in handler['auth']:
+            handler['auth'].append(name)
+        if name in PRIVILEGE_FUNCTIONS and name not in handler['privileges']:
+            handler['privileges'].append(name)
+
+        if chain[0] in PRISMA_CLIENTS and (
+                (len(chain) == 3 and name in PRISMA_METHODS) or (len(chain) == 2 and name in RAW_METHODS)):
+            model = chain[1] if len(chain) == 3 else None
+            first_arg = i + 2
+            options = f.object_shape(first_arg) if f.is_punct(first_arg, '{') else None
+            if f.is_punct(first_arg, ')'):
+                options = {}
+            handler['prisma'].append({'model': model, 'method': name, 'line': f.line(i),
+                                      'loop': _innermost_loop(loops, i), 'options': options})
+            if model in PRIVILEGE_MODELS and f'{model}.{name}' not in handler['privileges']:
+                handler['privileges'].append(f'{model}.{name}')
+
+        if name == 'get' and len(chain) >= 2 and f.tokens[i + 2].kind == 'string' and f.is_punct(i + 3, ')'):
+            param = f.tokens[i + 2].value.strip('\'"')
+            if param in PAGINATION_PARAMS and param not in handler['pagination']:
+                handler['pagination'].append(param)
+    return handler
+
+
+def analyze_source(text):
+    f = _File(text)
+    return [analyze_handler(f, *h) for h in _handlers(f)]
+
+
+def analyze_file(path):
+    """Per-file unit of work for the cache/worker pool"""
+    rel = relative_path(path)
+    return {'path': rel, 'route': route_path(rel), 'handlers': analyze_source(read_source(path))}
+
+
+def route_files():
+    return [p for p in iter_source_files(roots=(API_ROOT,)) if p.name in ('route.js', 'route.ts')]
+
+
+def analyze_routes(jobs=1, use_cache=True, only=None):
+    """Analysis of every route file (optionally those whose route contains `only`), in path order"""
+    cache = FileCache('route-analyzer', source_version(__file__, js_tokens.__file__))
+    if not use_cache:
+        cache.clear()
+    try:
+        routes = [result for _, result in process_files_cached(analyze_file, route_files(), cache, jobs=jobs)]
+    finally:
+        cache.close()
+    if only:
+        routes = [r for r in routes if only in r['route'] or only in r['path']]
+    return routes
+
+
+def is_unbounded(call):
+    """findMany whose options literal has no take (None when the options are not a literal)"""
+    if call['method'] != 'findMany':
+        return False
+    if call['options'] is None or '...' in call['options']:
+        return None
+    return 'take' not in call['options']
+
+
+MUTATING_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+def handler_findings(handler):
+    """[(kind, line, message)] for one analyzed handler, most costly first"""
+    findings = []
+    unbounded = False
+    for call in handler['prisma']:
+        target = f'{call["model"]}.{call["method"]}' if call['model'] else call['method']
+        if call['loop']:
+            findings.append(('n+1', call['line'], f'{target} inside .{call["loop"]}()'
+                             if call['loop'] in LOOP_METHODS else f'{target} inside a {call["loop"]} loop'))
+        bounded = is_unbounded(call)
+        if bounded:
+            unbounded = True
+            findings.append(('unbounded', call['line'], f'{target} without take'))
+        elif bounded is None:
+            findings.append(('dynamic-options', call['line'], f'{target} options are built at runtime'))
+    if handler['method'] == 'GET' and unbounded and not handler['pagination']:
+        findings.append(('no-pagination', handler['line'], 'GET returns an unbounded list without pagination params'))
+    if not handler['auth'] and not handler['privileges']:
+        severity = 'no-auth-mutation' if handler['method'] in MUTATING_METHODS else 'no-auth'
+        findings.append((severity, handler['line'], f'{handler["method"]} handler has no auth call'))
+    return findings
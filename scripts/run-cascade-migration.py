@@ -1,13 +1,33 @@
+"""
+Run the CASCADE DELETE migration for members' child tables
+
+Usage:
+  python scripts/run-cascade-migration.py            # apply the .sql file via migration_runner
+  python scripts/run-cascade-migration.py --online   # NOT VALID + swap + VALIDATE CONSTRAINT per FK
+"""
 import psycopg2
 import os
+import sys
 from urllib.parse import urlparse
 from pathlib import Path
 from dotenv import load_dotenv
 
+from migration_runner import apply_migration
+from online_constraints import swap_foreign_key_online
+
 # Load environment variables from .env file
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(env_path)
 
+ONLINE = '--online' in sys.argv
+
+# Same constraints as prisma/migrations/add_cascade_delete_missing_tables.sql
+CASCADE_TARGETS = [
+    ('task_submissions', 'id_member', 'task_submissions_id_member_fkey'),
+    ('reward_redemptions', 'id_member', 'fk_member'),
+    ('member_transactions', 'member_id', 'member_transactions_member_id_fkey'),
+]
+
 def parse_database_url(url):
     """Parse PostgreSQL connection string"""
     result = urlparse(url)
@@ -40,25 +60,28 @@ def run_migration():
         
         print('✅ Connected to database\n')
         
-        # Read migration file
-        migration_path = 'prisma/migrations/add_cascade_delete_missing_tables.sql'
-        print(f'📝 Reading migration file: {migration_path}')
-        
-        with open(migration_path, 'r', encoding='utf-8') as f:
-            migration_sql = f.read()
-        
-        print('⚙️  Executing migration...\n')
-        
-        # Execute the entire SQL script
-        cursor.execute(migration_sql)
-        
-        # Get all notices (including our SUCCESS message)
-        for notice in conn.notices:
-            print(notice.strip())
-        
-        # Commit transaction
-        conn.commit()
-        print('\n✅ Migration committed successfully!\n')
+        if ONLINE:
+            print('⚙️  Executing online migration (NOT VALID + VALIDATE CONSTRAINT)...\n')
+            all_valid = True
+            for table, column, constraint in CASCADE_TARGETS:
+                print(f'🔗 {table}.{column} → members.id ({constraint})')
+                all_valid &= swap_foreign_key_online(
+                    conn, table, column, 'members', 'id',
+                    name=constraint, old_name=constraint,
+                    on_delete='CASCADE', on_update='NO ACTION'
+                )
+                print()
+            if not all_valid:
+                print('⚠️  Some constraints are NOT VALID yet (see above)\n')
+        else:
+            # Statement by statement, timed, recorded in the _script_migrations ledger
+            migration_path = 'prisma/migrations/add_cascade_delete_missing_tables.sql'
+            print(f'📝 Running migration file: {migration_path}\n')
+            
+            if apply_migration(conn, migration_path) == 'skipped':
+                print('ℹ️  Migration already applied, nothing to do\n')
+            else:
+                print('\n✅ Migration committed successfully!\n')
         
         # Verify constraints
         print('🔍 Verifying constraints...\n')
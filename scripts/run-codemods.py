@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Run the source codemods in one pass over src/ and lib/
+
+Replaces running the six fixer scripts one after another: every file is
+read once, rules whose literal prefilters are absent are skipped, and the
+remaining rules are applied in a single combined scan. Rule sets live in
+codemod_rules.py; the engine is codemod.py.
+
+All edits are computed in memory first (an edit plan, see edit_plan.py).
+A dry run prints them as a unified diff or writes a patch file; otherwise
+every changed file is written to a temp file and then swapped in with
+os.replace, so a failure never leaves the tree half-migrated. A saved plan
+can be replayed on another checkout of the same sources without running
+the rules again.
+
+Usage:
+  python scripts/run-codemods.py --list                        # show rule sets
+  python scripts/run-codemods.py --dry-run                     # unified diff, write nothing
+  python scripts/run-codemods.py --patch .cache/codemods.patch # same, into a patch file
+  python scripts/run-codemods.py                               # all rule sets
+  python scripts/run-codemods.py --rules userid,clerk-id
+  python scripts/run-codemods.py --rules prisma-singleton src/app/api/tasks
+  python scripts/run-codemods.py --jobs 0                      # one worker per CPU
+  python scripts/run-codemods.py --since origin/main --dry-run # only files changed since a ref
+  python scripts/run-codemods.py --dry-run --save-plan clerk.plan.json
+  python scripts/run-codemods.py --replay clerk.plan.json      # apply a saved plan as-is
+
+Per-file results are cached in .cache/codemods.sqlite (see file_cache.py),
+so files untouched since the last run with the same rules are not re-read.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from collections import Counter
+from functools import partial
+from pathlib import Path
+
+from codemod import Codemod, plan_file
+from codemod_rules import RULE_SETS, select_rules
+from edit_plan import StalePlanError, apply_plan, load_plan, new_plan, plan_diff, save_plan
+from file_cache import FileCache, add_cache_arguments, process_files_cached
+from module_resolver import ModuleResolver
+from source_tree import add_jobs_argument, changed_since, iter_source_files, relative_path, resolve_jobs
+
+
+def list_rules():
+    for name, rules in RULE_SETS.items():
+        print(f'\n📦 {name}')
+        for rule in rules:
+            print(f'   {rule.name:<24} {rule.description}')
+
+
+def write_or_apply(plan, args):
+    """Emit the diff/patch for a dry run, or apply the plan; returns an exit code"""
+    if args.save_plan:
+        save_plan(plan, args.save_plan)
+        print(f'💾 Plan saved to {args.save_plan}')
+    try:
+        if args.patch:
+            with open(args.patch, 'w', encoding='utf-8', newline='') as f:
+                f.writelines(plan_diff(plan))
+            print(f'📄 Patch written to {args.patch} (git apply {args.patch})')
+        elif args.dry_run:
+            print()
+            sys.stdout.writelines(plan_diff(plan))
+        else:
+            written = apply_plan(plan)
+            print(f'✅ {len(written)} file(s) written')
+    except StalePlanError as e:
+        print(f'❌ Plan is stale, nothing was written: {e}')
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply codemod rule sets to src/ and lib/ in one pass')
+    parser.add_argument('paths', nargs='*', help='Limit to these files/directories (default: src/ and lib/)')
+    parser.add_argument('--rules', help=f'Comma-separated rule sets (default: all of {", ".join(RULE_SETS)})')
+    parser.add_argument('--dry-run', action='store_true', help='Print a unified diff, write nothing')
+    parser.add_argument('--patch', metavar='FILE', help='Write the diff to FILE instead (implies --dry-run)')
+    parser.add_argument('--save-plan', metavar='FILE', help='Also save the edit plan as JSON')
+    parser.add_argument('--replay', metavar='FILE', help='Apply a saved edit plan without running the rules')
+    parser.add_argument('--list', action='store_true', help='List rule sets and exit')
+    add_jobs_argument(parser)
+    add_cache_arguments(parser)
+    args = parser.parse_args()
+
+    if args.list:
+        list_rules()
+        return 0
+    args.dry_run = args.dry_run or bool(args.patch)
+
+    if args.replay:
+        plan = load_plan(args.replay)
+        edits = sum(len(fp['edits']) for fp in plan['files'])
+        print(f'🔁 Replaying {args.replay}: {edits} edit(s) in {len(plan["files"])} file(s)')
+        return write_or_apply(plan, args)
+
+    try:
+        rules = select_rules(args.rules.split(',') if args.rules else None)
+    except ValueError as e:
+        print(f'❌ {e}')
+        return 1
+    codemod = Codemod(rules, resolver=ModuleResolver.for_tree())
+
+    roots = [relative_path(Path(p).resolve()) for p in args.paths] if args.paths else None
+    try:
+        if args.since:
+            files = changed_since(args.since, roots) if roots else changed_since(args.since)
+        else:
+            files = list(iter_source_files(roots) if roots else iter_source_files())
+    except subprocess.CalledProcessError as e:
+        print(f'❌ git failed: {e.stderr.strip()}')
+        return 1
+
+    print('=' * 60)
+    print('🛠️  CODEMODS' + (' (DRY RUN)' if args.dry_run else ''))
+    print('=' * 60)
+    print(f'Rules: {len(rules)} from {args.rules or "all sets"}, {resolve_jobs(args.jobs)} worker(s)\n')
+
+    started = time.perf_counter()
+    scanned = 0
+    changed = []
+    totals = Counter()
+    cache = FileCache('codemods', codemod.version)
+    if args.no_cache:
+        cache.clear()
+    file_plans = []
+    for _, fp in process_files_cached(partial(plan_file, codemod), files, cache, jobs=args.jobs):
+        scanned += 1
+        if not fp['edits']:
+            continue
+        file_plans.append(fp)
+        hits = Counter(edit[3] for edit in fp['edits'])
+        changed.append(fp['path'])
+        totals.update(hits)
+        print(f'📝 {fp["path"]}: ' + ', '.join(f'{n} x{c}' for n, c in sorted(hits.items())))
+    cache.close()
+
+    print(f'\n📊 {scanned} file(s) checked ({cache.stats["hits"] + cache.stats["rehashed"]} from cache), '
+          f'{len(changed)} {"would change" if args.dry_run else "changed"} in {time.perf_counter() - started:.2f}s')
+    for name, count in totals.most_common():
+        print(f'   {name:<24} {count}')
+    if not changed:
+        return 0
+    return write_or_apply(new_plan(codemod, file_plans), args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Apply hand-written .sql migrations with a checksum ledger
+
+Every file runs in one transaction (autocommit when it contains
+CREATE INDEX CONCURRENTLY and friends) with per-statement timing, a
+statement_timeout and captured NOTICE output. Applied files are recorded in
+_script_migrations; re-running an applied file is a no-op and running an
+edited one is refused.
+
+Usage:
+  python scripts/run-migrations.py --status
+  python scripts/run-migrations.py prisma/migrations/fix_clerk_id_relations.sql
+  python scripts/run-migrations.py --plan prisma/migrations/fix_clerk_id_relations.sql
+  python scripts/run-migrations.py --plan --plan-against-scratch postgresql://.../scratch FILE
+  python scripts/run-migrations.py --statement-timeout 15min --lock-timeout 5s FILE...
+  python scripts/run-migrations.py --force FILE     # re-apply an edited file
+
+--plan never executes DDL or DO blocks: it lists them with the lock they
+take and EXPLAINs the DML read-only. --plan-against-scratch DSN runs the
+DDL on that (scratch) database inside a rolled-back transaction so the DML
+is planned against the changed schema.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import psycopg2
+
+from db_utils import DEFAULT_APPLICATION_NAME, get_db_connection, parse_database_url
+from migration_runner import (
+    MIGRATIONS_DIR, MigrationError, apply_migration, ledger_entries,
+    load_migration, migration_status, plan_migration, plan_migration_on_scratch
+)
+
+STATUS_ICONS = {'applied': '✅', 'pending': '⏳', 'changed': '⚠️ '}
+
+
+def print_status(conn, paths):
+    paths = paths or sorted(MIGRATIONS_DIR.glob('*.sql'))
+    with conn.cursor() as cur:
+        ledger = ledger_entries(cur)
+
+    print(f'{"":<3}{"MIGRATION":<60} {"STATUS":<8} {"APPLIED AT":<20} {"MS":>8}')
+    print('-' * 102)
+    for path in paths:
+        migration = load_migration(path)
+        status = migration_status(migration, ledger)
+        entry = ledger.get(migration['name'], {})
+        applied_at = entry['applied_at'].strftime('%Y-%m-%d %H:%M') if entry else ''
+        duration = entry.get('duration_ms', '')
+        print(f'{STATUS_ICONS[status]} {migration["name"]:<60} {status:<8} {applied_at:<20} {duration:>8}')
+
+    untracked = set(ledger) - {load_migration(p)['name'] for p in paths}
+    if untracked:
+        print(f'\nℹ️  Also in the ledger: {", ".join(sorted(untracked))}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run .sql migrations with timing and a checksum ledger')
+    parser.add_argument('files', nargs='*', help='.sql files to apply, in order')
+    parser.add_argument('--status', action='store_true', help='Show ledger status (default: prisma/migrations/*.sql)')
+    parser.add_argument('--plan', action='store_true',
+                        help='Static plan: list DDL with its locks, EXPLAIN the DML read-only')
+    parser.add_argument('--plan-against-scratch', metavar='DSN',
+                        help='With --plan: execute the DDL on this scratch database (rolled back) first')
+    parser.add_argument('--statement-timeout', default='5min', help='Per-statement timeout (default: 5min)')
+    parser.add_argument('--lock-timeout', default='10s', help='Lock wait timeout (default: 10s)')
+    parser.add_argument('--force', action='store_true', help='Re-apply files already in the ledger')
+    args = parser.parse_args()
+
+    if not args.files and not args.status:
+        parser.error('give one or more .sql files, or --status')
+    if args.plan_against_scratch and not args.plan:
+        parser.error('--plan-against-scratch requires --plan')
+
+    missing = [f for f in args.files if not Path(f).is_file()]
+    if missing:
+        print(f'❌ Migration file not found: {", ".join(missing)}')
+        return 1
+
+    try:
+        if args.plan_against_scratch:
+            conn = psycopg2.connect(application_name=DEFAULT_APPLICATION_NAME,
+                                    **parse_database_url(args.plan_against_scratch))
+        else:
+            conn = get_db_connection()
+    except Exception as e:
+        print(f'❌ Could not connect: {e}')
+        return 1
+
+    try:
+        if args.status:
+            print_status(conn, [Path(f) for f in args.files])
+            return 0
+
+        print('=' * 70)
+        print('  SQL MIGRATIONS' + (' (PLAN ONLY, NOTHING IS APPLIED)' if args.plan else ''))
+        print('=' * 70)
+
+        results = {'applied': 0, 'skipped': 0}
+        failed_plans = 0
+        for path in args.files:
+            print()
+            if args.plan:
+                try:
+                    if args.plan_against_scratch:
+                        plan_migration_on_scratch(conn, path)
+                    else:
+                        plan_migration(conn, path)
+                except Exception as e:
+                    print(f'❌ Could not plan {path}: {e}')
+                    failed_plans += 1
+                continue
+            try:
+                results[apply_migration(conn, path, args.statement_timeout, args.lock_timeout, args.force)] += 1
+            except MigrationError as e:
+                print(f'❌ {e}')
+                print('🛑 Stopping; later files were not run')
+                return 1
+            except Exception as e:
+                # Connection loss, lock/ledger errors and the like outside a statement
+                print(f'❌ {path}: {type(e).__name__}: {str(e).strip()}')
+                print('🛑 Stopping; later files were not run')
+                return 1
+
+        if args.plan:
+            return 1 if failed_plans else 0
+        print(f'\n✅ {results["applied"]} applied, {results["skipped"]} already up to date')
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Schema snapshot and drift detector
+
+Pulls columns, constraints and indexes for every table from pg_catalog in
+three queries, parses prisma/schema.prisma and diffs the two in memory.
+Replaces the table-by-table information_schema checks in check-schema.py,
+check-cascade-status.py and migrate-cascade-delete-safe.py.
+
+Usage:
+  python scripts/schema-snapshot.py                          # JSON drift report
+  python scripts/schema-snapshot.py --format text            # human summary
+  python scripts/schema-snapshot.py --save-snapshot snap.json
+  python scripts/schema-snapshot.py --from-snapshot snap.json  # diff offline
+  python scripts/schema-snapshot.py --fail-on-drift          # exit 1 on drift (CI)
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from prisma_schema import SCHEMA_PATH, load_schema
+from schema_catalog import diff_schema, take_snapshot
+
+
+def print_text_report(report):
+    summary = report['summary']
+    print('=' * 70)
+    print('  SCHEMA DRIFT: prisma/schema.prisma vs database')
+    print('=' * 70)
+    print(f'📋 Models: {summary["models"]} | DB tables: {summary["database_tables"]}')
+    print(f'⏱️  Snapshot {summary["snapshot_ms"]} ms | diff {summary["diff_ms"]} ms | '
+          f'total {summary["total_ms"]} ms')
+
+    if report['missing_tables']:
+        print(f'\n❌ Tables missing in database: {", ".join(report["missing_tables"])}')
+    if report['extra_tables']:
+        print(f'\n⚠️  Tables not in schema.prisma: {", ".join(report["extra_tables"])}')
+
+    for table, drift in report['tables'].items():
+        print(f'\n📄 {table}')
+        for kind, details in drift.items():
+            if isinstance(details, list):
+                for item in details:
+                    print(f'   - {kind}: {json.dumps(item, default=str) if isinstance(item, dict) else item}')
+            else:
+                print(f'   - {kind}: {json.dumps(details, default=str)}')
+
+    print()
+    if summary['issues'] == 0:
+        print('✅ No drift detected')
+    else:
+        print(f'⚠️  {summary["issues"]} drift item(s) in {summary["tables_with_drift"]} table(s)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Diff the live database schema against schema.prisma')
+    parser.add_argument('--format', choices=['json', 'text'], default='json', help='Report format (default: json)')
+    parser.add_argument('--schema', default=str(SCHEMA_PATH), help='Path to schema.prisma')
+    parser.add_argument('--save-snapshot', metavar='FILE', help='Also write the raw catalog snapshot to FILE')
+    parser.add_argument('--from-snapshot', metavar='FILE', help='Diff against a saved snapshot instead of the DB')
+    parser.add_argument('--fail-on-drift', action='store_true', help='Exit with status 1 when drift is found')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    schema = load_schema(args.schema)
+
+    if args.from_snapshot:
+        with open(args.from_snapshot, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    else:
+        from db_utils import get_db_connection
+
+        conn = get_db_connection(autocommit=True)
+        try:
+            with conn.cursor() as cur:
+                snapshot = take_snapshot(cur)
+        finally:
+            conn.close()
+
+    if args.save_snapshot:
+        with open(args.save_snapshot, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, indent=2)
+
+    report = diff_schema(schema, snapshot)
+    report['summary']['total_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+    if args.format == 'json':
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print_text_report(report)
+
+    return 1 if args.fail_on_drift and report['summary']['issues'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,324 @@
+"""
+Schema snapshot from pg_catalog and drift detection against schema.prisma.
+
+A snapshot is three catalog queries (columns, constraints, indexes) for all
+tables in the public schema, which is much faster than walking
+information_schema table by table. The diff runs in memory against the
+parsed Prisma models.
+"""
+
+import time
+
+COLUMNS_QUERY = """
+    SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod), a.attnotnull, a.atthasdef
+    FROM pg_attribute a
+    JOIN pg_class c ON c.oid = a.attrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public'
+      AND c.relkind IN ('r', 'p')
+      AND a.attnum > 0
+      AND NOT a.attisdropped
+    ORDER BY c.relname, a.attnum
+"""
+
+CONSTRAINTS_QUERY = """
+    SELECT c.relname,
+           con.conname,
+           con.contype,
+           ARRAY(
+               SELECT a.attname::text
+               FROM unnest(con.conkey) WITH ORDINALITY AS k(attnum, ord)
+               JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+               ORDER BY k.ord
+           ),
+           ref.relname,
+           ARRAY(
+               SELECT a.attname::text
+               FROM unnest(con.confkey) WITH ORDINALITY AS k(attnum, ord)
+               JOIN pg_attribute a ON a.attrelid = con.confrelid AND a.attnum = k.attnum
+               ORDER BY k.ord
+           ),
+           con.confdeltype,
+           con.confupdtype,
+           con.convalidated
+    FROM pg_constraint con
+    JOIN pg_class c ON c.oid = con.conrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_class ref ON ref.oid = con.confrelid
+    WHERE n.nspname = 'public'
+      AND con.contype IN ('p', 'u', 'f')
+    ORDER BY c.relname, con.conname
+"""
+
+INDEXES_QUERY = """
+    SELECT t.relname,
+           i.relname,
+           ix.indisunique,
+           ix.indisprimary,
+           ix.indisvalid,
+           ix.indpred IS NOT NULL,
+           ARRAY(
+               SELECT a.attname::text
+               FROM unnest(ix.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+               JOIN pg_attribute a ON a.attrelid = ix.indrelid AND a.attnum = k.attnum
+               ORDER BY k.ord
+           )
+    FROM pg_index ix
+    JOIN pg_class i ON i.oid = ix.indexrelid
+    JOIN pg_class t ON t.oid = ix.indrelid
+    JOIN pg_namespace n ON n.oid = t.relnamespace
+    WHERE n.nspname = 'public'
+    ORDER BY t.relname, i.relname
+"""
+
+ACTION_CODES = {'a': 'NoAction', 'r': 'Restrict', 'c': 'Cascade', 'n': 'SetNull', 'd': 'SetDefault'}
+
+# Migration bookkeeping tables (Prisma's own and migration_runner's ledger)
+IGNORED_TABLES = {'_prisma_migrations', '_script_migrations'}
+
+PRISMA_BASE_TYPES = {
+    'String': 'text',
+    'Int': 'integer',
+    'BigInt': 'bigint',
+    'Float': 'double precision',
+    'Decimal': 'numeric(65,30)',
+    'Boolean': 'boolean',
+    'DateTime': 'timestamp(3) without time zone',
+    'Json': 'jsonb',
+    'Bytes': 'bytea',
+}
+
+DB_NATIVE_TYPES = {
+    'VarChar': 'character varying',
+    'Char': 'character',
+    'Text': 'text',
+    'Timestamptz': 'timestamp with time zone',
+    'Timestamp': 'timestamp without time zone',
+    'Time': 'time without time zone',
+    'Timetz': 'time with time zone',
+    'Date': 'date',
+    'Uuid': 'uuid',
+    'Integer': 'integer',
+    'SmallInt': 'smallint',
+    'BigInt': 'bigint',
+    'DoublePrecision': 'double precision',
+    'Real': 'real',
+    'Decimal': 'numeric',
+    'Money': 'money',
+    'Boolean': 'boolean',
+    'Json': 'json',
+    'JsonB': 'jsonb',
+    'Inet': 'inet',
+    'Xml': 'xml',
+    'ByteA': 'bytea',
+}
+
+
+def take_snapshot(cursor):
+    """Columns, constraints and indexes for every public table in three queries"""
+    started = time.perf_counter()
+    tables = {}
+
+    def table(name):
+        return tables.setdefault(name, {'columns': {}, 'constraints': [], 'indexes': []})
+
+    cursor.execute(COLUMNS_QUERY)
+    for relname, column, data_type, not_null, has_default in cursor.fetchall():
+        table(relname)['columns'][column] = {
+            'type': data_type, 'not_null': not_null, 'has_default': has_default
+        }
+
+    cursor.execute(CONSTRAINTS_QUERY)
+    for relname, name, contype, columns, ref_table, ref_columns, del_code, upd_code, validated in cursor.fetchall():
+        entry = {'name': name, 'type': {'p': 'primary', 'u': 'unique', 'f': 'foreign'}[contype],
+                 'columns': list(columns)}
+        if contype == 'f':
+            entry.update({
+                'referenced_table': ref_table,
+                'referenced_columns': list(ref_columns),
+                'on_delete': ACTION_CODES.get(del_code, del_code),
+                'on_update': ACTION_CODES.get(upd_code, upd_code),
+                'validated': validated,
+            })
+        table(relname)['constraints'].append(entry)
+
+    cursor.execute(INDEXES_QUERY)
+    for relname, name, unique, primary, valid, partial, columns in cursor.fetchall():
+        table(relname)['indexes'].append({
+            'name': name, 'unique': unique, 'primary': primary, 'valid': valid,
+            'partial': partial, 'columns': list(columns)
+        })
+
+    return {
+        'tables': tables,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def expected_column_type(field, schema):
+    """format_type() string Prisma would create for a scalar field"""
+    if field.type.startswith('Unsupported'):
+        base = field.type[len('Unsupported("'):-2]
+    elif field.db_type:
+        native, _, args = field.db_type.partition('(')
+        base = DB_NATIVE_TYPES.get(native, native.lower())
+        if args:
+            args = args.rstrip(')').replace(' ', '')
+            if ' with' in base:
+                # timestamp(6) with time zone
+                head, _, tail = base.partition(' with')
+                base = f'{head}({args}) with{tail}'
+            else:
+                base = f'{base}({args})'
+    elif field.type in schema.enums:
+        base = field.type
+    else:
+        base = PRISMA_BASE_TYPES.get(field.type, field.type)
+    return f'{base}[]' if field.is_list else base
+
+
+def expected_foreign_keys(model, schema):
+    """Foreign keys implied by the model's @relation(fields: ...) declarations"""
+    return [
+        {
+            'name': relation.constraint_name,
+            'columns': relation.columns,
+            'referenced_table': relation.referenced_table,
+            'referenced_columns': relation.referenced_columns,
+            'on_delete': relation.on_delete,
+            'on_update': relation.on_update,
+        }
+        for relation in model.relations
+    ]
+
+
+def diff_table(model, actual, schema):
+    """Compare one Prisma model with its snapshot entry"""
+    drift = {}
+
+    expected_columns = {f.column_name: f for f in model.scalar_fields()}
+    actual_columns = actual['columns']
+
+    missing = sorted(set(expected_columns) - set(actual_columns))
+    extra = sorted(set(actual_columns) - set(expected_columns))
+    if missing:
+        drift['missing_columns'] = missing
+    if extra:
+        drift['extra_columns'] = extra
+
+    type_mismatches, null_mismatches = [], []
+    for column, field in expected_columns.items():
+        if column not in actual_columns:
+            continue
+        expected_type = expected_column_type(field, schema)
+        actual_type = actual_columns[column]['type']
+        if expected_type != actual_type:
+            type_mismatches.append({'column': column, 'expected': expected_type, 'actual': actual_type})
+        if not field.is_list and (not field.optional) != actual_columns[column]['not_null']:
+            null_mismatches.append({
+                'column': column,
+                'expected': 'NOT NULL' if not field.optional else 'NULL',
+                'actual': 'NOT NULL' if actual_columns[column]['not_null'] else 'NULL',
+            })
+    if type_mismatches:
+        drift['type_mismatches'] = type_mismatches
+    if null_mismatches:
+        drift['nullability_mismatches'] = null_mismatches
+
+    # Primary key
+    actual_pk = next((c for c in actual['constraints'] if c['type'] == 'primary'), None)
+    if model.primary_key and (not actual_pk or actual_pk['columns'] != model.primary_key):
+        drift['primary_key_mismatch'] = {
+            'expected': model.primary_key, 'actual': actual_pk['columns'] if actual_pk else None
+        }
+
+    # Indexes: compare by (columns, unique); names only when Prisma pins them with map:
+    actual_indexes = {
+        (tuple(i['columns']), i['unique']): i for i in actual['indexes']
+        if not i['primary'] and not i['partial']
+    }
+    expected_indexes = [(tuple(i['columns']), False, i['name']) for i in model.indexes]
+    expected_indexes += [(tuple(u['columns']), True, u['name']) for u in model.uniques]
+
+    missing_indexes, renamed = [], []
+    for columns, unique, name in expected_indexes:
+        found = actual_indexes.pop((columns, unique), None)
+        if not found:
+            missing_indexes.append({'columns': list(columns), 'unique': unique, 'name': name})
+        elif not found['valid']:
+            missing_indexes.append({'columns': list(columns), 'unique': unique, 'name': found['name'],
+                                    'invalid': True})
+        elif name and found['name'] != name:
+            renamed.append({'columns': list(columns), 'expected': name, 'actual': found['name']})
+    if missing_indexes:
+        drift['missing_indexes'] = missing_indexes
+    if renamed:
+        drift['index_name_mismatches'] = renamed
+    if actual_indexes:
+        drift['extra_indexes'] = [
+            {'name': i['name'], 'columns': i['columns'], 'unique': i['unique']} for i in actual_indexes.values()
+        ]
+
+    # Foreign keys: match by (columns, referenced table)
+    actual_fks = {
+        (tuple(c['columns']), c['referenced_table']): c for c in actual['constraints'] if c['type'] == 'foreign'
+    }
+    missing_fks, action_mismatches, unvalidated = [], [], []
+    for fk in expected_foreign_keys(model, schema):
+        found = actual_fks.pop((tuple(fk['columns']), fk['referenced_table']), None)
+        if not found:
+            missing_fks.append(fk)
+            continue
+        for action in ('on_delete', 'on_update'):
+            if found[action] != fk[action]:
+                action_mismatches.append({
+                    'constraint': found['name'], 'columns': fk['columns'], 'action': action,
+                    'expected': fk[action], 'actual': found[action],
+                })
+        if not found['validated']:
+            unvalidated.append(found['name'])
+    if missing_fks:
+        drift['missing_foreign_keys'] = missing_fks
+    if action_mismatches:
+        drift['foreign_key_action_mismatches'] = action_mismatches
+    if unvalidated:
+        drift['not_valid_foreign_keys'] = unvalidated
+    if actual_fks:
+        drift['extra_foreign_keys'] = [
+            {'name': c['name'], 'columns': c['columns'], 'referenced_table': c['referenced_table'],
+             'on_delete': c['on_delete']}
+            for c in actual_fks.values()
+        ]
+
+    return drift
+
+
+def diff_schema(schema, snapshot):
+    """Full drift report between a PrismaSchema and a catalog snapshot"""
+    started = time.perf_counter()
+    actual_tables = {t: v for t, v in snapshot['tables'].items() if t not in IGNORED_TABLES}
+    expected_tables = {m.table_name: m for m in schema.models.values()}
+
+    report = {
+        'missing_tables': sorted(set(expected_tables) - set(actual_tables)),
+        'extra_tables': sorted(set(actual_tables) - set(expected_tables)),
+        'tables': {},
+    }
+
+    for table_name in sorted(set(expected_tables) & set(actual_tables)):
+        drift = diff_table(expected_tables[table_name], actual_tables[table_name], schema)
+        if drift:
+            report['tables'][table_name] = drift
+
+    issue_count = len(report['missing_tables']) + len(report['extra_tables']) + sum(
+        len(v) if isinstance(v, list) else 1 for drift in report['tables'].values() for v in drift.values()
+    )
+    report['summary'] = {
+        'models': len(expected_tables),
+        'database_tables': len(actual_tables),
+        'tables_with_drift': len(report['tables']),
+        'issues': issue_count,
+        'snapshot_ms': snapshot.get('elapsed_ms'),
+        'diff_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+    return report
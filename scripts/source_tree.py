@@ -0,0 +1,104 @@
+"""
+Shared walker over the Next.js sources (src/ and lib/).
+
+Every codemod and validator in this folder used to glob the tree itself,
+each with its own skip list. iter_source_files() is the one traversal they
+share: sorted output, node_modules/.next/backup files skipped.
+process_files() runs a per-file function over them, optionally on a
+process pool, and yields results in walk order so reports stay
+deterministic whatever --jobs is:
+
+    from source_tree import iter_source_files, process_files, relative_path
+
+    for path, result in process_files(check_file, iter_source_files(), jobs=4):
+        print(relative_path(path), result)
+
+The function must be defined at module level (it is pickled to workers).
+"""
+
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+SOURCE_ROOTS = ('src', 'lib')
+JS_EXTENSIONS = ('.js', '.jsx', '.ts', '.tsx', '.mjs')
+
+SKIP_DIRS = {'node_modules', '.next', '.git', 'dist', 'build', 'backup', '__pycache__'}
+# Hand-made copies that live next to the real file (route-old.js, page-backup.js, ...)
+SKIP_NAME_MARKERS = ('-backup', '.backup', '-old', '.old', '-original')
+
+
+def should_skip(path):
+    if any(part in SKIP_DIRS for part in Path(path).parts):
+        return True
+    return any(marker in Path(path).stem for marker in SKIP_NAME_MARKERS)
+
+
+def iter_source_files(roots=SOURCE_ROOTS, extensions=JS_EXTENSIONS, base_dir=REPO_ROOT):
+    """Yield source files under the given roots (directories or single files) in a stable order"""
+    for root in roots:
+        top = Path(base_dir) / root
+        if top.is_file():
+            if top.suffix in extensions and not should_skip(top):
+                yield top
+            continue
+        if not top.is_dir():
+            continue
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            for filename in sorted(filenames):
+                path = Path(dirpath) / filename
+                if path.suffix in extensions and not should_skip(path):
+                    yield path
+
+
+def changed_since(ref, roots=SOURCE_ROOTS, extensions=JS_EXTENSIONS, base_dir=REPO_ROOT):
+    """
+    Source files changed relative to a git ref (committed, staged or not)
+    plus untracked ones, filtered like iter_source_files(). Deleted files
+    are dropped. Raises subprocess.CalledProcessError for a bad ref.
+    """
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=base_dir, check=True,
+                              capture_output=True, text=True).stdout.splitlines()
+
+    names = set(git('diff', '--name-only', ref, '--', *roots))
+    names.update(git('ls-files', '--others', '--exclude-standard', '--', *roots))
+    paths = (Path(base_dir) / name for name in sorted(names))
+    return [p for p in paths if p.is_file() and p.suffix in extensions and not should_skip(p)]
+
+
+def relative_path(path, base_dir=REPO_ROOT):
+    """Repository-relative POSIX path, used in reports and as a stable key"""
+    return Path(path).resolve().relative_to(Path(base_dir).resolve()).as_posix()
+
+
+def read_source(path):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def resolve_jobs(jobs):
+    """--jobs value -> worker count (0 means one per CPU)"""
+    if jobs is None:
+        return 1
+    return jobs if jobs > 0 else (os.cpu_count() or 1)
+
+
+def add_jobs_argument(parser):
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Worker processes (0 = one per CPU, default: 1)')
+
+
+def process_files(func, paths, jobs=1, chunksize=8):
+    """Yield (path, func(path)) in input order; jobs > 1 fans out to worker processes"""
+    paths = list(paths)
+    jobs = resolve_jobs(jobs)
+    if jobs <= 1 or len(paths) < 2:
+        for path in paths:
+            yield path, func(path)
+        return
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        yield from zip(paths, pool.map(func, paths, chunksize=chunksize))
@@ -0,0 +1,263 @@
+"""
+Consumer for facebook_trigger_comment_queue.
+
+Each job posts up to two comments on `target_post_id` and stores the
+returned ids in posted_comment_id_1 / posted_comment_id_2. Workers claim
+jobs in batches with FOR UPDATE SKIP LOCKED and mark them 'processing' in a
+short transaction, so any number of worker processes can share the queue.
+The API calls run on a bounded thread pool outside any transaction, and
+the outcome of the whole batch is written back with one UPDATE.
+
+Job lifecycle (status):
+
+  pending ──claim──▶ processing ──▶ done
+                        │
+                        ├──error──▶ retry ──(backoff)──▶ processing ...
+                        │             └── attempt_count >= max ──▶ failed
+                        └──stalled──(stale_after)──▶ processing ...
+                                      └── attempt_count >= max ──▶ failed
+
+attempt_count is bumped by every claim, including the reclaim of a job
+left in 'processing' by a crashed or stalled worker, so it doubles as the
+claim token: a worker only writes its result while attempt_count still
+matches the value it claimed. A stalled job that has already used
+max_attempts is failed instead of reclaimed.
+
+processed_at holds the time of the last claim or result. It drives the
+retry backoff (base * 2^(attempt_count - 1)) and the recovery of stalled
+jobs.
+
+The Graph API client is pluggable: anything with
+`post_comment(post_id, message) -> comment_id` works, and FakeGraphClient
+stands in for the real API in local runs and tests.
+"""
+
+import importlib
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from psycopg2.extras import execute_values
+
+CLAIMABLE_STATUSES = ('pending', 'retry')
+
+STALE_CONDITION = "status = 'processing' AND processed_at < now() - make_interval(secs => %(stale_after)s)"
+
+FAIL_STALE_QUERY = f"""
+    UPDATE facebook_trigger_comment_queue
+    SET status = 'failed',
+        error_message = 'Worker stalled on the last attempt',
+        processed_at = now()
+    WHERE {STALE_CONDITION}
+      AND COALESCE(attempt_count, 0) >= %(max_attempts)s
+"""
+
+CLAIM_QUERY = f"""
+    WITH due AS (
+        SELECT id
+        FROM facebook_trigger_comment_queue
+        WHERE (
+                status IN %(claimable)s
+                AND COALESCE(attempt_count, 0) < %(max_attempts)s
+                AND (
+                    COALESCE(attempt_count, 0) = 0
+                    OR processed_at IS NULL
+                    OR processed_at <= now() - make_interval(
+                        secs => %(backoff_base)s * power(2, COALESCE(attempt_count, 1) - 1)
+                    )
+                )
+              )
+           OR ({STALE_CONDITION} AND COALESCE(attempt_count, 0) < %(max_attempts)s)
+        ORDER BY id
+        LIMIT %(batch_size)s
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE facebook_trigger_comment_queue q
+    SET status = 'processing',
+        attempt_count = COALESCE(q.attempt_count, 0) + 1,
+        processed_at = now()
+    FROM due
+    WHERE q.id = due.id
+    RETURNING q.id, q.target_post_id, q.target_post_caption,
+              q.attempt_count, q.posted_comment_id_1, q.posted_comment_id_2
+"""
+
+# attempt_count is the claim token: once a stalled job has been reclaimed
+# (or failed) by another worker it no longer matches, and the late result
+# of the first worker is dropped
+RESULT_UPDATE = """
+    UPDATE facebook_trigger_comment_queue q
+    SET status = v.status,
+        posted_comment_id_1 = COALESCE(v.comment_id_1, q.posted_comment_id_1),
+        posted_comment_id_2 = COALESCE(v.comment_id_2, q.posted_comment_id_2),
+        error_message = v.error_message,
+        processed_at = now()
+    FROM (VALUES %s) AS v(id, attempt_count, status, comment_id_1, comment_id_2, error_message)
+    WHERE q.id = v.id
+      AND q.status = 'processing'
+      AND q.attempt_count = v.attempt_count
+"""
+
+
+class GraphApiError(Exception):
+    pass
+
+
+class GraphApiClient:
+    """Minimal Graph API client: POST /{post_id}/comments"""
+
+    def __init__(self, access_token, version='v19.0', timeout=15):
+        import requests
+
+        self.base_url = f'https://graph.facebook.com/{version}'
+        self.access_token = access_token
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def post_comment(self, post_id, message):
+        response = self.session.post(
+            f'{self.base_url}/{post_id}/comments',
+            data={'message': message, 'access_token': self.access_token},
+            timeout=self.timeout
+        )
+        payload = response.json() if response.content else {}
+        if response.status_code != 200 or 'id' not in payload:
+            error = payload.get('error', {})
+            raise GraphApiError(f'HTTP {response.status_code}: {error.get("message") or response.text[:200]}')
+        return payload['id']
+
+
+class FakeGraphClient:
+    """Local stand-in for the Graph API with optional latency and failures"""
+
+    def __init__(self, failure_rate=0.0, latency=0.05, seed=None):
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.random = random.Random(seed)
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.posted = []
+
+    def post_comment(self, post_id, message):
+        time.sleep(self.latency)
+        with self.lock:
+            if self.random.random() < self.failure_rate:
+                raise GraphApiError('fake failure')
+            comment_id = f'{post_id}_fake{next(self.ids)}'
+            self.posted.append((post_id, comment_id, message))
+        return comment_id
+
+
+def load_client(spec, **options):
+    """'graph', 'fake' or 'package.module:ClassName'"""
+    if spec == 'graph':
+        return GraphApiClient(**options)
+    if spec == 'fake':
+        return FakeGraphClient(**options)
+    module_name, _, class_name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)(**options)
+
+
+def claim_batch(conn, batch_size, max_attempts, backoff_base, stale_after):
+    """
+    Fail stalled jobs that are out of attempts, then mark up to batch_size
+    due jobs as 'processing'. Returns (jobs, number of stalled jobs failed).
+    """
+    with conn.cursor() as cur:
+        cur.execute(FAIL_STALE_QUERY, {'stale_after': stale_after, 'max_attempts': max_attempts})
+        failed = cur.rowcount
+        cur.execute(CLAIM_QUERY, {
+            'claimable': CLAIMABLE_STATUSES,
+            'max_attempts': max_attempts,
+            'backoff_base': backoff_base,
+            'stale_after': stale_after,
+            'batch_size': batch_size,
+        })
+        rows = cur.fetchall()
+    conn.commit()
+    jobs = [
+        {'id': r[0], 'target_post_id': r[1], 'caption': r[2], 'attempt_count': r[3],
+         'comment_id_1': r[4], 'comment_id_2': r[5]}
+        for r in rows
+    ]
+    return jobs, failed
+
+
+def process_job(client, job, messages):
+    """
+    Post whichever comments are still missing. A comment that succeeded on
+    an earlier attempt is not posted again.
+    """
+    result = {'id': job['id'], 'comment_id_1': None, 'comment_id_2': None, 'error_message': None}
+    try:
+        for slot, message in enumerate(messages[:2], 1):
+            key = f'comment_id_{slot}'
+            if job[key]:
+                continue
+            result[key] = client.post_comment(job['target_post_id'], message)
+    except Exception as e:
+        result['error_message'] = f'{type(e).__name__}: {e}'[:1000]
+    return result
+
+
+def final_status(job, result, max_attempts):
+    if result['error_message'] is None:
+        return 'done'
+    return 'failed' if job['attempt_count'] >= max_attempts else 'retry'
+
+
+def record_results(conn, jobs, results, max_attempts):
+    """Write every outcome of the batch with one UPDATE"""
+    by_id = {job['id']: job for job in jobs}
+    rows = [
+        (r['id'], by_id[r['id']]['attempt_count'], final_status(by_id[r['id']], r, max_attempts),
+         r['comment_id_1'], r['comment_id_2'], r['error_message'])
+        for r in results
+    ]
+    with conn.cursor() as cur:
+        execute_values(cur, RESULT_UPDATE, rows, page_size=max(1, len(rows)))
+        updated = cur.rowcount
+    conn.commit()
+    return rows, updated
+
+
+def run_batch(conn, client, messages, executor, batch_size=20, max_attempts=5,
+              backoff_base=60, stale_after=900):
+    """Claim, process and record one batch; returns the per-status counts"""
+    jobs, stalled = claim_batch(conn, batch_size, max_attempts, backoff_base, stale_after)
+    if not jobs:
+        return {'stalled': stalled} if stalled else {}
+
+    results = list(executor.map(lambda job: process_job(client, job, messages), jobs))
+    rows, updated = record_results(conn, jobs, results, max_attempts)
+
+    counts = {'claimed': len(jobs), 'stalled': stalled, 'lost': len(rows) - updated}
+    for _, _, status, _, _, _ in rows:
+        counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+def run_worker(conn, client, messages, concurrency=4, batch_size=20, max_attempts=5,
+               backoff_base=60, stale_after=900, poll_interval=10, drain=False, max_batches=None):
+    """Loop over batches until the queue is empty (drain) or max_batches is reached"""
+    totals = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for batch_number in itertools.count(1):
+            started = time.perf_counter()
+            counts = run_batch(conn, client, messages, executor, batch_size, max_attempts,
+                               backoff_base, stale_after)
+            if counts:
+                for key, value in counts.items():
+                    totals[key] = totals.get(key, 0) + value
+                summary = ', '.join(f'{k} {v}' for k, v in counts.items() if v)
+                print(f'   📦 Batch {batch_number}: {summary} ({time.perf_counter() - started:.2f}s)')
+            elif drain:
+                break
+            else:
+                time.sleep(poll_interval)
+
+            if max_batches and batch_number >= max_batches:
+                break
+    return totals
@@ -4,6 +4,10 @@ Update task_submissions foreign key to CASCADE DELETE.
 When a tugas_ai is deleted, all related task_submissions will be automatically deleted.
 
 This script directly updates the database constraint without Prisma migrate.
+
+Pass --online to add the new constraint as NOT VALID, swap it in under a
+short lock_timeout and validate it separately, so writers are not blocked
+by the validation scan.
 """
 
 import os
@@ -11,6 +15,10 @@ import sys
 import psycopg2
 from urllib.parse import urlparse
 
+from online_constraints import swap_foreign_key_online
+
+ONLINE = '--online' in sys.argv
+
 def get_db_connection():
     """Get database connection from DATABASE_URL env variable."""
     database_url = os.getenv('DATABASE_URL')
@@ -125,6 +133,32 @@ def update_constraint(conn, constraint_name):
         print(f"❌ ERROR updating constraint: {e}")
         return False
 
+def update_constraint_online(conn, constraint_name):
+    """Update foreign key constraint to CASCADE without blocking writers."""
+    print("🔧 Updating foreign key constraint to CASCADE DELETE (online)...")
+    print()
+    
+    try:
+        success = swap_foreign_key_online(
+            conn, 'task_submissions', 'id_task', 'tugas_ai', 'id',
+            name='task_submissions_id_task_fkey',
+            old_name=constraint_name,
+            on_delete='CASCADE',
+            on_update='CASCADE'
+        )
+    except Exception as e:
+        conn.rollback()
+        print()
+        print(f"❌ ERROR updating constraint: {e}")
+        return False
+    finally:
+        conn.autocommit = True
+    
+    if success:
+        print()
+        print("✅ SUCCESS! Foreign key constraint updated to CASCADE DELETE")
+    return success
+
 def verify_constraint(conn):
     """Verify the constraint was updated correctly."""
     print()
@@ -221,7 +255,10 @@ def main():
     print()
     
     # Update constraint
-    success = update_constraint(conn, constraint_name)
+    if ONLINE:
+        success = update_constraint_online(conn, constraint_name)
+    else:
+        success = update_constraint(conn, constraint_name)
     
     if success:
         # Verify
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Batch auto-verifier for task_submissions
+
+Due submissions (status 'sedang_verifikasi' or 'gagal_diverifikasi' with
+scheduled_check_at in the past) are claimed a chunk at a time with
+FOR UPDATE SKIP LOCKED and matched against comments in one set-based join:
+a comment whose submission_id points at the submission, or any comment by
+the same member on the same task. Per chunk, in one transaction:
+
+  matched    status 'selesai', tanggal_verifikasi, comment_id, validation_status
+             'auto_verified'; loyalty_point_history row (tugas_ai.point_value)
+             and members.loyalty_point / coin incremented per member
+  unmatched  gagal_diverifikasi_verification_attempts + 1 and rescheduled
+             with exponential backoff, or 'gagal_diverifikasi' once
+             --max-attempts is reached
+
+Points are never awarded twice for the same member and task.
+
+Usage:
+  python scripts/verify-task-submissions.py                   # all due submissions
+  python scripts/verify-task-submissions.py --chunk-size 200 --max-chunks 10
+  python scripts/verify-task-submissions.py --dry-run         # first chunk, rolled back
+"""
+
+import argparse
+import sys
+import time
+
+from psycopg2.extras import execute_values
+
+from db_utils import get_db_connection
+
+VERIFIER_NAME = 'auto-verifier'
+PENDING_STATUSES = ('sedang_verifikasi', 'gagal_diverifikasi')
+
+CLAIM_AND_MATCH = """
+    WITH due AS (
+        SELECT id, id_task, id_member, COALESCE(gagal_diverifikasi_verification_attempts, 0) AS attempts
+        FROM task_submissions
+        WHERE status_submission IN %(statuses)s
+          AND scheduled_check_at <= now()
+          AND COALESCE(gagal_diverifikasi_verification_attempts, 0) < %(max_attempts)s
+        ORDER BY scheduled_check_at, id
+        LIMIT %(chunk_size)s
+        FOR UPDATE SKIP LOCKED
+    ),
+    candidates AS (
+        SELECT d.id, c.id AS comment_id, c.comment_timestamp
+        FROM due d
+        JOIN comments c ON c.submission_id = d.id
+        UNION ALL
+        SELECT d.id, c.id, c.comment_timestamp
+        FROM due d
+        JOIN comments c ON c.id_task = d.id_task AND c.id_member = d.id_member
+    ),
+    best AS (
+        -- Earliest matching comment per submission
+        SELECT DISTINCT ON (id) id, comment_id
+        FROM candidates
+        ORDER BY id, comment_timestamp NULLS LAST, comment_id
+    )
+    SELECT d.id, d.id_task, d.id_member, d.attempts, best.comment_id
+    FROM due d
+    LEFT JOIN best USING (id)
+"""
+
+# tanggal_verifikasi is a timestamp without time zone written in UTC by Prisma
+COMPLETE_MATCHED = f"""
+    UPDATE task_submissions ts
+    SET status_submission = 'selesai',
+        tanggal_verifikasi = now() AT TIME ZONE 'UTC',
+        comment_id = v.comment_id,
+        validation_status = 'auto_verified',
+        verified_by = '{VERIFIER_NAME}',
+        scheduled_check_at = NULL
+    FROM (VALUES %s) AS v(id, comment_id)
+    WHERE ts.id = v.id
+    RETURNING ts.id, ts.id_member, ts.id_task, ts.comment_id
+"""
+
+AWARD_POINTS = """
+    WITH completed(id_member, id_task, comment_id) AS (
+        SELECT * FROM unnest(%(members)s::int[], %(tasks)s::int[], %(comments)s::int[])
+    ),
+    awarded AS (
+        INSERT INTO loyalty_point_history (member_id, event, point, comment_id, event_type, task_id)
+        SELECT c.id_member, 'task_completion', COALESCE(t.point_value, 10), c.comment_id, 'task_completion', c.id_task
+        FROM completed c
+        JOIN tugas_ai t ON t.id = c.id_task
+        WHERE NOT EXISTS (
+            SELECT 1 FROM loyalty_point_history h
+            WHERE h.member_id = c.id_member
+              AND h.task_id = c.id_task
+              AND h.event_type = 'task_completion'
+        )
+        RETURNING member_id, point
+    ),
+    totals AS (
+        SELECT member_id, SUM(point) AS points, COUNT(*) AS awards
+        FROM awarded
+        GROUP BY member_id
+    ),
+    credited AS (
+        UPDATE members m
+        SET loyalty_point = m.loyalty_point + totals.points,
+            coin = m.coin + totals.points
+        FROM totals
+        WHERE m.id = totals.member_id
+        RETURNING totals.points, totals.awards
+    )
+    SELECT COALESCE(SUM(awards), 0), COALESCE(SUM(points), 0) FROM credited
+"""
+
+RESCHEDULE_UNMATCHED = """
+    UPDATE task_submissions
+    SET gagal_diverifikasi_verification_attempts = COALESCE(gagal_diverifikasi_verification_attempts, 0) + 1,
+        status_submission = CASE
+            WHEN COALESCE(gagal_diverifikasi_verification_attempts, 0) + 1 >= %(max_attempts)s
+            THEN 'gagal_diverifikasi' ELSE status_submission END,
+        validation_status = CASE
+            WHEN COALESCE(gagal_diverifikasi_verification_attempts, 0) + 1 >= %(max_attempts)s
+            THEN 'no_comment_found' ELSE 'waiting_for_comment' END,
+        scheduled_check_at = CASE
+            WHEN COALESCE(gagal_diverifikasi_verification_attempts, 0) + 1 >= %(max_attempts)s THEN NULL
+            ELSE now() + make_interval(
+                secs => %(retry_base)s * power(2, COALESCE(gagal_diverifikasi_verification_attempts, 0))
+            ) END
+    WHERE id = ANY(%(ids)s)
+    RETURNING status_submission
+"""
+
+
+def verify_chunk(conn, chunk_size, max_attempts, retry_base, dry_run=False):
+    """Claim, match and settle one chunk in a single transaction"""
+    counts = {'claimed': 0, 'verified': 0, 'points_rows': 0, 'points': 0, 'rescheduled': 0, 'failed': 0}
+    with conn.cursor() as cur:
+        cur.execute(CLAIM_AND_MATCH, {
+            'statuses': PENDING_STATUSES, 'max_attempts': max_attempts, 'chunk_size': chunk_size,
+        })
+        rows = cur.fetchall()
+        counts['claimed'] = len(rows)
+        if not rows:
+            conn.rollback()
+            return counts
+
+        matched = [(sub_id, comment_id) for sub_id, _, _, _, comment_id in rows if comment_id is not None]
+        unmatched = [sub_id for sub_id, _, _, _, comment_id in rows if comment_id is None]
+
+        if matched:
+            completed = execute_values(cur, COMPLETE_MATCHED, matched, page_size=len(matched), fetch=True)
+            counts['verified'] = len(completed)
+            cur.execute(AWARD_POINTS, {
+                'members': [r[1] for r in completed],
+                'tasks': [r[2] for r in completed],
+                'comments': [r[3] for r in completed],
+            })
+            counts['points_rows'], counts['points'] = cur.fetchone()
+
+        if unmatched:
+            cur.execute(RESCHEDULE_UNMATCHED, {
+                'ids': unmatched, 'max_attempts': max_attempts, 'retry_base': retry_base,
+            })
+            statuses = [r[0] for r in cur.fetchall()]
+            counts['failed'] = sum(1 for s in statuses if s == 'gagal_diverifikasi')
+            counts['rescheduled'] = len(statuses) - counts['failed']
+
+    if dry_run:
+        conn.rollback()
+    else:
+        conn.commit()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Auto-verify due task submissions against comments')
+    parser.add_argument('--chunk-size', type=int, default=500, help='Submissions per transaction (default: 500)')
+    parser.add_argument('--max-chunks', type=int, help='Stop after this many chunks')
+    parser.add_argument('--max-attempts', type=int, default=3,
+                        help="Checks before a submission is left as 'gagal_diverifikasi' (default: 3)")
+    parser.add_argument('--retry-base', type=int, default=900,
+                        help='Seconds until the next check, doubled per attempt (default: 900)')
+    parser.add_argument('--dry-run', action='store_true', help='Process one chunk and roll it back')
+    args = parser.parse_args()
+
+    max_chunks = 1 if args.dry_run else args.max_chunks
+
+    print('=' * 60)
+    print('🤖 TASK SUBMISSION AUTO-VERIFIER' + (' (DRY RUN)' if args.dry_run else ''))
+    print('=' * 60)
+
+    totals = {}
+    started = time.perf_counter()
+    conn = get_db_connection()
+    try:
+        chunk = 0
+        while max_chunks is None or chunk < max_chunks:
+            chunk += 1
+            chunk_started = time.perf_counter()
+            counts = verify_chunk(conn, args.chunk_size, args.max_attempts, args.retry_base, args.dry_run)
+            if not counts['claimed']:
+                break
+            for key, value in counts.items():
+                totals[key] = totals.get(key, 0) + value
+            print(f'   📦 Chunk {chunk}: {counts["claimed"]} due, {counts["verified"]} verified '
+                  f'(+{counts["points"]} pts), {counts["rescheduled"]} rescheduled, {counts["failed"]} failed '
+                  f'({time.perf_counter() - chunk_started:.2f}s)')
+            if counts['claimed'] < args.chunk_size:
+                break
+    finally:
+        conn.close()
+
+    if not totals:
+        print('✅ No submissions due for verification')
+    else:
+        print(f'\n✅ {totals["verified"]} verified, {totals["points_rows"]} point award(s) '
+              f'totalling {totals["points"]}, {totals["rescheduled"]} rescheduled, {totals["failed"]} failed '
+              f'in {time.perf_counter() - started:.1f}s')
+    if args.dry_run:
+        print('ℹ️  Dry run: changes were rolled back')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())